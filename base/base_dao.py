@@ -1,6 +1,8 @@
-from typing import Generic, TypeVar, Type, List, Optional, Dict, Any
+import operator
+from typing import Generic, TypeVar, Type, List, Optional, Dict, Any, Union, Tuple
 
-from sqlalchemy import asc, delete, desc, func, select, update, text
+from sqlalchemy import asc, bindparam, delete, desc, func, insert, select, update, text
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from base.base_model import myBaseModel
@@ -8,8 +10,40 @@ from base.base_model import myBaseModel
 # 定义泛型类型变量，约束为SQLAlchemy的Base模型
 ModelType = TypeVar("ModelType", bound=myBaseModel)
 
+# 查询计划缓存的最大数量。查询形状由代码中的查询方式决定，正常情况下远小于该值
+FILTER_PLAN_CACHE_MAX_SIZE = 4096
+
+# 范围查询的操作符
+_COMPARE_OPERATORS = {"gt": operator.gt, "lt": operator.lt, "gte": operator.ge, "lte": operator.le}
+
+
+class FilterPlan:
+    """
+    编译后的查询计划（只读，多线程共享）
+    - statement：带绑定参数的查询语句，同一形状的查询复用同一个语句对象，SQLAlchemy也只需编译一次SQL
+    - param_rules：(参数名, 查询条件key, 是否模糊查询) 列表，用于从查询条件字典中取出参数值
+    """
+    __slots__ = ("statement", "param_rules")
+
+    def __init__(self, statement, param_rules: List[Tuple[str, str, bool]]):
+        self.statement = statement
+        self.param_rules = param_rules
+
+    def build_params(self, filters: Dict) -> Dict[str, Any]:
+        """从查询条件字典中构建本次执行的绑定参数"""
+        params = {}
+        for param_name, key, is_like in self.param_rules:
+            value = filters[key]
+            params[param_name] = f"%{value}%" if is_like else value
+        return params
+
+
 class BaseDao(Generic[ModelType]):
     """通用DAO基类，封装所有表的通用CRUD方法"""
+
+    # 查询计划缓存，所有DAO共享：(模型, 查询类型, 查询条件形状, 排序字段, 投影字段) -> FilterPlan
+    _filter_plan_cache: Dict[tuple, FilterPlan] = {}
+
     def __init__(self, model: Type[ModelType]):
         """
         初始化BaseDAO
@@ -17,10 +51,31 @@ class BaseDao(Generic[ModelType]):
         """
         self.model = model
 
-    def _build_filter_conditions(self, filters: Dict):
+    @staticmethod
+    def _filter_shape(filters: Dict) -> tuple:
+        """
+        计算查询条件的形状：((key, 值类别), ...)。值为None的条件不参与查询，也不计入形状
+        值类别：bool值（及 __isnull 条件）为 True/False，列表/元组为 list，其他为 None
+        形状相同的查询条件生成相同的SQL，只有绑定参数的值不同
+        """
+        if not filters:
+            return ()
+        shape = []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if isinstance(value, bool) or key.endswith("__isnull"):
+                shape.append((key, bool(value)))
+            elif isinstance(value, (list, tuple)):
+                shape.append((key, list))
+            else:
+                shape.append((key, None))
+        return tuple(shape)
+
+    def _compile_filter_conditions(self, shape: tuple) -> Tuple[list, List[Tuple[str, str, bool]]]:
         """
-        构建查询条件，支持高级查询
-        :param filters: 查询条件字典
+        根据查询条件形状构建带绑定参数的查询条件，支持高级查询
+        :param shape: _filter_shape 计算的查询条件形状，对应的查询条件字典支持：
             - 等值查询: {"field": value}
             - 模糊查询: {"field__like": value}
             - 大于查询: {"field__gt": value}
@@ -29,228 +84,249 @@ class BaseDao(Generic[ModelType]):
             - 小于等于: {"field__lte": value}
             - 包含查询: {"field__in": [value1, value2]}
             - 为空查询: {"field__isnull": True/False}
-        :return: 过滤条件列表
+            - 非空查询: {"field": True} 表示该字段非空，{"field": False} 表示该字段为空
+        :return: (过滤条件列表, 参数构建规则列表)
         """
         conditions = []
-        if not filters:
-            return conditions
-
-        # 遍历查询条件字典，构建查询条件
-        for field, value in filters.items():
-            # 若字段值为None，则跳过
-            if value is None:
-                continue
+        param_rules = []
+        for index, (key, kind) in enumerate(shape):
+            param_name = f"_p{index}"
 
             # 若字典字段包含__，则为特殊查询类型，如模糊查询、范围查询等
-            if "__" in field:
+            if "__" in key:
                 # 将字典键按“__”拆分为字段名和查询类型
-                field_name, query_type = field.split("__", 1)
+                field_name, query_type = key.split("__", 1)
 
                 # 如果字段不存在于模型类中，则跳过
                 if not hasattr(self.model, field_name):
                     continue
-
-                # 获取模型类中对应的字段对象
                 model_field = getattr(self.model, field_name)
 
-                # 根据查询类型构建不同的条件
                 if query_type == "like":
                     # 模糊查询
-                    conditions.append(model_field.like(f"%{value}%"))
-                elif query_type == "gt":
-                    # 大于
-                    conditions.append(model_field > value)
-                elif query_type == "lt":
-                    # 小于
-                    conditions.append(model_field < value)
-                elif query_type == "gte":
-                    # 大于等于
-                    conditions.append(model_field >= value)
-                elif query_type == "lte":
-                    # 小于等于
-                    conditions.append(model_field <= value)
+                    conditions.append(model_field.like(bindparam(param_name)))
+                    param_rules.append((param_name, key, True))
+                elif query_type in _COMPARE_OPERATORS:
+                    # 范围查询
+                    conditions.append(_COMPARE_OPERATORS[query_type](model_field, bindparam(param_name)))
+                    param_rules.append((param_name, key, False))
                 elif query_type == "in":
-                    # 包含查询
-                    if isinstance(value, (list, tuple)):
-                        conditions.append(model_field.in_(value))
+                    # 包含查询，列表长度在执行时展开
+                    if kind is list:
+                        conditions.append(model_field.in_(bindparam(param_name, expanding=True)))
+                        param_rules.append((param_name, key, False))
                 elif query_type == "isnull":
                     # 为空查询
-                    if value:
-                        conditions.append(model_field.is_(None))
-                    else:
-                        conditions.append(model_field.is_not(None))
+                    conditions.append(model_field.is_(None) if kind else model_field.is_not(None))
             # 处理普通查询
-            elif hasattr(self.model, field):
-                # 获取模型类中对应的字段对象
-                model_field = getattr(self.model, field)
-                # 若值为bool类型
-                if isinstance(value, bool):
-                    if value:
-                        # True，表示该查询字段为非空值
-                        conditions.append(model_field.is_not(None))
-                    else:
-                        # False，表示该查询字段为空值
-                        conditions.append(model_field.is_(None))
-                # 若值为非None
-                elif value is not None:
+            elif hasattr(self.model, key):
+                model_field = getattr(self.model, key)
+                if kind is True:
+                    # True，表示该查询字段为非空值
+                    conditions.append(model_field.is_not(None))
+                elif kind is False:
+                    # False，表示该查询字段为空值
+                    conditions.append(model_field.is_(None))
+                else:
                     # 设置查询条件为该字段为value
-                    conditions.append(model_field == value)
+                    conditions.append(model_field == bindparam(param_name))
+                    param_rules.append((param_name, key, False))
+
+        return conditions, param_rules
+
+    def _apply_sort(self, sql, sort_by: List[str] = None):
+        """
+        添加排序条件
+        :param sort_by: 排序字段列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序，不存在的字段忽略
+        """
+        for sort_field in sort_by or []:
+            # 判断排序方向
+            if sort_field.startswith('-'):
+                # 降序
+                field_name = sort_field[1:]
+                if hasattr(self.model, field_name):
+                    sql = sql.order_by(desc(getattr(self.model, field_name)))
+            else:
+                # 升序
+                if hasattr(self.model, sort_field):
+                    sql = sql.order_by(asc(getattr(self.model, sort_field)))
+        return sql
+
+    def _compile_filter_plan(self, query_type: str, shape: tuple, sort_by: List[str] = None, columns: List[str] = None) -> FilterPlan:
+        """
+        编译查询计划
+        :param query_type: 查询类型 count-总数，one-单条，list-列表，page-分页列表（offset/limit为绑定参数 _offset/_limit）
+        """
+        if query_type == "count":
+            # 构建 count(*) 查询，避免全量加载导致的性能问题
+            sql = select(func.count()).select_from(self.model)
+        else:
+            sql = self._build_select(columns)
 
-        return conditions
+        # 动态构建查询条件 and 查询
+        conditions, param_rules = self._compile_filter_conditions(shape)
+        if conditions:
+            sql = sql.where(*conditions)
 
-    def get_by_id(self, db_session: Session, id: int) -> Optional[ModelType]:
+        if query_type != "count":
+            sql = self._apply_sort(sql, sort_by)
+        if query_type == "one":
+            # 添加limit(1)限制，确保只返回第一条记录
+            sql = sql.limit(1)
+        elif query_type == "page":
+            sql = sql.offset(bindparam("_offset")).limit(bindparam("_limit"))
+        return FilterPlan(sql, param_rules)
+
+    def _get_filter_plan(self, query_type: str, filters: Dict = None, sort_by: List[str] = None,
+                         columns: List[str] = None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        获取查询语句和绑定参数
+        每种查询形状（查询条件的key及值类别 + 排序字段 + 投影字段）只编译一次，之后只需从查询条件字典中取出参数值
+        :return: (查询语句, 绑定参数)
+        """
+        shape = self._filter_shape(filters)
+        cache_key = (self.model, query_type, shape, tuple(sort_by) if sort_by else (), tuple(columns) if columns else ())
+        plan = self._filter_plan_cache.get(cache_key)
+        if plan is None:
+            plan = self._compile_filter_plan(query_type, shape, sort_by, columns)
+            # 超过上限后不再缓存新的形状（按实时编译执行），避免动态拼接的查询条件导致缓存无限增长
+            if len(self._filter_plan_cache) < FILTER_PLAN_CACHE_MAX_SIZE:
+                self._filter_plan_cache[cache_key] = plan
+        return plan.statement, plan.build_params(filters)
+
+    def _build_select(self, columns: List[str] = None):
+        """
+        构建查询语句
+        :param columns: 投影字段名列表，为空时查询整个模型（所有非延迟加载字段）
+        """
+        if not columns:
+            return select(self.model)
+        return select(*[getattr(self.model, column) for column in columns])
+
+    @staticmethod
+    def _fetch_all(result, columns: List[str] = None, as_dict: bool = False) -> List[Union[ModelType, Row, Dict[str, Any]]]:
+        """
+        获取多条查询结果
+        未指定投影字段时返回模型实例列表；指定时返回Row元组列表，as_dict为True时返回字典列表
+        """
+        if not columns:
+            return result.scalars().all()
+        if as_dict:
+            return [row._asdict() for row in result]
+        return result.all()
+
+    @staticmethod
+    def _fetch_one(result, columns: List[str] = None, as_dict: bool = False) -> Optional[Union[ModelType, Row, Dict[str, Any]]]:
+        """获取单条查询结果（不存在返回None），返回类型同 _fetch_all"""
+        if not columns:
+            return result.scalar_one_or_none()
+        row = result.one_or_none()
+        if row is None or not as_dict:
+            return row
+        return row._asdict()
+
+    def get_by_id(self, db_session: Session, id: int, columns: List[str] = None, as_dict: bool = False) -> Optional[ModelType]:
         """
         根据ID获取单条记录（注意包含字段id）
             id: 记录ID
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        # 构建sqlalchemy查询语句
-        sql = select(self.model).where(self.model.id == id)
+        # 值为None的查询条件不参与查询，id为None时直接返回None（否则查询条件为空，会返回表中第一条记录）
+        if id is None:
+            return None
+        # 获取编译好的查询语句
+        sql, params = self._get_filter_plan("one", {"id": id}, columns=columns)
         # 执行查询语句并返回查询结果对象
-        result = db_session.execute(sql)
+        result = db_session.execute(sql, params)
         # 从查询结果对象中获取单条记录（如果存在）
-        return result.scalar_one_or_none()
+        return self._fetch_one(result, columns, as_dict)
 
-    def get_list_by_ids(self, db_session: Session, ids: List[int]) -> List[ModelType]:
+    def get_list_by_ids(self, db_session: Session, ids: List[int], columns: List[str] = None, as_dict: bool = False) -> List[ModelType]:
         """
         根据ID列表获取多条记录（注意包含字段id）
             ids: 记录ID列表
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        # 构建sqlalchemy查询语句
-        sql = select(self.model).where(self.model.id.in_(ids))
+        # 获取编译好的查询语句（IN列表在执行时展开）
+        sql, params = self._get_filter_plan("list", {"id__in": list(ids)}, columns=columns)
         # 执行查询语句并返回查询结果对象
-        result = db_session.execute(sql)
+        result = db_session.execute(sql, params)
         # 从查询结果对象中获取多条记录（如果存在）
-        return result.scalars().all()
+        return self._fetch_all(result, columns, as_dict)
 
     def get_total_by_filters(self,db_session: Session,filters: Dict = None) -> int:
         """
         根据条件获取记录总数
             filters: 查询条件,字典类型。例如 {"filed1": value1, "filed2": value2}
         """
-        # 构建 count(*) 查询，避免全量加载导致的性能问题
-        sql = select(func.count()).select_from(self.model)
-        # 动态构建查询条件 and 查询
-        conditions = self._build_filter_conditions(filters)
-        if conditions:
-            sql = sql.where(*conditions)
+        # 获取编译好的查询语句（count(*) 查询，避免全量加载导致的性能问题）
+        sql, params = self._get_filter_plan("count", filters)
 
         # 执行查询语句并返回查询结果对象
-        result = db_session.execute(sql)
+        result = db_session.execute(sql, params)
         # 返回记录总数
         return int(result.scalar_one())
 
-    def get_one_by_filters(self, db_session: Session, filters: Dict = None,sort_by: List[str] = None) -> Optional[ModelType]:
+    def get_one_by_filters(self, db_session: Session, filters: Dict = None,sort_by: List[str] = None,
+                           columns: List[str] = None, as_dict: bool = False) -> Optional[ModelType]:
         """
         根据条件获取单条记录
             filters: 查询条件，字典类型。例如 {"filed1": value1, "filed2": value2}
             sort_by: 排序字段，是一个字符串列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序。
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        # 初始化查询对象，选择模型的所有字段
-        sql = select(self.model)
-        # 动态构建查询条件 and 查询
-        conditions = self._build_filter_conditions(filters)
-        if conditions:
-            sql = sql.where(*conditions)
-
-        # 动态构建排序条件
-        if sort_by:
-            # 遍历排序字段列表
-            for sort_field in sort_by:
-                # 判断排序方向
-                if sort_field.startswith('-'):
-                    # 降序
-                    field_name = sort_field[1:]
-                    if hasattr(self.model, field_name):
-                        sql = sql.order_by(desc(getattr(self.model, field_name)))
-                else:
-                    # 升序
-                    if hasattr(self.model, sort_field):
-                        sql = sql.order_by(asc(getattr(self.model, sort_field)))
-
-        # 添加limit(1)限制，确保只返回第一条记录
-        sql = sql.limit(1)
+        # 获取编译好的查询语句（查询条件 + 排序 + limit 1）
+        sql, params = self._get_filter_plan("one", filters, sort_by, columns)
 
         # 执行查询语句并返回查询结果对象
-        result = db_session.execute(sql)
+        result = db_session.execute(sql, params)
         # 从查询结果对象中获取单条记录（如果存在）
-        return result.scalar_one_or_none()
+        return self._fetch_one(result, columns, as_dict)
 
-    def get_list_by_filters(self,db_session: Session,filters: Dict = None,sort_by: List[str] = None) -> List[ModelType]:
+    def get_list_by_filters(self,db_session: Session,filters: Dict = None,sort_by: List[str] = None,
+                            columns: List[str] = None, as_dict: bool = False) -> List[ModelType]:
         """
         根据条件获取查询列表（支持条件过滤+排序）
             filters: 查询条件字典。例如 {"filed1": value1, "filed2": value2}
             sort_by: 排序字段，是一个字符串列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序。
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
 
-        # 初始化查询对象，选择模型的所有字段
-        sql = select(self.model)
-
-        # 动态构建查询条件 and 查询
-        conditions = self._build_filter_conditions(filters)
-        if conditions:
-            sql = sql.where(*conditions)
-
-        # 动态构建排序条件
-        if sort_by:
-            # 遍历排序字段列表
-            for sort_field in sort_by:
-                # 判断排序方向
-                if sort_field.startswith('-'):
-                    # 降序
-                    field_name = sort_field[1:]
-                    if hasattr(self.model, field_name):
-                        sql = sql.order_by(desc(getattr(self.model, field_name)))
-                else:
-                    # 升序
-                    if hasattr(self.model, sort_field):
-                        sql = sql.order_by(asc(getattr(self.model, sort_field)))
+        # 获取编译好的查询语句（查询条件 + 排序）
+        sql, params = self._get_filter_plan("list", filters, sort_by, columns)
 
         # 执行查询语句并返回查询结果对象
-        result = db_session.execute(sql)
+        result = db_session.execute(sql, params)
         # 从查询结果对象中获取所有记录
-        return result.scalars().all()
+        return self._fetch_all(result, columns, as_dict)
 
 
-    def get_page_list_by_filters(self,db_session: Session,page_num: int,page_size: int,filters: Dict = None,sort_by: List[str] = None) -> List[ModelType]:
+    def get_page_list_by_filters(self,db_session: Session,page_num: int,page_size: int,filters: Dict = None,sort_by: List[str] = None,
+                                 columns: List[str] = None, as_dict: bool = False) -> List[ModelType]:
         """
         根据条件获取分页查询列表（支持分页+条件过滤+排序）
             page_num: 页码
             page_size: 每页大小
             filters: 查询条件字典。例如 {"filed1": value1, "filed2": value2}
             sort_by: 排序字段，是一个字符串列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序。
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
 
-        # 初始化查询对象，选择模型的所有字段
-        sql = select(self.model)
-
-        # 动态构建查询条件 and 查询
-        conditions = self._build_filter_conditions(filters)
-        if conditions:
-            sql = sql.where(*conditions)
-
-        # 动态构建排序条件
-        if sort_by:
-            # 遍历排序字段列表
-            for sort_field in sort_by:
-                # 判断排序方向
-                if sort_field.startswith('-'):
-                    # 降序
-                    field_name = sort_field[1:]
-                    if hasattr(self.model, field_name):
-                        sql = sql.order_by(desc(getattr(self.model, field_name)))
-                else:
-                    # 升序
-                    if hasattr(self.model, sort_field):
-                        sql = sql.order_by(asc(getattr(self.model, sort_field)))
+        # 获取编译好的查询语句（查询条件 + 排序 + 分页参数）
+        sql, params = self._get_filter_plan("page", filters, sort_by, columns)
 
         # 计算分页偏移量
-        offset_value = (page_num - 1) * page_size
-        # 构建分页查询
-        sql = sql.offset(offset_value).limit(page_size)
+        params["_offset"] = (page_num - 1) * page_size
+        params["_limit"] = page_size
         # 执行查询语句并返回查询结果对象
-        result = db_session.execute(sql)
+        result = db_session.execute(sql, params)
         # 从查询结果对象中获取所有记录
-        return result.scalars().all()
+        return self._fetch_all(result, columns, as_dict)
 
 
     def add(self, db_session: Session, dict_data: Dict = None) -> ModelType:
@@ -265,6 +341,30 @@ class BaseDao(Generic[ModelType]):
         db_session.flush()
         return new_instance
 
+    def batch_add(self, db_session: Session, dict_list: List[Dict]) -> int:
+        """
+        批量添加新记录（一条INSERT语句 + executemany，不逐条flush）
+            dict_list: 新记录的字典数据列表
+        :return: 插入的记录数
+        """
+        if not dict_list:
+            return 0
+        # 构建SQLAlchemy 2.x的批量insert语句
+        db_session.execute(insert(self.model), dict_list)
+        return len(dict_list)
+
+    def batch_update_by_id(self, db_session: Session, dict_list: List[Dict]) -> int:
+        """
+        根据ID批量更新记录（ORM按主键批量UPDATE + executemany，不逐条查询、不逐条执行）
+            dict_list: 更新数据字典列表，每个字典必须包含id，其余字段原样更新（包括None值）
+                       字段相同的字典合并为同一条UPDATE语句执行
+        :return: 更新的记录数
+        """
+        if not dict_list:
+            return 0
+        db_session.execute(update(self.model), dict_list)
+        return len(dict_list)
+
     def update_by_id(self,db_session: Session,id: int,update_data: Dict = None) -> bool:
         """
         根据ID更新信息
@@ -362,4 +462,62 @@ class BaseDao(Generic[ModelType]):
 
         """
         result = db_session.execute(text(sql), params or {})
-        return result.scalar()
\ No newline at end of file
+        return result.scalar()
+
+
+if __name__ == '__main__':
+    import time
+
+    from sqlalchemy import create_engine, Integer, String
+    from sqlalchemy.orm import Mapped, MappedColumn, sessionmaker
+
+    # 基准测试：对比每次实时构建查询语句 与 复用编译好的查询计划 的单次调用耗时（SQLite内存数据库）
+    class BenchmarkModel(myBaseModel):
+        __tablename__ = 'benchmark_filter_plan'
+        id: Mapped[int] = MappedColumn(Integer, primary_key=True, autoincrement=True)
+        user_id: Mapped[int] = MappedColumn(Integer)
+        exam_id: Mapped[int] = MappedColumn(Integer)
+        type: Mapped[int] = MappedColumn(Integer)
+        name: Mapped[str] = MappedColumn(String(50))
+        status: Mapped[int] = MappedColumn(Integer)
+
+    engine = create_engine("sqlite://")
+    BenchmarkModel.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    dao = BaseDao(BenchmarkModel)
+    dao.batch_add(session, [{"user_id": i % 100, "exam_id": i % 7, "type": i % 2, "name": f"n{i}", "status": 0} for i in range(10000)])
+
+    # 与 DTO.model_dump() 生成的查询条件一致：包含大量值为None的字段
+    filters = {"id": None, "user_id": 7, "exam_id": 3, "type": 1, "name": None, "status": None, "name__like": None}
+    sort_by = ["-id"]
+    rounds = 5000
+
+    def run_uncached():
+        """每次调用都重新构建查询语句（相当于未使用查询计划缓存）"""
+        plan = dao._compile_filter_plan("one", dao._filter_shape(filters), sort_by)
+        return session.execute(plan.statement, plan.build_params(filters)).scalar_one_or_none()
+
+    def run_cached():
+        return dao.get_one_by_filters(session, filters, sort_by)
+
+    assert run_uncached().id == run_cached().id
+    # id为None时不能退化为无条件查询
+    assert dao.get_by_id(session, None) is None
+    assert dao.get_by_id(session, None, columns=["id", "name"]) is None
+    assert dao.update_by_id(session, None, {"name": "x"}) is False
+    for name, func_ in (("实时构建语句", run_uncached), ("复用查询计划", run_cached)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func_()
+        print(f"{name}：单次查询平均耗时 {(time.perf_counter() - start) * 1e6 / rounds:.1f} us")
+
+    # 只统计构建语句的耗时（不执行SQL）
+    start = time.perf_counter()
+    for _ in range(rounds):
+        dao._compile_filter_plan("one", dao._filter_shape(filters), sort_by).build_params(filters)
+    build_us = (time.perf_counter() - start) * 1e6 / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        dao._get_filter_plan("one", filters, sort_by)
+    cached_us = (time.perf_counter() - start) * 1e6 / rounds
+    print(f"构建查询语句：实时构建 {build_us:.1f} us，复用查询计划 {cached_us:.1f} us")
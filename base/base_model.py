@@ -1,9 +1,109 @@
 # config/database_config.py（2.x版基类定义）
+from operator import attrgetter, itemgetter
+
 from sqlalchemy.orm import DeclarativeBase, RelationshipProperty
-from sqlalchemy import inspect
+from sqlalchemy import Date, DateTime, inspect
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 
+from utils.datetime_util import DateTimeUtil
+
+# 字段序列化计划缓存：(模型类, 排除字段, date是否按datetime格式输出) -> ModelDictPlan
+_dict_plan_cache: Dict[tuple, "ModelDictPlan"] = {}
+
+
+def _convert_datetime_value(value: Any) -> Any:
+    """日期时间字段：datetime 格式化为 "%Y-%m-%d %H:%M:%S"，date 格式化为 "%Y-%m-%d" """
+    if isinstance(value, datetime):
+        return DateTimeUtil.format_datetime(value)
+    if isinstance(value, date):
+        return DateTimeUtil.format_date(value)
+    return value
+
+
+def _convert_datetime_value_full(value: Any) -> Any:
+    """日期时间字段：datetime 和 date 都格式化为 "%Y-%m-%d %H:%M:%S" """
+    if isinstance(value, date):
+        return DateTimeUtil.format_date_or_datetime(value)
+    return value
+
+
+class ModelDictPlan:
+    """
+    模型转字典的字段计划（每个模型类 + 排除字段组合只计算一次，多线程共享）
+    - keys：输出的字段名，按模型字段定义顺序
+    - converters：需要转换的字段（日期时间类型字段）及转换函数，其他类型字段直接输出
+    - deferred_keys：延迟加载的字段，未加载时不输出，避免每个实例额外触发一次查询
+    """
+    __slots__ = ("keys", "key_set", "converters", "deferred_keys", "_getter", "_dict_getter")
+
+    def __init__(self, model_cls: type, exclude: frozenset, date_as_datetime: bool = False):
+        converter = _convert_datetime_value_full if date_as_datetime else _convert_datetime_value
+        keys, converters, deferred_keys = [], [], []
+        for attr in inspect(model_cls).column_attrs:
+            if attr.key in exclude:
+                continue
+            keys.append(attr.key)
+            if isinstance(attr.columns[0].type, (DateTime, Date)):
+                converters.append((attr.key, converter))
+            if attr.deferred:
+                deferred_keys.append(attr.key)
+        self.keys = tuple(keys)
+        self.key_set = frozenset(keys)
+        self.converters = tuple(converters)
+        self.deferred_keys = frozenset(deferred_keys)
+        self._getter = self._build_getter(self.keys, attrgetter)
+        self._dict_getter = self._build_getter(self.keys, itemgetter)
+
+    @staticmethod
+    def _build_getter(keys: tuple, getter_factory=attrgetter):
+        """一次取出多个值，返回值元组（attrgetter按属性取值，itemgetter按字典key取值）"""
+        if not keys:
+            return lambda obj: ()
+        getter = getter_factory(*keys)
+        if len(keys) == 1:
+            return lambda obj: (getter(obj),)
+        return getter
+
+    @classmethod
+    def get(cls, model_cls: type, exclude_fields: Optional[List[str]] = None, date_as_datetime: bool = False) -> "ModelDictPlan":
+        """获取模型类的字段计划，排除字段会与模型类的 __dict_exclude_fields__ 合并"""
+        exclude = frozenset(exclude_fields or ()) | frozenset(getattr(model_cls, "__dict_exclude_fields__", ()))
+        cache_key = (model_cls, exclude, date_as_datetime)
+        plan = _dict_plan_cache.get(cache_key)
+        if plan is None:
+            plan = _dict_plan_cache[cache_key] = cls(model_cls, exclude, date_as_datetime)
+        return plan
+
+    def dump(self, instance: Any) -> Dict[str, Any]:
+        """模型实例转字典"""
+        if self.deferred_keys:
+            unloaded = inspect(instance).unloaded & self.deferred_keys
+            if unloaded:
+                # 存在未加载的延迟字段时，只输出已加载的字段
+                keys = tuple(key for key in self.keys if key not in unloaded)
+                result = dict(zip(keys, self._build_getter(keys)(instance)))
+                for key, converter in self.converters:
+                    if key in result:
+                        result[key] = converter(result[key])
+                return result
+
+        # 从数据库加载的实例，字段值都已在实例的 __dict__ 中，直接按key取值，不经过属性描述符；
+        # 否则（新建未保存的实例、已过期的字段）按属性取值，由SQLAlchemy处理默认值和加载
+        instance_dict = instance.__dict__
+        if instance_dict.keys() >= self.key_set:
+            result = dict(zip(self.keys, self._dict_getter(instance_dict)))
+        else:
+            result = dict(zip(self.keys, self._getter(instance)))
+        for key, converter in self.converters:
+            result[key] = converter(result[key])
+        return result
+
+    def dump_list(self, instances: List[Any]) -> List[Dict[str, Any]]:
+        """模型实例列表转字典列表（同一个模型类，一次遍历完成）"""
+        return [self.dump(instance) for instance in instances]
+
+
 # 2.x中 自定义数据库工具类，添加to_dict方法
 class myBaseModelUtil:
     """适配SQLAlchemy 2.x的自定义基类，带to_dict方法"""
@@ -16,34 +116,20 @@ class myBaseModelUtil:
     ) -> Dict[str, Any]:
         """
         2.x版模型实例转dict
-        :param exclude_fields: 排除字段列表，如['password', 'create_time']
+        :param exclude_fields: 排除字段列表，如['password', 'create_time']，会与模型类的 __dict_exclude_fields__ 合并
         :param include_relationships: 是否包含关联字段（默认不包含）
         :param _depth: 递归深度限制（内部参数，外部无需传），防循环引用
         """
         if _depth <= 0:
             return {"_hint": "recursion depth limit exceeded"}
 
-        exclude = exclude_fields or []
-        inspector = inspect(self)
-        result: Dict[str, Any] = {}
-
-        # 1. 处理表列字段（核心）
-        for attr in inspector.mapper.column_attrs:
-            attr_key = attr.key
-            if attr_key in exclude:
-                continue
-            value = getattr(self, attr_key, None)
-            # 区分date和datetime的格式化
-            if isinstance(value, datetime):
-                result[attr_key] = value.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(value, date):
-                result[attr_key] = value.strftime("%Y-%m-%d")
-            else:
-                result[attr_key] = value
+        # 1. 处理表列字段（核心）：按模型类缓存的字段计划输出，日期时间字段格式化为字符串
+        result: Dict[str, Any] = ModelDictPlan.get(type(self), exclude_fields).dump(self)
 
         # 2. 可选：处理关联字段（2.x中relationship属性通过mapper.relationships获取）
         if include_relationships and _depth > 0:
-            for rel in inspector.mapper.relationships:
+            exclude = list(exclude_fields or []) + list(getattr(self, "__dict_exclude_fields__", ()))
+            for rel in inspect(self).mapper.relationships:
                 rel_key = rel.key
                 if rel_key in exclude:
                     continue
@@ -77,6 +163,21 @@ class myBaseModelUtil:
 
         return result
 
+    @staticmethod
+    def to_dict_list(instances: List["myBaseModelUtil"], exclude_fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        模型实例列表转dict列表（不包含关联字段）
+        同一模型类的字段计划只获取一次，比逐个调用 to_dict 更快
+        :param instances: 模型实例列表
+        :param exclude_fields: 排除字段列表
+        """
+        if not instances:
+            return []
+        plan = ModelDictPlan.get(type(instances[0]), exclude_fields)
+        if all(type(instance) is type(instances[0]) for instance in instances):
+            return plan.dump_list(instances)
+        return [instance.to_dict(exclude_fields) for instance in instances]
+
 
 # 创建统一数据库模型基类
 class myBaseModel(DeclarativeBase, myBaseModelUtil):
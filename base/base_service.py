@@ -16,19 +16,23 @@ class BaseService(Generic[ModelType]):
         """
         self.dao = dao
 
-    def get_by_id(self, db_session: Session, id: int) -> Optional[ModelType]:
+    def get_by_id(self, db_session: Session, id: int, columns: List[str] = None, as_dict: bool = False) -> Optional[ModelType]:
         """
         根据ID获取单条记录（注意包含字段id）
             id: 记录ID
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        return self.dao.get_by_id(db_session, id)
+        return self.dao.get_by_id(db_session, id, columns, as_dict)
 
-    def get_list_by_ids(self, db_session: Session, ids: List[int]) -> List[ModelType]:
+    def get_list_by_ids(self, db_session: Session, ids: List[int], columns: List[str] = None, as_dict: bool = False) -> List[ModelType]:
         """
         根据ID列表获取多条记录（注意包含字段id）
             ids: 记录ID列表
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        return self.dao.get_list_by_ids(db_session, ids)
+        return self.dao.get_list_by_ids(db_session, ids, columns, as_dict)
 
     def get_total_by_filters(self, db_session: Session, filters: Dict = None) -> int:
         """
@@ -37,32 +41,41 @@ class BaseService(Generic[ModelType]):
         """
         return self.dao.get_total_by_filters(db_session, filters)
 
-    def get_one_by_filters(self, db_session: Session, filters: Dict = None,sort_by: List[str] = None) -> Optional[ModelType]:
+    def get_one_by_filters(self, db_session: Session, filters: Dict = None,sort_by: List[str] = None,
+                           columns: List[str] = None, as_dict: bool = False) -> Optional[ModelType]:
         """
         根据条件获取单条记录
             filters: 查询条件，字典类型。例如 {"filed1": value1, "filed2": value2}
             sort_by: 排序字段，是一个字符串列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
 
-        return self.dao.get_one_by_filters(db_session, filters, sort_by)
+        return self.dao.get_one_by_filters(db_session, filters, sort_by, columns, as_dict)
 
-    def get_list_by_filters(self,db_session: Session,filters: Dict = None,sort_by: List[str] = None) -> List[ModelType]:
+    def get_list_by_filters(self,db_session: Session,filters: Dict = None,sort_by: List[str] = None,
+                            columns: List[str] = None, as_dict: bool = False) -> List[ModelType]:
         """
         根据条件获取查询列表（支持条件过滤+排序）
             filters: 查询条件字典。例如 {"filed1": value1, "filed2": value2}
             sort_by: 排序字段，是一个字符串列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序。
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        return self.dao.get_list_by_filters(db_session, filters, sort_by)
+        return self.dao.get_list_by_filters(db_session, filters, sort_by, columns, as_dict)
 
-    def get_page_list_by_filters(self,db_session: Session,page_num: int,page_size: int,filters: Dict = None,sort_by: List[str] = None) -> List[ModelType]:
+    def get_page_list_by_filters(self,db_session: Session,page_num: int,page_size: int,filters: Dict = None,sort_by: List[str] = None,
+                                 columns: List[str] = None, as_dict: bool = False) -> List[ModelType]:
         """
         根据条件获取分页查询列表（支持分页+条件过滤+排序）
             page_num: 页码
             page_size: 每页大小
             filters: 查询条件字典。例如 {"filed1": value1, "filed2": value2}
             sort_by: 排序字段，是一个字符串列表。例如 ["field1", "-field2"] 表示按field1升序，按field2降序排序。
+            columns: 投影字段名列表，例如 ["id", "name"]。为空时返回模型实例，否则只查询这些字段，返回Row元组
+            as_dict: 指定columns时，是否将每行转换为字典
         """
-        return self.dao.get_page_list_by_filters(db_session, page_num, page_size, filters, sort_by)
+        return self.dao.get_page_list_by_filters(db_session, page_num, page_size, filters, sort_by, columns, as_dict)
 
     def add(self, db_session: Session, dict_data: Dict = None) -> ModelType:
         """
@@ -71,6 +84,20 @@ class BaseService(Generic[ModelType]):
         """
         return self.dao.add(db_session, dict_data)
 
+    def batch_add(self, db_session: Session, dict_list: List[Dict]) -> int:
+        """
+        批量添加新记录（一条INSERT语句）
+            dict_list: 新记录的字典数据列表
+        """
+        return self.dao.batch_add(db_session, dict_list)
+
+    def batch_update_by_id(self, db_session: Session, dict_list: List[Dict]) -> int:
+        """
+        根据ID批量更新记录（一条UPDATE语句 + executemany）
+            dict_list: 更新数据字典列表，每个字典必须包含id
+        """
+        return self.dao.batch_update_by_id(db_session, dict_list)
+
     def update_by_id(self,db_session: Session,id: int,update_data: Dict = None) -> bool:
         """
         根据ID更新信息
@@ -0,0 +1,84 @@
+# 考试模块相关配置
+import os
+
+# ============== 随机练习配置 ==============
+
+# 随机练习每次抽取的题目数量。题库题目数少于该数量时，抽取题库中的全部题目
+RANDOM_PRACTICE_QUESTION_COUNT: int = 50
+
+# 随机练习可以指定抽题数量的题目类型（1单选 2多选 3判断），与题目表的type字段对应
+RANDOM_PRACTICE_QUESTION_TYPES: tuple = (1, 2, 3)
+
+# 随机练习按用户错误率加权抽题的权重系数。题目权重 = 1 + 系数 * 错误率（做错次数/做题次数），
+# 未做过的题目错误率按0计算。例如系数为4时，错误率100%的题目被抽中的概率约为未做过题目的5倍
+RANDOM_PRACTICE_ERROR_WEIGHT: float = 4.0
+
+# ============== 题目缓存配置 ==============
+
+# 考试题目ID列表的进程内缓存有效期（秒）。导入题库时会主动失效本进程的缓存，
+# 多个worker进程之间不共享缓存，其他进程最多在该时长后加载到最新数据
+QUESTION_ID_CACHE_TTL_SECONDS: int = 600
+
+# 最多缓存的考试数量，超过后淘汰最久未访问的考试
+QUESTION_ID_CACHE_MAX_EXAMS: int = 1000
+
+# 题目（题目 + 选项）的进程内缓存有效期（秒）
+QUESTION_CACHE_TTL_SECONDS: int = 600
+
+# 最多缓存的题目数量，超过后淘汰最久未访问的题目
+QUESTION_CACHE_MAX_SIZE: int = 50000
+
+# 题目（题目 + 选项）序列化后JSON片段的进程内缓存有效期（秒）
+QUESTION_PAYLOAD_CACHE_TTL_SECONDS: int = 600
+
+# 最多缓存的题目JSON片段数量，超过后淘汰最久未访问的题目
+QUESTION_PAYLOAD_CACHE_MAX_SIZE: int = 50000
+
+# 每道题目最多缓存的序列化结果数量（响应格式 × 稀疏字段组合），超过后新的组合不再缓存，每次实时序列化
+QUESTION_PAYLOAD_CACHE_MAX_VARIANTS: int = 16
+
+# 题目类接口（模拟考试/随机练习/错题练习获取题目）响应的 Cache-Control。
+# no-cache 表示客户端可以缓存，但每次使用前需要携带 If-None-Match 重新验证，题目未变化时服务端返回304
+QUESTION_PAYLOAD_CACHE_CONTROL: str = "private, no-cache"
+
+# ============== 考试列表配置 ==============
+
+# 考试列表接口响应的 Cache-Control。考试列表变化不频繁，客户端可以直接使用60秒内的缓存
+EXAM_LIST_CACHE_CONTROL: str = "public, max-age=60"
+
+# ============== 顺序练习配置 ==============
+
+# 顺序练习窗口接口单次向前/向后最多返回的题目数量
+SEQUENCE_WINDOW_MAX_SIZE: int = 50
+
+# 用户测试记录 题目ID->位置 索引的进程内缓存有效期（秒）。测试记录的题目ID快照创建后不再变化，缓存无需主动失效
+USER_EXAM_INDEX_CACHE_TTL_SECONDS: int = 1800
+
+# 最多缓存的用户测试记录数量，超过后淘汰最久未访问的记录
+USER_EXAM_INDEX_CACHE_MAX_SIZE: int = 2000
+
+# ============== 测试历史记录配置 ==============
+
+# 顺序练习/模拟考试历史记录接口默认每页条数
+USER_EXAM_HISTORY_PAGE_SIZE: int = 20
+
+# 历史记录接口每页最大条数
+USER_EXAM_HISTORY_MAX_PAGE_SIZE: int = 100
+
+# ============== 离线练习配置 ==============
+
+# 离线练习包默认的题目数量
+OFFLINE_PRACTICE_QUESTION_COUNT: int = 50
+
+# 离线练习包最多的题目数量
+OFFLINE_PRACTICE_MAX_QUESTION_COUNT: int = 200
+
+# 一次同步最多上传的答案数量（离线时同一道题可以重复作答）
+OFFLINE_SYNC_MAX_ANSWER_COUNT: int = 1000
+
+# 离线练习包有效期（秒），过期后答案不能再同步
+OFFLINE_PACK_EXPIRE_SECONDS: int = 7 * 24 * 3600
+
+# 离线练习包令牌（答案密钥）的加密密钥，从环境变量 OFFLINE_PACK_SECRET_KEY 读取，不能写在代码中。
+# 至少16个字符，未配置时服务可以启动，但离线练习接口报错；多进程、多机部署时所有进程必须使用相同的值，修改后之前下载的练习包无法再同步
+OFFLINE_PACK_SECRET_KEY: str = os.environ.get("OFFLINE_PACK_SECRET_KEY", "")
@@ -0,0 +1,32 @@
+# HTTP响应相关配置
+
+# ============== 响应压缩配置 ==============
+
+# 响应体小于该大小（字节）时不压缩。小响应压缩后节省的流量很少，不值得消耗CPU
+COMPRESSION_MIN_SIZE: int = 1024
+
+# 可压缩的响应类型（Content-Type 前缀）
+COMPRESSION_CONTENT_TYPES: tuple = ("application/json", "application/msgpack", "text/")
+
+# 普通响应的gzip压缩级别（1-9）。每个响应都要压缩一次，使用速度和压缩率均衡的级别
+COMPRESSION_GZIP_LEVEL: int = 6
+
+# 普通响应的brotli压缩质量（0-11）
+COMPRESSION_BROTLI_QUALITY: int = 5
+
+# 带ETag的响应（内容不常变化，如题目列表）按 ETag+编码 缓存压缩结果，同一版本的内容只压缩一次，
+# 因此使用更高的压缩级别，用一次性的CPU开销换取更少的流量
+PRECOMPRESSED_GZIP_LEVEL: int = 9
+
+PRECOMPRESSED_BROTLI_QUALITY: int = 9
+
+# 压缩结果缓存的有效期（秒）
+PRECOMPRESSED_CACHE_TTL_SECONDS: int = 600
+
+# 最多缓存的压缩结果数量，超过后淘汰最久未访问的结果
+PRECOMPRESSED_CACHE_MAX_SIZE: int = 2000
+
+# ============== 批量请求配置 ==============
+
+# 一次批量请求最多包含的子请求数量。子请求在进程内并发执行（同步接口占用线程池），限制数量避免单个批量请求占满线程池
+BATCH_MAX_REQUESTS: int = 10
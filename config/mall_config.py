@@ -0,0 +1,40 @@
+# 商城模块相关配置
+
+# ============== 订单超时关闭配置 ==============
+
+# 待支付订单的超时时间（分钟）。创建时间超过该时长仍未支付的订单，会被定时任务自动关闭
+ORDER_EXPIRE_MINUTES: int = 30
+
+# 定时任务的执行间隔（秒）
+ORDER_EXPIRE_SWEEP_INTERVAL_SECONDS: int = 60
+
+# 每批处理的超时订单数量。每批只执行一次范围查询和一次UPDATE，避免长事务和大锁
+ORDER_EXPIRE_BATCH_SIZE: int = 500
+
+# 单次执行最多处理的批次数，防止积压过多时单次执行时间过长（剩余的订单在下一次执行时继续处理）
+ORDER_EXPIRE_MAX_BATCHES: int = 20
+
+# 关闭本地订单后，是否同时调用微信支付的关闭订单接口
+ORDER_EXPIRE_CLOSE_WECHAT_ORDER: bool = False
+
+# 调用微信支付关闭订单接口的并发线程数
+ORDER_EXPIRE_CLOSE_CONCURRENCY: int = 8
+
+# ============== 商品目录缓存配置 ==============
+
+# 商品目录进程内缓存的有效期（秒）。商品变更时会主动失效本进程的缓存，
+# 多个worker进程之间不共享缓存，其他进程最多在该时长后加载到最新数据
+PRODUCT_CATALOG_CACHE_TTL_SECONDS: int = 300
+
+# 商品列表接口响应的 Cache-Control。商品列表变化不频繁，客户端可以直接使用60秒内的缓存
+PRODUCT_LIST_CACHE_CONTROL: str = "public, max-age=60"
+
+# ============== 用户商品权益缓存配置 ==============
+
+# 用户已购商品集合的进程内缓存有效期（秒）。订单支付、退款时会主动刷新本进程的缓存，
+# 多个worker进程之间不共享缓存：权限检查未命中时总是重新查询数据库（支付后立即生效），
+# 其他进程退款后已缓存的权益最多保留该时长，因此有效期设置得较短
+ENTITLEMENT_CACHE_TTL_SECONDS: int = 30
+
+# 最多缓存的用户数量，超过后淘汰最久未访问的用户
+ENTITLEMENT_CACHE_MAX_USERS: int = 20000
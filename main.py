@@ -1,17 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 # 导入FastAPI
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from middlewares.auth_middleware import AuthMiddleware
+from middlewares.compression_middleware import CompressionMiddleware
 from middlewares.exception_middleware import ExceptionMiddleware
 from middlewares.logger_middleware import LoggerMiddleware
+from middlewares.response_format_middleware import ResponseFormatMiddleware
+from utils.response_util import NegotiatedResponse
+
+
+# 后台定时任务
+from module_mall.task.order_expire_task import run_order_expire_task
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时创建超时订单关闭任务，关闭时取消后台任务"""
+    order_expire_task = asyncio.create_task(run_order_expire_task())
+    try:
+        yield
+    finally:
+        order_expire_task.cancel()
+        try:
+            await order_expire_task
+        except asyncio.CancelledError:
+            pass
 
 
 # 创建FastAPI应用实例
 app = FastAPI(
     title="微信小程序服务API",
     description="微信小程序-测试系统后端API",
-    version="1.0.1"
+    version="1.0.1",
+    # 默认响应类：默认输出JSON，请求头 Accept 为 application/msgpack 时输出 MessagePack
+    default_response_class=NegotiatedResponse,
+    lifespan=lifespan,
 )
 
 # 全局异常处理中间件
@@ -20,8 +47,10 @@ app.middleware("http")(ExceptionMiddleware)
 app.middleware("http")(AuthMiddleware)
 # 日志中间件
 app.middleware("http")(LoggerMiddleware)
-# 添加 GZip 中间件，压缩大于 2000 字节的响应
-# app.add_middleware(GZipMiddleware, minimum_size=2000)
+# 响应格式协商中间件（JSON / MessagePack）
+app.middleware("http")(ResponseFormatMiddleware)
+# 响应压缩中间件，按 Accept-Encoding 协商 brotli/gzip，压缩大于 COMPRESSION_MIN_SIZE 字节的响应
+app.middleware("http")(CompressionMiddleware)
 
 # 注册CORS中间件
 app.add_middleware(
@@ -0,0 +1,50 @@
+from fastapi import Request
+from fastapi.responses import Response
+from typing import Callable
+
+from config import http_config
+from utils.cache_util import TTLCache
+from utils.compression_util import CompressionUtil
+
+# 带ETag响应的压缩结果缓存：(ETag, 编码) -> 压缩后的响应体。同一版本的内容只压缩一次
+precompressed_cache: TTLCache[bytes] = TTLCache(
+    ttl_seconds=http_config.PRECOMPRESSED_CACHE_TTL_SECONDS,
+    max_size=http_config.PRECOMPRESSED_CACHE_MAX_SIZE,
+)
+
+# 各压缩算法的压缩级别：(普通响应, 带ETag的缓存响应)
+_COMPRESSION_LEVELS = {
+    "gzip": (http_config.COMPRESSION_GZIP_LEVEL, http_config.PRECOMPRESSED_GZIP_LEVEL),
+    "br": (http_config.COMPRESSION_BROTLI_QUALITY, http_config.PRECOMPRESSED_BROTLI_QUALITY),
+}
+
+# 响应压缩中间件（按 Accept-Encoding 协商 brotli/gzip）
+async def CompressionMiddleware(request: Request, call_next: Callable):
+    response = await call_next(request)
+
+    # 只压缩成功的、可压缩类型的、未被压缩过的响应
+    encoding = CompressionUtil.choose_encoding(request.headers.get("accept-encoding"))
+    if (encoding is None or response.status_code != 200 or "content-encoding" in response.headers
+            or not response.headers.get("content-type", "").startswith(http_config.COMPRESSION_CONTENT_TYPES)):
+        return response
+
+    # 读取完整的响应体
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    if len(body) >= http_config.COMPRESSION_MIN_SIZE:
+        etag = response.headers.get("etag")
+        level, precompressed_level = _COMPRESSION_LEVELS[encoding]
+        if etag:
+            # 带ETag的响应：按 ETag+编码 缓存压缩结果。压缩后的内容与原始内容字节不同，ETag改为弱ETag（客户端带回时仍能匹配）
+            body = precompressed_cache.get_or_load((etag, encoding), lambda: CompressionUtil.compress(body, encoding, precompressed_level))
+            if not etag.startswith("W/"):
+                response.headers["etag"] = f"W/{etag}"
+        else:
+            body = CompressionUtil.compress(body, encoding, level)
+        response.headers["content-encoding"] = encoding
+        response.headers.add_vary_header("Accept-Encoding")
+
+    # 使用读取（压缩）后的响应体重新构建响应，保留原响应的所有响应头（包括重复的 set-cookie）
+    response.headers["content-length"] = str(len(body))
+    new_response = Response(content=body, status_code=response.status_code, background=response.background)
+    new_response.raw_headers = response.raw_headers
+    return new_response
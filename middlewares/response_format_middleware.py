@@ -0,0 +1,18 @@
+from fastapi import Request
+from typing import Callable
+
+from utils.response_util import negotiate_response_format, response_format_context
+
+# 响应格式协商中间件
+# 按请求头 Accept 确定本次请求的响应格式（默认JSON，Accept 为 application/msgpack 时使用 MessagePack），
+# 由 NegotiatedResponse / ResponseUtil 在序列化响应时读取
+async def ResponseFormatMiddleware(request: Request, call_next: Callable):
+    token = response_format_context.set(negotiate_response_format(request.headers.get("accept")))
+    try:
+        response = await call_next(request)
+    finally:
+        response_format_context.reset(token)
+
+    # 同一接口会按 Accept 返回不同格式的内容，缓存需要区分
+    response.headers.add_vary_header("Accept")
+    return response
@@ -0,0 +1,57 @@
+from typing import Dict, List, Tuple
+
+from config import exam_config
+from module_exam.dto.mp_question_dto import MpQuestionOptionDTO
+from utils.cache_util import TTLCache
+
+
+class QuestionCache:
+    """
+    题目进程内缓存
+    - 以题目ID为key缓存题目 + 选项DTO，按最久未访问淘汰
+    - 只负责存取，未命中的题目由 MpQuestionService 一次查询加载后写回
+    - 缓存有效期由 QUESTION_CACHE_TTL_SECONDS 控制
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        :param max_size: 最多缓存的题目数量
+        """
+        self._cache: TTLCache[MpQuestionOptionDTO] = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+
+    def get_many(self, question_ids: List[int]) -> Tuple[Dict[int, MpQuestionOptionDTO], List[int]]:
+        """
+        批量获取题目
+        :param question_ids: 题目ID列表
+        :return: (命中的 题目ID -> 题目DTO 字典, 未命中的题目ID列表)
+        """
+        hit_map: Dict[int, MpQuestionOptionDTO] = {}
+        missing_ids: List[int] = []
+        for question_id in question_ids:
+            question_option = self._cache.get(question_id)
+            if question_option is None:
+                missing_ids.append(question_id)
+            else:
+                hit_map[question_id] = question_option
+        return hit_map, missing_ids
+
+    def set_many(self, question_options: List[MpQuestionOptionDTO]):
+        """批量写入题目"""
+        for question_option in question_options:
+            self._cache.set(question_option.question.id, question_option)
+
+    def invalidate(self, question_id: int):
+        """失效某个题目的缓存"""
+        self._cache.pop(question_id)
+
+    def clear(self):
+        """清空缓存"""
+        self._cache.clear()
+
+
+# 全局单例，进程内共享
+question_cache = QuestionCache(
+    ttl_seconds=exam_config.QUESTION_CACHE_TTL_SECONDS,
+    max_size=exam_config.QUESTION_CACHE_MAX_SIZE,
+)
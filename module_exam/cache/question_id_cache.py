@@ -0,0 +1,96 @@
+import random
+from array import array
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import exam_config
+from module_exam.dao.mp_question_dao import MpQuestionDao
+from utils.cache_util import TTLCache
+
+
+class ExamQuestionPool:
+    """
+    某个考试的题目池（只读）
+    - question_ids：全部题目ID，array('I') 紧凑存储（每个ID占4字节）
+    - type_pools：题目类型 -> 该类型的题目ID（NumPy uint32数组，按id升序），用于按题型加权抽题
+    """
+    __slots__ = ("question_ids", "type_pools")
+
+    def __init__(self, rows):
+        """
+        :param rows: (id, type) 行列表，按id升序
+        """
+        ids = np.fromiter((row.id for row in rows), dtype=np.uint32, count=len(rows))
+        types = np.fromiter((row.type or 0 for row in rows), dtype=np.int16, count=len(rows))
+        self.question_ids = array('I', ids.tolist())
+        self.type_pools: Dict[int, np.ndarray] = {int(t): ids[types == t] for t in np.unique(types)}
+
+
+class QuestionIdCache:
+    """
+    考试题目ID进程内缓存
+    - 以考试为单位缓存正常状态(status=0)的题目池（见 ExamQuestionPool）
+    - 随机抽题只生成k个随机下标再取ID，耗时只与抽题数量有关，与题库大小无关
+    - 导入题库时调用 invalidate_on_commit 主动失效，缓存有效期由 QUESTION_ID_CACHE_TTL_SECONDS 控制
+    """
+
+    def __init__(self, ttl_seconds: int, max_exams: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        :param max_exams: 最多缓存的考试数量
+        """
+        self._cache: TTLCache[ExamQuestionPool] = TTLCache(ttl_seconds=ttl_seconds, max_size=max_exams)
+        self._question_dao = MpQuestionDao()
+
+    def get_pool(self, db_session: Session, exam_id: int) -> ExamQuestionPool:
+        """
+        获取考试的题目池
+        :param exam_id: 考试ID
+        :return: 题目池（只读，不要修改）
+        """
+        return self._cache.get_or_load(
+            exam_id,
+            lambda: ExamQuestionPool(self._question_dao.get_question_id_types_by_exam_id(db_session, exam_id, status=0)),
+        )
+
+    def get_question_ids(self, db_session: Session, exam_id: int) -> array:
+        """
+        获取考试下所有正常状态的题目ID
+        :param exam_id: 考试ID
+        :return: 题目ID数组（只读，不要修改）
+        """
+        return self.get_pool(db_session, exam_id).question_ids
+
+    def sample(self, db_session: Session, exam_id: int, count: int) -> List[int]:
+        """
+        从考试题库中随机抽取不重复的题目ID
+        :param exam_id: 考试ID
+        :param count: 抽取数量，题库题目数不足时抽取全部题目
+        :return: 随机顺序的题目ID列表
+        """
+        question_ids = self.get_question_ids(db_session, exam_id)
+        count = min(max(count, 0), len(question_ids))
+        # random.sample 对 range 抽样只生成count个下标，不会复制整个题库
+        return [question_ids[index] for index in random.sample(range(len(question_ids)), count)]
+
+    def invalidate(self, exam_id: int):
+        """立即失效某个考试的缓存，下一次访问时重新加载"""
+        self._cache.pop(exam_id)
+
+    def invalidate_on_commit(self, db_session: Session, exam_id: int):
+        """
+        失效某个考试的缓存，并在当前事务结束（提交或回滚）后再失效一次。
+        防止事务提交前有请求重新加载到旧数据。
+        """
+        self.invalidate(exam_id)
+        event.listen(db_session, "after_transaction_end", lambda session, transaction: self.invalidate(exam_id), once=True)
+
+
+# 全局单例，进程内共享
+question_id_cache = QuestionIdCache(
+    ttl_seconds=exam_config.QUESTION_ID_CACHE_TTL_SECONDS,
+    max_exams=exam_config.QUESTION_ID_CACHE_MAX_EXAMS,
+)
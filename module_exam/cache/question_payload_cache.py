@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional, Tuple
+
+from config import exam_config
+from module_exam.dto.mp_question_dto import MpQuestionOptionDTO
+from utils.cache_util import TTLCache
+from utils.field_select_util import FieldSelector
+from utils.response_util import RESPONSE_FORMAT_JSON, dumps
+
+
+class QuestionPayloadCache:
+    """
+    题目JSON片段进程内缓存
+    - 以题目ID为key，缓存 题目 + 选项DTO 在各个 (响应格式, 稀疏字段) 下序列化后的字节（JSON或MessagePack），按最久未访问淘汰
+    - 获取题目接口直接拼接缓存的片段作为响应，同一道题在每种 响应格式+稀疏字段 下只序列化一次
+    - 缓存有效期由 QUESTION_PAYLOAD_CACHE_TTL_SECONDS 控制，失效某个题目时同时失效它的所有序列化结果
+    - 稀疏字段按题目DTO的字段规范化（不存在的字段不计入），每道题目最多缓存 max_variants 种序列化结果，
+      客户端传入任意字段组合时缓存占用的内存也有上限
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int, max_variants: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        :param max_size: 最多缓存的题目数量
+        :param max_variants: 每道题目最多缓存的序列化结果数量
+        """
+        # 题目ID -> {(响应格式, 稀疏字段key): 序列化字节}
+        self._cache: TTLCache[Dict[Tuple[str, Optional[str]], bytes]] = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+        self._max_variants = max_variants
+
+    @staticmethod
+    def _variant(response_format: str, fields: Optional[FieldSelector]) -> Tuple[str, Optional[str]]:
+        """序列化结果的区分key：(响应格式, 按题目DTO规范化的稀疏字段key)，不指定稀疏字段时为None"""
+        return response_format, fields.model_key(MpQuestionOptionDTO) if fields is not None else None
+
+    def get_many(self, question_ids: List[int], response_format: str = RESPONSE_FORMAT_JSON,
+                 fields: FieldSelector = None) -> Tuple[Dict[int, bytes], List[int]]:
+        """
+        批量获取题目片段
+        :param question_ids: 题目ID列表
+        :param response_format: 响应格式
+        :param fields: 稀疏字段选择器，为None表示全部字段
+        :return: (命中的 题目ID -> 序列化字节 字典, 未命中的题目ID列表)
+        """
+        variant = self._variant(response_format, fields)
+        hit_map: Dict[int, bytes] = {}
+        missing_ids: List[int] = []
+        for question_id in question_ids:
+            payloads = self._cache.get(question_id)
+            payload = payloads.get(variant) if payloads is not None else None
+            if payload is None:
+                missing_ids.append(question_id)
+            else:
+                hit_map[question_id] = payload
+        return hit_map, missing_ids
+
+    def set_many(self, question_options: List[MpQuestionOptionDTO], response_format: str = RESPONSE_FORMAT_JSON,
+                 fields: FieldSelector = None) -> Dict[int, bytes]:
+        """
+        按响应格式（和稀疏字段）序列化并批量写入题目
+        :return: 题目ID -> 序列化字节 字典
+        """
+        variant = self._variant(response_format, fields)
+        payload_map: Dict[int, bytes] = {}
+        for question_option in question_options:
+            question_id = question_option.question.id
+            payload = dumps(fields.apply(question_option) if fields is not None else question_option, response_format)
+            payloads = self._cache.get(question_id)
+            if payloads is None:
+                self._cache.set(question_id, {variant: payload})
+            elif variant in payloads or len(payloads) < self._max_variants:
+                # 已缓存的题目只增加一种序列化结果，不延长缓存有效期；序列化结果数量已达上限时不再缓存
+                payloads[variant] = payload
+            payload_map[question_id] = payload
+        return payload_map
+
+    def invalidate(self, question_id: int):
+        """失效某个题目的缓存（所有序列化结果）"""
+        self._cache.pop(question_id)
+
+    def clear(self):
+        """清空缓存"""
+        self._cache.clear()
+
+
+# 全局单例，进程内共享
+question_payload_cache = QuestionPayloadCache(
+    ttl_seconds=exam_config.QUESTION_PAYLOAD_CACHE_TTL_SECONDS,
+    max_size=exam_config.QUESTION_PAYLOAD_CACHE_MAX_SIZE,
+    max_variants=exam_config.QUESTION_PAYLOAD_CACHE_MAX_VARIANTS,
+)
@@ -0,0 +1,93 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import exam_config
+from module_exam.dao.mp_user_exam_dao import MpUserExamDao
+from module_exam.model.mp_user_exam_model import MpUserExamModel
+from utils.cache_util import TTLCache
+
+
+class UserExamQuestionIndex:
+    """
+    某次用户测试记录的题目索引（只读）
+    - question_ids：题目ID快照，array('I') 紧凑存储
+    - 题目ID -> 位置：ID升序时（顺序练习）直接二分查找，不额外占用内存；否则（模拟考试）建立字典
+    """
+    __slots__ = ("question_ids", "_positions")
+
+    def __init__(self, question_ids: List[int]):
+        """
+        :param question_ids: 题目ID快照
+        """
+        self.question_ids = array('I', question_ids)
+        is_sorted = all(question_ids[i] < question_ids[i + 1] for i in range(len(question_ids) - 1))
+        self._positions: Optional[Dict[int, int]] = None if is_sorted else {
+            question_id: position for position, question_id in enumerate(question_ids)
+        }
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def position_of(self, question_id: int) -> Optional[int]:
+        """获取题目在快照中的位置（从0开始），不在快照中返回None"""
+        if self._positions is not None:
+            return self._positions.get(question_id)
+        position = bisect_left(self.question_ids, question_id)
+        if position < len(self.question_ids) and self.question_ids[position] == question_id:
+            return position
+        return None
+
+    def window(self, position: int, before: int, after: int) -> Tuple[int, List[int]]:
+        """
+        获取以position为中心的题目ID窗口
+        :param position: 中心位置
+        :param before: 向前取的题目数量
+        :param after: 向后取的题目数量
+        :return: (窗口起始位置, 窗口内的题目ID列表)
+        """
+        start = max(position - before, 0)
+        end = min(position + after + 1, len(self.question_ids))
+        return start, self.question_ids[start:end].tolist()
+
+
+class UserExamQuestionIndexCache:
+    """
+    用户测试记录题目索引进程内缓存
+    - 以用户测试记录ID为key，缓存题目ID快照和 题目ID->位置 索引
+    - 测试记录的题目ID快照创建后不再变化，缓存无需主动失效，按 USER_EXAM_INDEX_CACHE_TTL_SECONDS 过期
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        :param max_size: 最多缓存的测试记录数量
+        """
+        self._cache: TTLCache[UserExamQuestionIndex] = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+        self._user_exam_dao = MpUserExamDao()
+
+    def get(self, db_session: Session, user_exam_id: int, user_exam: MpUserExamModel = None) -> Optional[UserExamQuestionIndex]:
+        """
+        获取测试记录的题目索引
+        :param user_exam_id: 用户测试记录ID
+        :param user_exam: 已查询到的测试记录，缓存未命中时直接使用，不再查询数据库
+        :return: 题目索引，测试记录不存在时返回None
+        """
+        index = self._cache.get(user_exam_id)
+        if index is None:
+            if user_exam is None:
+                user_exam = self._user_exam_dao.get_by_id(db_session, user_exam_id)
+            if user_exam is None:
+                return None
+            index = UserExamQuestionIndex(user_exam.question_ids or [])
+            self._cache.set(user_exam_id, index)
+        return index
+
+
+# 全局单例，进程内共享
+user_exam_question_index_cache = UserExamQuestionIndexCache(
+    ttl_seconds=exam_config.USER_EXAM_INDEX_CACHE_TTL_SECONDS,
+    max_size=exam_config.USER_EXAM_INDEX_CACHE_MAX_SIZE,
+)
@@ -11,6 +11,8 @@ from module_exam.controller.login_controller import router as login_router
 from module_exam.controller.mp_exam_error_practice_controller import router as mp_exam_error_practice_router
 from module_exam.controller.mp_exam_sequence_practice_controller import router as mp_exam_sequence_practice_router
 from module_exam.controller.mp_exam_random_practice_controller import router as mp_exam_random_practice_router
+from module_exam.controller.mp_exam_offline_practice_controller import router as mp_exam_offline_practice_router
+from module_exam.controller.batch_controller import router as batch_router
 
 
 # 创建总路由实例
@@ -18,8 +20,9 @@ api_router = APIRouter()
 
 # 注册所有路由
 for router in [common_router, mp_exam_router, mp_exam_kaoshi_router, mp_exam_sequence_practice_router, mp_exam_random_practice_router,
+              mp_exam_offline_practice_router,
               mp_user_router, wx_router,login_router,mp_exam_error_practice_router,
-               excel_router]:
+               excel_router, batch_router]:
     # 通过include_router函数，把各个路由实例加入到FastAPI应用实例中,进行统一管理
     api_router.include_router(router)
 
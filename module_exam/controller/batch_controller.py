@@ -0,0 +1,39 @@
+from typing import List
+
+from fastapi import APIRouter, Body, Request
+
+from config.log_config import logger
+from utils.batch_util import BATCH_NESTED_SCOPE_KEY, BatchRequestItemDTO, BatchUtil
+from utils.response_util import ResponseUtil, ResponseDTO, dumps_raw_array, get_response_format
+
+# 创建路由实例
+router = APIRouter(tags=['批量请求接口'])
+
+"""
+批量请求接口：一次请求执行多个接口，减少小程序一个页面的多次请求往返
+1. requests 为子请求列表，每个子请求包含 id、method、path、body、headers、depends_on，最多 BATCH_MAX_REQUESTS 个
+2. 认证只对批量请求执行一次，子请求沿用批量请求的请求头（如 Authorization、Accept）
+3. 没有依赖关系的子请求并发执行；depends_on 中的子请求都成功后才执行，依赖的子请求失败时该子请求返回状态码424。
+   子请求失败：HTTP状态码>=400，或响应体中的 code 不是200（如参数校验不通过时 ResponseUtil.error 返回的 code=400）
+4. 返回 responses 列表，与 requests 顺序一致，每项包含 id、status（HTTP状态码）、etag、body（子请求的响应体）
+例如：[{"id": "history", "path": "/mp/exam/kaoshi/history", "body": {"user_id": 1, "exam_id": 1}},
+      {"id": "start", "path": "/mp/exam/kaoshi/start", "body": {"user_id": 1, "exam_id": 1}}]
+"""
+@router.post("/batch", response_model=ResponseDTO)
+async def batch(request: Request, requests: List[BatchRequestItemDTO] = Body(..., embed=True)):
+    logger.info(f"/batch, paths={[item.path for item in requests]}")
+
+    # 子请求不能再发起批量请求（防止逐层放大请求数量）
+    if request.scope.get(BATCH_NESTED_SCOPE_KEY):
+        return ResponseUtil.error(code=400, message="子请求不能是批量请求")
+
+    # 检查子请求列表
+    error_message = BatchUtil.validate(request, requests)
+    if error_message is not None:
+        return ResponseUtil.error(code=400, message=error_message)
+
+    # 执行所有子请求，子请求的响应体原样拼接
+    fragments = await BatchUtil.run(request, requests)
+    return ResponseUtil.raw_success(code=200, message="success", raw_data={
+        "responses": dumps_raw_array(fragments, get_response_format()),
+    })
@@ -6,6 +6,7 @@ import os
 from datetime import datetime
 
 from config.database_config import get_db_session
+from module_exam.cache.question_id_cache import question_id_cache
 from module_exam.dto.mp_exam_dto import MpExamDTO
 from module_exam.dto.mp_option_dto import MpOptionDTO
 from module_exam.dto.mp_question_dto import  MpQuestionDTO
@@ -93,6 +94,9 @@ async def importDataByExcel(exam_name: str = Body(...), file: UploadFile = File(
                     created_time=datetime.now(),
                 ).model_dump())
 
+        # 导入完成后失效该考试的题目ID缓存
+        question_id_cache.invalidate_on_commit(db_session, new_exam.id)
+
         return ResponseUtil.success(
             message="数据导入成功",
             data={
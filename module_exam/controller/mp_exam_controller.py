@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from sqlalchemy.orm import Session
 
+from config import exam_config
 from config.database_config import get_db_session
 
 from config.log_config import logger
@@ -29,7 +30,7 @@ MpUserExamOptionService_instance = MpUserExamOptionService()
 获取测试列表信息
 """
 @router.post("/getExamList")
-def getExamList(page_num:int=Body(...), page_size:int=Body(...),exam_name:str=Body(None),exam_tag:str=Body(None),db_session: Session = Depends(get_db_session)):
+def getExamList(request: Request, page_num:int=Body(...), page_size:int=Body(...),exam_name:str=Body(None),exam_tag:str=Body(None),db_session: Session = Depends(get_db_session)):
     logger.info(f'/mp/exam/getExamList, page_num = {page_num}, page_size = {page_size}, exam_name = {exam_name}, exam_tag = {exam_tag}')
     # 获取所有考试标签
     tagList:List[dict] = MpExamService_instance.get_exam_tags(db_session)
@@ -44,9 +45,9 @@ def getExamList(page_num:int=Body(...), page_size:int=Body(...),exam_name:str=Bo
     print(query_dict)
     examList:List[MpExamModel] = MpExamService_instance.get_page_list_by_filters(db_session, page_num=page_num, page_size=page_size, filters=query_dict)
 
-    # 响应结果
-    return ResponseUtil.success(code=200, message="success", data={
+    # 响应结果（带ETag和Cache-Control，列表未变化时返回304）
+    return ResponseUtil.etag_success(request, code=200, message="success", data={
         "tags": tagList,
         "exams": [MpExamCommonDTO.model_validate(exam) for exam in examList]
-    })
+    }, cache_control=exam_config.EXAM_LIST_CACHE_CONTROL)
 
@@ -1,20 +1,20 @@
 from datetime import datetime
-from typing import List
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from sqlalchemy.orm import Session
 
+from config import exam_config
 from config.database_config import get_db_session
 
 from config.log_config import logger
-from module_exam.dto.mp_question_dto import MpQuestionOptionDTO, MpQuestionOptionTraceDTO
-from module_exam.model.mp_user_question_ebbinghaus_track import MpUserQuestionEbbinghausTrackModel
+from module_exam.service.mp_error_book_service import MpErrorBookService
 from module_exam.service.mp_exam_service import MpExamService
 from module_exam.service.mp_option_service import MpOptionService
 from module_exam.service.mp_question_service import MpQuestionService
 from module_exam.service.mp_user_exam_service import MpUserExamService
 from module_exam.service.mp_user_exam_option_service import MpUserExamOptionService
 from module_exam.service.mp_user_question_ebbinghaus_track_service import MpUserQuestionEbbinghausTrackService
+from utils.field_select_util import FieldSelector
 from utils.response_util import ResponseUtil, ResponseDTO
 
 # 创建路由实例
@@ -26,50 +26,40 @@ MpQuestionService_instance = MpQuestionService()
 MpUserExamService_instance = MpUserExamService()
 MpUserExamOptionService_instance = MpUserExamOptionService()
 MpUserQuestionEbbinghausTrackService_instance = MpUserQuestionEbbinghausTrackService()
+MpErrorBookService_instance = MpErrorBookService()
 
 """
 错题练习相关接口
 """
 
 """
-根据题目ID从题目轨迹表中获取已做过且错过的题目信息
+分页获取用户在某个考试中已做过且错过的题目（题目 + 选项 + 做错/做对/总次数）
+sort_by: error_count 按做错次数倒序（默认）；recent 按最后答题时间倒序
+fields: 稀疏字段（可选），相对于每道错题，如 "question.id,question.name,options.content,error_count"；不传返回全部字段
 """
 @router.post("/getQuestion", response_model=ResponseDTO)
-def getQuestion(exam_id: int = Body(..., embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/error/practice/getQuestion, exam_id={exam_id}")
+def getQuestion(request: Request, user_id: int = Body(..., embed=True), exam_id: int = Body(..., embed=True),
+                page_num: int = Body(1, embed=True), page_size: int = Body(20, embed=True),
+                sort_by: str = Body("error_count", embed=True), fields: str = Body(None, embed=True),
+                db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/error/practice/getQuestion, user_id={user_id}, exam_id={exam_id}, page_num={page_num}, page_size={page_size}, sort_by={sort_by}, fields={fields}")
+    field_selector = FieldSelector.parse(fields)
+
+    # 限制每页大小
+    page_size = min(max(page_size, 1), 100)
 
     # 开启事务管理
     with db_session.begin():
-        # 查询用户已做过且错过的题目ID列表
-        errorQuestions: List[MpUserQuestionEbbinghausTrackModel] = MpUserQuestionEbbinghausTrackService_instance.find_missed_question_ids(db_session, exam_id=exam_id)
-
-        # 检查用户已做过且错过的题目是否存在
-        if errorQuestions is None or len(errorQuestions) == 0:
-            return ResponseUtil.success(code=200, message="success", data=[])
-        else:
-            # 获取题目ID，并根据题目ID查询题目 + 选项
-            question_ids: List[int] = [item.question_id for item in errorQuestions]
-            # 查询题目 + 选项
-            question_option_dto: List[MpQuestionOptionDTO] = MpQuestionService_instance.get_questions_with_options_by_questionids(db_session, question_ids=question_ids)
-
-            #遍历，添加错误次数，正确次数，和做题总次数
-            question_option_trace_dto: List[MpQuestionOptionTraceDTO] = []
-            for item in question_option_dto:
-                # 创建MpQuestionOptionTraceDTO实例
-                trace_item = MpQuestionOptionTraceDTO(
-                    question=item.question,
-                    options=item.options,
-                    error_count=0,
-                    correct_count=0,
-                    total_count=0
-                )
-                trace_item.error_count = next((track.error_count for track in errorQuestions if track.question_id == item.question.id), 0)
-                trace_item.correct_count = next((track.correct_count for track in errorQuestions if track.question_id == item.question.id), 0)
-                trace_item.total_count = next((track.total_count for track in errorQuestions if track.question_id == item.question.id), 0)
-                # 添加到结果列表
-                question_option_trace_dto.append(trace_item)
+        # 按 (user_id, exam_id) 分页查询错题，并合并题目 + 选项
+        question_option_trace_dto, total = MpErrorBookService_instance.get_error_question_page(
+            db_session, user_id=user_id, exam_id=exam_id, page_num=page_num, page_size=page_size, sort_by=sort_by,
+            fields=field_selector
+        )
 
-            # 返回结果
-            return ResponseUtil.success(code=200, message="success", data={
-                "questions": [item.model_dump() for item in question_option_trace_dto],
-            })
+        # 返回结果（带ETag，错题及答题统计未变化时返回304）
+        return ResponseUtil.etag_success(request, code=200, message="success", data={
+            "questions": field_selector.apply(question_option_trace_dto) if field_selector else question_option_trace_dto,
+            "total": total,
+            "page_num": page_num,
+            "page_size": page_size,
+        }, cache_control=exam_config.QUESTION_PAYLOAD_CACHE_CONTROL)
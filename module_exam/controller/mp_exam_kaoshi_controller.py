@@ -1,15 +1,16 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from sqlalchemy.orm import Session
 
+from config import exam_config
 from config.database_config import get_db_session
 
 from config.log_config import logger
 from module_exam.dto.mp_exam_dto import MpExamDTO
 from module_exam.dto.mp_option_dto import MpOptionDTO
-from module_exam.dto.mp_question_dto import MpQuestionOptionDTO, MpQuestionDTO
+from module_exam.dto.mp_question_dto import MpQuestionDTO
 from module_exam.dto.mp_user_exam_dto import MpUserExamDTO
 from module_exam.dto.mp_user_exam_option_dto import MpUserExamOptionDTO
 from module_exam.model.mp_exam_model import MpExamModel
@@ -19,8 +20,11 @@ from module_exam.service.mp_option_service import MpOptionService
 from module_exam.service.mp_question_service import MpQuestionService
 from module_exam.service.mp_user_exam_service import MpUserExamService
 from module_exam.service.mp_user_exam_option_service import MpUserExamOptionService
+from module_exam.service.mp_user_exam_result_service import MpUserExamResultService
 from module_exam.service.mp_user_question_ebbinghaus_track_service import MpUserQuestionEbbinghausTrackService
-from utils.response_util import ResponseUtil,ResponseDTO
+from utils.datetime_util import DateTimeUtil
+from utils.field_select_util import FieldSelector
+from utils.response_util import ResponseUtil,ResponseDTO,get_response_format
 
 # 创建路由实例
 router = APIRouter(prefix='/mp/exam/kaoshi', tags=['mp_exam_kaoshi接口'])
@@ -30,6 +34,7 @@ MpOptionService_instance = MpOptionService()
 MpQuestionService_instance = MpQuestionService()
 MpUserExamService_instance = MpUserExamService()
 MpUserExamOptionService_instance = MpUserExamOptionService()
+MpUserExamResultService_instance = MpUserExamResultService()
 MpUserQuestionEbbinghausTrackService_instance = MpUserQuestionEbbinghausTrackService()
 
 """
@@ -37,26 +42,42 @@ MpUserQuestionEbbinghausTrackService_instance = MpUserQuestionEbbinghausTrackSer
 """
 
 """
-获取该用户对应的模拟考试历史记录
+获取该用户对应的模拟考试历史记录（按id降序分页）
+1. 第一页不传cursor，之后每页传入上一页返回的next_cursor，next_cursor为空表示没有更多数据
+2. 只查询摘要字段（不返回题目ID快照），正确率在SQL中计算
 """
 @router.post("/history", response_model=ResponseDTO)
-def history(user_id: int = Body(..., embed=True), exam_id: int = Body(..., embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/kaoshi/history, user_id={user_id}, exam_id={exam_id}")
-
-    # 查询用户模拟考试历史记录,id降序
-    user_exam_history: List[MpUserExamModel] = MpUserExamService_instance.get_list_by_filters(db_session, filters=MpUserExamDTO(
-        user_id=user_id,
-        exam_id=exam_id,
-        type=1,
-    ).model_dump(),sort_by=["-id"])
+def history(user_id: int = Body(..., embed=True), exam_id: int = Body(..., embed=True),
+            page_size: int = Body(exam_config.USER_EXAM_HISTORY_PAGE_SIZE, embed=True),
+            cursor: int = Body(None, embed=True),
+            db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/kaoshi/history, user_id={user_id}, exam_id={exam_id}, page_size={page_size}, cursor={cursor}")
+
+    # 限制每页大小
+    page_size = min(max(page_size, 1), exam_config.USER_EXAM_HISTORY_MAX_PAGE_SIZE)
+    # 查询用户模拟考试历史记录摘要,id降序
+    history_rows, next_cursor = MpUserExamService_instance.get_history_page(
+        db_session, user_id=user_id, exam_id=exam_id, user_exam_type=1, page_size=page_size, cursor=cursor,
+    )
 
     # 根据exam_id 获取考试信息
     exam_result: MpExamModel = MpExamService_instance.get_one_by_filters(db_session, filters=MpExamDTO(id=exam_id).model_dump())
 
+    # 摘要行转换为字典，时间字段格式与 to_dict() 一致
+    history_list = []
+    for row in history_rows:
+        item = row._asdict()
+        item["accuracy"] = float(row.accuracy)
+        item["create_time"] = DateTimeUtil.format_datetime(row.create_time) if row.create_time else None
+        item["finish_time"] = DateTimeUtil.format_datetime(row.finish_time) if row.finish_time else None
+        history_list.append(item)
+
     # 返回结果
-    return ResponseUtil.success(code=200, message="success", data={
-        "exam_info": exam_result.to_dict(),  # to_dict() 方法将模型转换为字典
-        "user_exam_history": [exam.to_dict() for exam in user_exam_history],  # to_dict() 方法将模型转换为字典
+    return ResponseUtil.fast_success(code=200, message="success", data={
+        "exam_info": exam_result.to_dict() if exam_result else None,  # to_dict() 方法将模型转换为字典
+        "user_exam_history": history_list,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
     })
 
 """
@@ -175,10 +196,12 @@ def start(exam_id: int = Body(..., embed=True),user_id: int = Body(..., embed=Tr
 """
 根据题目ID获取题目信息（包含选项），以及该题目的答题信息。
 - 模拟考试中获取题目是一次性获取所有题目，而不是每次获取一个题目。
+- fields: 稀疏字段（可选），相对于每道题目，如 "question.id,question.name,question.type,options.id,options.content"；不传返回全部字段
 """
 @router.post("/getQuestion", response_model=ResponseDTO)
-def getQuestion(user_exam_id: int = Body(..., embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/kaoshi/getQuestion, user_exam_id={user_exam_id}")
+def getQuestion(request: Request, user_exam_id: int = Body(..., embed=True), fields: str = Body(None, embed=True),
+                db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/kaoshi/getQuestion, user_exam_id={user_exam_id}, fields={fields}")
 
     # 开启事务管理
     with db_session.begin():
@@ -194,22 +217,24 @@ def getQuestion(user_exam_id: int = Body(..., embed=True), db_session: Session =
         # 获取用户考试记录中的所有题目ID列表
         question_ids:List[int] = user_exam.question_ids
 
-        # 查询题目 + 选项
-        question_option_dto: List[MpQuestionOptionDTO] = MpQuestionService_instance.get_questions_with_options_by_questionids(db_session, question_ids=question_ids)
-        if question_option_dto is None or len(question_option_dto) == 0:
+        # 查询题目 + 选项（按协商的响应格式序列化好的数组，优先从题目片段缓存读取）
+        questions_payload, question_count = MpQuestionService_instance.get_questions_payload(
+            db_session, question_ids=question_ids, response_format=get_response_format(), fields=FieldSelector.parse(fields)
+        )
+        if question_count == 0:
             return ResponseUtil.error(code=400, message="题目数据不存在")
 
-        # 返回结果
-        return ResponseUtil.success(code=200, message="success", data={
+        # 返回结果（带ETag，客户端重新打开同一份试卷且题目未变化时返回304）
+        return ResponseUtil.etag_success(request, code=200, message="success", data={
             "user_exam_id": user_exam.id,
-            "questions": [item.model_dump() for item in question_option_dto],
-        })
+        }, raw_data={"questions": questions_payload}, cache_control=exam_config.QUESTION_PAYLOAD_CACHE_CONTROL)
 
 """
 提交模拟考试答案(模拟考试只有题目全部做完，才能交卷)
 1. 模拟考试答题数据是一起提交的。
 2. 答题数据是一个Map，key是题目id，value是用户选择的选项id列表。单选多选都是题目id列表。
 4. user_exam_id 和 answer_map 不能为空，否则报422错误
+5. 已交卷的模拟考试不能重复提交，报400错误
 
 {question_id: [option_id], question_id: [option_id1, option_id2]}
 """
@@ -229,13 +254,12 @@ def submitAnswerMap(user_exam_id: int = Body(..., embed=True),answer_map: dict =
         # 检查用户是否有未完成的模拟考试记录
         if user_exam is None:
             return ResponseUtil.error(code=400, message="用户模拟考试记录不存在")
+        # 已交卷的模拟考试不能重复提交（答题记录、答对/答错题目数和结果快照都以第一次交卷为准）
+        if user_exam.finish_time is not None:
+            return ResponseUtil.error(code=400, message="当前模拟考试已交卷")
 
-        # 初始化答对题目数为0
-        correct_count = 0
-        # 初始化答错题目数为0
-        error_count = 0
-        
-        # 遍历answerMap,保存用户选项并计算答对题目数
+        # 先校验全部答案（选项格式、题目是否存在），校验不通过时不写入任何数据
+        question_map = {}
         for qid_str, user_option_ids in answer_map.items():
             # Body 传 dict 时 key 可能是 str，这里统一转 int
             question_id = int(qid_str)
@@ -246,17 +270,31 @@ def submitAnswerMap(user_exam_id: int = Body(..., embed=True),answer_map: dict =
             if question_one is None:
                 return ResponseUtil.error(code=400, message=f"题目不存在,question_id={question_id}")
 
-            # 处理用户选项答案，若是单选，转换为列表格式。
-            if isinstance(user_option_ids, list):
-                user_answer_ids = user_option_ids
-            else:
+            # 检查用户选项答案格式，单选多选都必须是列表
+            if not isinstance(user_option_ids, list):
                 return ResponseUtil.error(code=422, message=f"选项格式错误,user_option_ids={user_option_ids}")
+            question_map[question_id] = question_one
 
+        # 标记为已交卷（条件更新），并发重复提交时只有一个请求能继续写入答题记录
+        if not MpUserExamService_instance.mark_finished(db_session, user_exam.id):
+            return ResponseUtil.error(code=400, message="当前模拟考试已交卷")
+
+        # 初始化答对题目数为0
+        correct_count = 0
+        # 初始化答错题目数为0
+        error_count = 0
+        
+        # 遍历answerMap,保存用户选项并计算答对题目数
+        for qid_str, user_option_ids in answer_map.items():
+            question_id = int(qid_str)
+            question_one = question_map[question_id]
+            user_answer_ids = user_option_ids
 
             # 根据question_id 查询题目对应的正确选项
             right_options = MpOptionService_instance.get_list_by_filters(
                 db_session,
                 filters=MpOptionDTO(question_id=question_id, is_right=1, status=0).model_dump(),
+                columns=["id"],  # 只需要选项id
             )
             # 题目对应的正确选项id列表
             right_option_ids = [opt.id for opt in right_options]
@@ -286,11 +324,17 @@ def submitAnswerMap(user_exam_id: int = Body(..., embed=True),answer_map: dict =
             MpUserQuestionEbbinghausTrackService_instance.update_question_track(db_session=db_session
                 ,user_id=user_exam.user_id,exam_id=user_exam.exam_id,question_id=question_id,question_type=question_one.type,is_correct=is_correct)
 
-        # 更新用户测试记录
-        user_exam.correct_count = correct_count
-        user_exam.error_count = error_count
-        user_exam.finish_time = datetime.now()
-        MpUserExamService_instance.update_by_id(db_session, id=user_exam.id, update_data=user_exam.to_dict())
+        # 更新用户测试记录（只更新变化的字段，不重写题目ID快照；完成时间已在交卷开始时设置）
+        MpUserExamService_instance.update_by_id(db_session, id=user_exam.id, update_data={
+            "correct_count": correct_count,
+            "error_count": error_count,
+        })
+
+        # 交卷时生成结果快照，之后查看结果只需一次主键查询
+        db_session.refresh(user_exam)
+        mp_exam = MpExamService_instance.get_by_id(db_session, user_exam.exam_id)
+        result = MpUserExamResultService_instance.build_result(db_session, user_exam, mp_exam.name if mp_exam else None)
+        MpUserExamResultService_instance.save_snapshot(db_session, user_exam, result)
 
         return ResponseUtil.success(code=200, message="success")
 
@@ -301,115 +345,50 @@ def submitAnswerMap(user_exam_id: int = Body(..., embed=True),answer_map: dict =
 1. user_exam_id 不能为空，否则报422错误
 2. 若用户模拟考试记录不存在，报400错误
 3. 若用户模拟考试记录存在，返回用户模拟考试结果，包含答对题数、总题数、正确率、错误题数。
+4. fields: 稀疏字段（可选），相对于 question_detail_list 中的每道题目，如 "question_id,is_correct"；汇总字段始终返回
 """
 @router.post("/kaoshiResult",response_model=ResponseDTO)
-def kaoshiResult(user_id: int = Body(..., embed=True),user_exam_id: int = Body(..., embed=True),db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/kaoshi/result,user_id={user_id}, user_exam_id={user_exam_id}")
-
-    # 根据user_exam_id 查询用户测试记录
-    user_exam = MpUserExamService_instance.get_one_by_filters(
-        db_session,
-        filters=MpUserExamDTO(id=user_exam_id,user_id=user_id).model_dump(),
-    )
+def kaoshiResult(user_id: int = Body(..., embed=True),user_exam_id: int = Body(..., embed=True),
+                 fields: str = Body(None, embed=True), db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/kaoshi/result,user_id={user_id}, user_exam_id={user_exam_id}, fields={fields}")
+    field_selector = FieldSelector.parse(fields)
 
-    if user_exam is None:
-        return ResponseUtil.error(code=400, message="用户模拟考试记录不存在")
-
-    # 查询模拟考试信息
-    mp_exam = MpExamService_instance.get_one_by_filters(
-        db_session,
-        filters=MpExamDTO(id=user_exam.exam_id).model_dump(),
-    )
-
-    if user_exam is None:
-        return ResponseUtil.error(code=500, message="用户模拟考试记录不存在")
-
-    if user_exam.finish_time is None:
-        return ResponseUtil.error(code=500, message="用户模拟考试未完成")
-
-    if mp_exam is None:
-        return ResponseUtil.error(code=500, message="模拟考试记录不存在")
-
-    # 计算正确率（百分比，保留2位小数）
-    accuracy_rate = round((user_exam.correct_count / user_exam.total_count * 100), 2) if user_exam.total_count > 0 else 0.0
-
-    logger.info(f"用户模拟考试提交完成，user_exam_id={user_exam_id}, 答对题数={user_exam.correct_count}, 总题数={user_exam.total_count}, 正确率={accuracy_rate}%")
-
-    # 获取题目答题详情信息
-    question_details = []
-    question_ids = user_exam.question_ids if user_exam.question_ids else []
-
-    # 一次性获取所有问题及其选项
-    question_option_dtos: List[MpQuestionOptionDTO] = MpQuestionService_instance.get_questions_with_options_by_questionids(db_session, question_ids=question_ids)
-
-    # 创建问题ID到选项信息的映射
-    question_options_map = {}
-    for qod in question_option_dtos:
-        # 创建选项ID到文本的映射
-        option_map = {opt.id: opt.content for opt in qod.options}
-        question_options_map[qod.question.id] = {
-            "question": qod.question,
-            "option_map": option_map
-        }
-
-    for question_id in question_ids:
-        if question_id not in question_options_map:
-            logger.warning(f"question_id={question_id} 不存在，跳过")
-            continue
-
-        # 获取问题和选项映射
-        question_info = question_options_map[question_id]
-        question = question_info["question"]
-        option_map = question_info["option_map"]
+    # 开启事务管理
+    with db_session.begin():
+        # 已完成的模拟考试结果不再变化，优先读取结果快照（一次主键查询）
+        result = MpUserExamResultService_instance.get_snapshot(db_session, user_exam_id=user_exam_id, user_id=user_id, user_exam_type=1)
+        if result is not None:
+            if field_selector:
+                result = {**result, "question_detail_list": field_selector.apply(result["question_detail_list"])}
+            return ResponseUtil.fast_success(code=200, message="success", data=result)
 
-        # 查询用户答案
-        user_option_record = MpUserExamOptionService_instance.get_one_by_filters(
+        # 根据user_exam_id 查询用户测试记录
+        user_exam = MpUserExamService_instance.get_one_by_filters(
             db_session,
-            filters=MpUserExamOptionDTO(user_exam_id=user_exam_id, question_id=question_id).model_dump()
+            filters=MpUserExamDTO(id=user_exam_id,user_id=user_id,type=1).model_dump(),
         )
-        user_answer = user_option_record.option_ids if user_option_record else None
-        # 统一处理用户答案格式（转为列表）
-        if user_answer is not None:
-            user_answer_ids = user_answer if isinstance(user_answer, list) else [user_answer]
-        else:
-            user_answer_ids = []
 
-        # 将用户答案ID转换为文本
-        user_answer_texts = [option_map[opt_id] for opt_id in user_answer_ids if opt_id in option_map]
+        if user_exam is None:
+            return ResponseUtil.error(code=400, message="用户模拟考试记录不存在")
 
-        # 查询正确答案
-        right_options = MpOptionService_instance.get_list_by_filters(
+        # 查询模拟考试信息
+        mp_exam = MpExamService_instance.get_one_by_filters(
             db_session,
-            filters=MpOptionDTO(question_id=question_id, is_right=1, status=0).model_dump(),
+            filters=MpExamDTO(id=user_exam.exam_id).model_dump(),
         )
-        correct_answer_ids = [opt.id for opt in right_options]
-
-        # 将正确答案ID转换为文本
-        correct_answer_texts = [option_map[opt_id] for opt_id in correct_answer_ids if opt_id in option_map]
-
-        # 判断是否答对（集合比较）
-        is_correct = (set(correct_answer_ids) == set(user_answer_ids))
-
-        # 构建题目详情
-        question_details.append({
-            "question_id": question.id,
-            "question_type": question.type,
-            "question_type_name": question.type_name,
-            "question_name": question.name,
-            "user_answer_text": user_answer_texts,
-            "correct_answer_text": correct_answer_texts,
-            "is_correct": 1 if is_correct else 0,
-        })
 
-    return ResponseUtil.success(code=200, message="success", data={
-        "user_exam_id": user_exam.id,
-        "exam_id": user_exam.exam_id,
-        "exam_name": mp_exam.name,
-        "user_id": user_exam.user_id,
-        "correct_count": user_exam.correct_count,
-        "total_count": user_exam.total_count,
-        "accuracy_rate": accuracy_rate,
-        "error_count": user_exam.total_count - user_exam.correct_count,
-        "question_detail_list": question_details,
-    })
+        if user_exam.finish_time is None:
+            return ResponseUtil.error(code=500, message="用户模拟考试未完成")
+
+        if mp_exam is None:
+            return ResponseUtil.error(code=500, message="模拟考试记录不存在")
+
+        # 没有快照的历史记录：计算一次结果并保存快照
+        result = MpUserExamResultService_instance.build_result(db_session, user_exam, mp_exam.name)
+        MpUserExamResultService_instance.save_snapshot(db_session, user_exam, result)
+
+        logger.info(f"用户模拟考试结果快照已生成，user_exam_id={user_exam_id}, 答对题数={result['correct_count']}, 总题数={result['total_count']}, 正确率={result['accuracy_rate']}%")
 
+        if field_selector:
+            result = {**result, "question_detail_list": field_selector.apply(result["question_detail_list"])}
+        return ResponseUtil.fast_success(code=200, message="success", data=result)
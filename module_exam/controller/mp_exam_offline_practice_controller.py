@@ -0,0 +1,146 @@
+import time
+from typing import List
+
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import exam_config
+from config.database_config import get_db_session
+
+from config.log_config import logger
+from module_exam.cache.user_exam_question_index_cache import user_exam_question_index_cache
+from module_exam.dto.mp_offline_practice_dto import MpOfflineAnswerDTO
+from module_exam.model.mp_user_exam_model import MpUserExamModel
+from module_exam.service.mp_offline_practice_service import MpOfflinePracticeService
+from module_exam.service.mp_random_practice_service import MpRandomPracticeService
+from module_exam.service.mp_user_exam_service import MpUserExamService
+from utils.offline_pack_util import OfflinePackUtil
+from utils.response_util import ResponseUtil, ResponseDTO, get_response_format
+
+# 创建路由实例
+router = APIRouter(prefix='/mp/exam/offline/practice', tags=['离线练习接口'])
+# 创建服务实例
+MpOfflinePracticeService_instance = MpOfflinePracticeService()
+MpRandomPracticeService_instance = MpRandomPracticeService()
+MpUserExamService_instance = MpUserExamService()
+
+"""
+离线练习相关接口
+客户端一次下载一批题目（离线练习包），离线答题后一次上传全部答案，不再每答一题请求一次 submitAnswer
+未配置环境变量 OFFLINE_PACK_SECRET_KEY 时服务正常启动，离线练习接口报500错误
+"""
+
+"""
+下载离线练习包
+1. 传 user_exam_id 时为顺序练习：从 question_id（为空时为练习记录的当前题目）开始，按练习记录的题目顺序取 question_count 道题
+2. 不传 user_exam_id 时为随机练习：按用户的错误率加权，从 exam_id 的题库中随机抽取 question_count 道题
+3. question_count 为空时取 OFFLINE_PRACTICE_QUESTION_COUNT 道，最多 OFFLINE_PRACTICE_MAX_QUESTION_COUNT 道
+4. 返回 questions（不含选项是否正确、题目解析）和 pack_token（加密的答案密钥，客户端原样保存，同步答案时带上）
+"""
+@router.post("/getPack", response_model=ResponseDTO)
+def getPack(user_id: int = Body(..., embed=True), exam_id: int = Body(None, embed=True), user_exam_id: int = Body(None, embed=True),
+            question_id: int = Body(None, embed=True), question_count: int = Body(None, embed=True),
+            db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/offline/practice/getPack, user_id={user_id}, exam_id={exam_id}, user_exam_id={user_exam_id}, question_id={question_id}, question_count={question_count}")
+    if not OfflinePackUtil.is_configured():
+        logger.error("未配置环境变量 OFFLINE_PACK_SECRET_KEY，离线练习接口不可用")
+        return ResponseUtil.error(code=500, message="离线练习功能未启用")
+
+    # 限制题目数量
+    if question_count is None:
+        question_count = exam_config.OFFLINE_PRACTICE_QUESTION_COUNT
+    question_count = min(max(question_count, 1), exam_config.OFFLINE_PRACTICE_MAX_QUESTION_COUNT)
+
+    # 开启事务管理
+    with db_session.begin():
+        if user_exam_id is not None:
+            # 顺序练习：检查练习记录
+            user_exam: MpUserExamModel = MpUserExamService_instance.get_by_id(db_session, user_exam_id)
+            if user_exam is None or user_exam.user_id != user_id or user_exam.type != 0:
+                return ResponseUtil.error(code=400, message="用户顺序练习记录不存在")
+            if user_exam.finish_time:
+                return ResponseUtil.error(code=400, message="当前练习已完成")
+
+            # 从起始题目开始按练习记录的题目顺序取题
+            question_index = user_exam_question_index_cache.get(db_session, user_exam.id, user_exam)
+            position = question_index.position_of(question_id if question_id is not None else user_exam.last_question_id)
+            if position is None:
+                return ResponseUtil.error(code=400, message="题目ID无效,题目ID不在用户考试记录中")
+            exam_id = user_exam.exam_id
+            question_ids = question_index.question_ids[position:position + question_count].tolist()
+        else:
+            # 随机练习：按错误率加权抽题
+            if exam_id is None:
+                return ResponseUtil.error(code=400, message="exam_id 和 user_exam_id 不能同时为空")
+            question_ids = MpRandomPracticeService_instance.choose_question_ids(db_session, exam_id, question_count, user_id=user_id)
+
+        pack, questions_payload = MpOfflinePracticeService_instance.build_pack(
+            db_session, user_id=user_id, exam_id=exam_id, question_ids=question_ids, user_exam_id=user_exam_id,
+            response_format=get_response_format(),
+        )
+        if pack["question_count"] == 0:
+            return ResponseUtil.error(code=400, message="题目数据不存在")
+
+        # 返回结果（题目数组为序列化好的片段，响应较大，由压缩中间件压缩）
+        return ResponseUtil.raw_success(code=200, message="success", data=pack, raw_data={
+            "questions": questions_payload,
+        })
+
+
+"""
+同步离线答案
+1. pack_token 为下载离线练习包时返回的令牌，令牌无效或已过期时报400错误
+2. answers 为离线答案列表，每项包含 question_id、option_ids、answer_time（离线答题时间），同一道题可以多次作答
+3. 按练习包中的答案密钥批改，返回答对/答错题数和每个答案的批改结果；不在练习包中的题目忽略
+4. 同一个练习包重复同步（如网络中断后重试、并发请求落到不同进程）时直接返回上次的同步结果，答案不会重复记录（按同步记录表的主键去重）
+"""
+@router.post("/syncAnswers", response_model=ResponseDTO)
+def syncAnswers(pack_token: str = Body(..., embed=True), answers: List[MpOfflineAnswerDTO] = Body(..., embed=True),
+                db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/offline/practice/syncAnswers, answer_count={len(answers)}")
+
+    if not OfflinePackUtil.is_configured():
+        logger.error("未配置环境变量 OFFLINE_PACK_SECRET_KEY，离线练习接口不可用")
+        return ResponseUtil.error(code=500, message="离线练习功能未启用")
+
+    # 校验并解密练习包令牌
+    pack = OfflinePackUtil.unseal(pack_token)
+    if pack is None:
+        return ResponseUtil.error(code=400, message="离线练习包无效")
+    if pack["expire_time"] < time.time():
+        return ResponseUtil.error(code=400, message="离线练习包已过期")
+    if len(answers) > exam_config.OFFLINE_SYNC_MAX_ANSWER_COUNT:
+        return ResponseUtil.error(code=400, message=f"答案数量不能超过{exam_config.OFFLINE_SYNC_MAX_ANSWER_COUNT}个")
+
+    try:
+        # 开启事务管理
+        with db_session.begin():
+            # 已同步过时返回上次的结果
+            result = MpOfflinePracticeService_instance.get_sync_result(db_session, pack)
+            if result is not None:
+                return ResponseUtil.fast_success(code=200, message="success", data=result)
+
+            user_exam = None
+            if pack["user_exam_id"] is not None:
+                # 顺序练习：答案记录到练习记录中
+                user_exam = MpUserExamService_instance.get_by_id(db_session, pack["user_exam_id"])
+                if user_exam is None:
+                    return ResponseUtil.error(code=400, message="用户考试记录不存在")
+                if user_exam.finish_time:
+                    return ResponseUtil.error(code=400, message="当前考试已完成")
+
+            # 内存中批改，批量保存答题记录、答题轨迹和同步记录
+            result = MpOfflinePracticeService_instance.sync_answers(db_session, pack, answers, user_exam=user_exam)
+    except IntegrityError:
+        # 同一个练习包被并发同步，其他请求已先提交：本次事务已回滚，返回已提交的同步结果
+        with db_session.begin():
+            result = MpOfflinePracticeService_instance.get_sync_result(db_session, pack)
+        if result is None:
+            raise
+        logger.info(f"离线练习包已被其他请求同步，pack_id={pack['pack_id']}")
+        return ResponseUtil.fast_success(code=200, message="success", data=result)
+
+    logger.info(f"离线答案同步完成，pack_id={pack['pack_id']}, user_id={pack['user_id']}, 答题数={result['answered_count']}, 答对题数={result['correct_count']}")
+
+    return ResponseUtil.fast_success(code=200, message="success", data=result)
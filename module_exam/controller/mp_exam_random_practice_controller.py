@@ -1,19 +1,20 @@
-import random
-from typing import List
+from typing import Dict, List
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from sqlalchemy.orm import Session
 
+from config import exam_config
 from config.database_config import get_db_session
 
 from config.log_config import logger
-from module_exam.dto.mp_question_dto import MpQuestionOptionDTO
 from module_exam.service.mp_exam_service import MpExamService
 from module_exam.service.mp_option_service import MpOptionService
 from module_exam.service.mp_question_service import MpQuestionService
+from module_exam.service.mp_random_practice_service import MpRandomPracticeService
 from module_exam.service.mp_user_exam_service import MpUserExamService
 from module_exam.service.mp_user_exam_option_service import MpUserExamOptionService
-from utils.response_util import ResponseUtil, ResponseDTO
+from utils.field_select_util import FieldSelector
+from utils.response_util import ResponseUtil, ResponseDTO, get_response_format
 
 # 创建路由实例
 router = APIRouter(prefix='/mp/exam/random/practice', tags=['随机练习接口'])
@@ -23,6 +24,7 @@ MpOptionService_instance = MpOptionService()
 MpQuestionService_instance = MpQuestionService()
 MpUserExamService_instance = MpUserExamService()
 MpUserExamOptionService_instance = MpUserExamOptionService()
+MpRandomPracticeService_instance = MpRandomPracticeService()
 
 """
 随机练习相关接口
@@ -30,28 +32,37 @@ MpUserExamOptionService_instance = MpUserExamOptionService()
 
 """
 根据题目ID从题库中随机获取题目
+user_id: 可选。传入时按该用户的错误率加权抽题，做错越多的题目越容易被抽中
+type_mix: 可选。题目类型 -> 抽题数量，例如 {"1": 30, "2": 10, "3": 10}（1单选 2多选 3判断）。不传时按题库中各题型的数量等比例抽题
+          题目类型无效或数量为负数时报400错误；数量之和超过 RANDOM_PRACTICE_QUESTION_COUNT 时按比例缩减
+fields: 可选。稀疏字段，相对于每道题目，如 "question.id,question.name,options.id,options.content"；不传返回全部字段
 """
 @router.post("/getQuestion", response_model=ResponseDTO)
-def getQuestion(exam_id: int = Body(..., embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/random/practice/getQuestion, exam_id={exam_id}")
+def getQuestion(request: Request, exam_id: int = Body(..., embed=True), user_id: int = Body(None, embed=True),
+                type_mix: Dict[int, int] = Body(None, embed=True), fields: str = Body(None, embed=True),
+                db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/random/practice/getQuestion, exam_id={exam_id}, user_id={user_id}, type_mix={type_mix}, fields={fields}")
+
+    # 校验题目类型和数量
+    if type_mix:
+        if any(question_type not in exam_config.RANDOM_PRACTICE_QUESTION_TYPES for question_type in type_mix):
+            return ResponseUtil.error(code=400, message=f"题目类型无效，只能是{list(exam_config.RANDOM_PRACTICE_QUESTION_TYPES)}")
+        if any(type_count < 0 for type_count in type_mix.values()):
+            return ResponseUtil.error(code=400, message="题目数量不能为负数")
 
     # 开启事务管理
     with db_session.begin():
-        # 随机获取题目数量
-        num: int = 50
-
-        # 随机获取题目
-        all_questionids: List[int] = MpQuestionService_instance.get_all_questionids(db_session, exam_id=exam_id)
-
-        print(all_questionids)
-        random_questionids: List[int] = random.sample(all_questionids, num)
+        # 从考试题目池中按题型、错误率抽取题目ID，题库题目不足时抽取全部题目
+        random_questionids: List[int] = MpRandomPracticeService_instance.choose_question_ids(
+            db_session, exam_id, exam_config.RANDOM_PRACTICE_QUESTION_COUNT, user_id=user_id, type_mix=type_mix
+        )
 
-        # 根据id获取题目
-        question_option_dto: List[MpQuestionOptionDTO] = MpQuestionService_instance.get_questions_with_options_by_questionids(db_session, question_ids=random_questionids)
+        # 根据id获取题目（按协商的响应格式序列化好的数组，优先从题目片段缓存读取）
+        questions_payload, _ = MpQuestionService_instance.get_questions_payload(
+            db_session, question_ids=random_questionids, response_format=get_response_format(), fields=FieldSelector.parse(fields)
+        )
 
         # 返回结果
-        return ResponseUtil.success(code=200, message="success", data={
-            "questions": [item.model_dump() for item in question_option_dto],
-        })
-
-
+        return ResponseUtil.etag_success(request, code=200, message="success", raw_data={
+            "questions": questions_payload,
+        }, cache_control=exam_config.QUESTION_PAYLOAD_CACHE_CONTROL)
@@ -4,9 +4,11 @@ from typing import List
 from fastapi import APIRouter, Body, Depends
 from sqlalchemy.orm import Session
 
+from config import exam_config
 from config.database_config import get_db_session
 
 from config.log_config import logger
+from module_exam.cache.user_exam_question_index_cache import user_exam_question_index_cache
 from module_exam.dto.mp_exam_dto import MpExamDTO
 from module_exam.dto.mp_option_dto import MpOptionDTO
 from module_exam.dto.mp_question_dto import MpQuestionOptionDTO, MpQuestionDTO
@@ -20,6 +22,8 @@ from module_exam.service.mp_option_service import MpOptionService
 from module_exam.service.mp_question_service import MpQuestionService
 from module_exam.service.mp_user_exam_service import MpUserExamService
 from module_exam.service.mp_user_exam_option_service import MpUserExamOptionService
+from module_exam.service.mp_user_exam_result_service import MpUserExamResultService
+from utils.field_select_util import FieldSelector
 from utils.response_util import ResponseUtil, ResponseDTO
 
 # 创建路由实例
@@ -30,27 +34,29 @@ MpOptionService_instance = MpOptionService()
 MpQuestionService_instance = MpQuestionService()
 MpUserExamService_instance = MpUserExamService()
 MpUserExamOptionService_instance = MpUserExamOptionService()
+MpUserExamResultService_instance = MpUserExamResultService()
 
 """
 顺序练习相关接口
 """
 
 """
-获取顺序练习历史记录
+获取顺序练习历史记录（按id降序分页）
+1. 第一页不传cursor，之后每页传入上一页返回的next_cursor，next_cursor为空表示没有更多数据
+2. 只查询摘要字段，正确率在SQL中计算
 """
 @router.post("/history", response_model=ResponseDTO)
-def history(user_id: int = Body(..., embed=True), exam_id: int = Body(..., embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/sequence/practice/history, user_id={user_id}, exam_id={exam_id}")
-
-    # 查询用户顺序练习历史记录,id降序
-    user_exam_history: List[MpUserExamModel] = MpUserExamService_instance.get_list_by_filters(
-        db_session,
-        filters=MpUserExamDTO(
-            user_id=user_id,
-            exam_id=exam_id,
-            type=0,  # 顺序练习
-        ).model_dump(),
-        sort_by=["-id"]
+def history(user_id: int = Body(..., embed=True), exam_id: int = Body(..., embed=True),
+            page_size: int = Body(exam_config.USER_EXAM_HISTORY_PAGE_SIZE, embed=True),
+            cursor: int = Body(None, embed=True),
+            db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/sequence/practice/history, user_id={user_id}, exam_id={exam_id}, page_size={page_size}, cursor={cursor}")
+
+    # 限制每页大小
+    page_size = min(max(page_size, 1), exam_config.USER_EXAM_HISTORY_MAX_PAGE_SIZE)
+    # 查询用户顺序练习历史记录摘要,id降序
+    history_rows, next_cursor = MpUserExamService_instance.get_history_page(
+        db_session, user_id=user_id, exam_id=exam_id, user_exam_type=0, page_size=page_size, cursor=cursor,
     )
 
     # 根据exam_id 获取考试信息
@@ -61,26 +67,21 @@ def history(user_id: int = Body(..., embed=True), exam_id: int = Body(..., embed
 
     # 重构返回结果
     history_list = []
-    for exam in user_exam_history:
-        # 计算已答题数
-        answered_count = exam.correct_count + exam.error_count
-        # 计算未答题数
-        unanswered_count = exam.total_count - answered_count
-        # 计算正确率，避免除数为0
-        accuracy = (exam.correct_count / answered_count) * 100 if answered_count > 0 else 0
-
+    for row in history_rows:
         history_list.append({
-            "id": exam.id,
-            "finish_time": exam.finish_time if exam.finish_time else None,
-            "answered_count": answered_count,
-            "unanswered_count": unanswered_count,
-            "accuracy": round(accuracy, 2),  # 保留两位小数
+            "id": row.id,
+            "finish_time": row.finish_time if row.finish_time else None,
+            "answered_count": row.answered_count,
+            "unanswered_count": row.total_count - row.answered_count,
+            "accuracy": float(row.accuracy),  # 保留两位小数
         })
 
     # 返回结果
-    return ResponseUtil.success(code=200, message="success", data={
+    return ResponseUtil.fast_success(code=200, message="success", data={
         "exam_info": exam_result.to_dict() if exam_result else None,
-        "user_exam_history": history_list
+        "user_exam_history": history_list,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
     })
 
 
@@ -116,13 +117,8 @@ def start(exam_id: int = Body(..., embed=True), user_id: int = Body(..., embed=T
         if user_exam is None:
             logger.info("未找到未完成顺序练习，创建新的顺序练习记录")
 
-            # 获取所有题目ID（按id升序）
-            all_questions = MpQuestionService_instance.get_list_by_filters(
-                db_session,
-                filters=MpQuestionDTO(exam_id=exam_id, status=0).model_dump(),
-                sort_by=["id"]
-            )
-            question_ids = [q.id for q in all_questions]
+            # 获取所有题目ID（按id升序，只查询id字段）
+            question_ids = MpQuestionService_instance.get_all_questionids(db_session, exam_id)
 
             # 创建新的顺序练习记录
             user_exam_dto = MpUserExamDTO(
@@ -150,10 +146,15 @@ def start(exam_id: int = Body(..., embed=True), user_id: int = Body(..., embed=T
 根据题目ID获取题目信息（包含选项），以及该题目的答题信息。
 - 若question_id参数为空时，则从用户测试记录中获取last_question_id 作为当前题目ID
 - 若question_id参数不为空时，则根据question_id获取题目信息
+- fields: 稀疏字段（可选），相对于 question_options，如 "question.id,question.name,options.id,options.content"；不传返回全部字段
+- with_question_ids: 是否返回练习记录的全部题目ID列表（默认返回；已改用 getQuestionWindow/getAnswerCardInfo 的客户端可传false，减少大题库的响应体积）
 """
 @router.post("/getQuestion", response_model=ResponseDTO)
-def getQuestion(user_exam_id: int = Body(..., embed=True), question_id: int = Body(None, embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/sequence/practice/getQuestion, user_exam_id={user_exam_id}, question_id={question_id}")
+def getQuestion(user_exam_id: int = Body(..., embed=True), question_id: int = Body(None, embed=True),
+                fields: str = Body(None, embed=True), with_question_ids: bool = Body(True, embed=True),
+                db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/sequence/practice/getQuestion, user_exam_id={user_exam_id}, question_id={question_id}, fields={fields}")
+    field_selector = FieldSelector.parse(fields)
 
     # 开启事务管理
     with db_session.begin():
@@ -170,12 +171,13 @@ def getQuestion(user_exam_id: int = Body(..., embed=True), question_id: int = Bo
         if question_id is None:
             question_id = user_exam.last_question_id
 
-        # 检查题目ID是否在题目ID列表中
-        if question_id not in user_exam.question_ids:
+        # 检查题目ID是否在题目ID列表中（从缓存的题目索引中查找位置）
+        question_index = user_exam_question_index_cache.get(db_session, user_exam.id, user_exam)
+        if question_index.position_of(question_id) is None:
             return ResponseUtil.error(code=400, message="题目ID无效,题目ID不在用户考试记录中")
 
-        # 查询题目 + 选项
-        question_option_dto: MpQuestionOptionDTO = MpQuestionService_instance.get_one_questions_with_options(db_session, question_id)
+        # 查询题目 + 选项（指定稀疏字段时只查询需要的列）
+        question_option_dto: MpQuestionOptionDTO = MpQuestionService_instance.get_one_questions_with_options(db_session, question_id, fields=field_selector)
         if question_option_dto is None:
             return ResponseUtil.error(code=400, message="题目数据不存在")
 
@@ -194,13 +196,56 @@ def getQuestion(user_exam_id: int = Body(..., embed=True), question_id: int = Bo
             is_correct = user_exam_option.is_correct
 
         # 返回结果
-        return ResponseUtil.success(code=200, message="success", data={
+        data = {
             "user_exam_id": user_exam.id,
             "question_id": question_id,
-            "question_ids": user_exam.question_ids,  # 用户考试记录中的所有题目ID列表
-            "question_options": question_option_dto.model_dump(),  # 当前题目信息,选项信息
+            "question_options": field_selector.apply(question_option_dto) if field_selector else question_option_dto,  # 当前题目信息,选项信息
             "selected_option_ids": user_option_ids,  # 用户选择的选项ID列表。若是None则表示未答题。
             "is_correct": is_correct,
+        }
+        if with_question_ids:
+            # 用户考试记录中的所有题目ID列表（从缓存的题目索引读取，不再加载题目ID快照列）
+            data["question_ids"] = question_index.question_ids.tolist()
+        return ResponseUtil.fast_success(code=200, message="success", data=data)
+
+
+"""
+获取以某道题为中心的一批题目（题目 + 选项 + 答题信息），用于客户端预加载和滑动切题
+- 若question_id参数为空时，则从用户测试记录中获取last_question_id 作为中心题目
+- before/after 为向前/向后获取的题目数量，最多 SEQUENCE_WINDOW_MAX_SIZE 道
+- 返回的 prev_question_id/next_question_id 为窗口之外的上一题/下一题，用于继续获取下一个窗口
+- fields: 稀疏字段（可选），相对于每道题目的 question_options，与 getQuestion 相同；不传返回全部字段
+"""
+@router.post("/getQuestionWindow", response_model=ResponseDTO)
+def getQuestionWindow(user_exam_id: int = Body(..., embed=True), question_id: int = Body(None, embed=True),
+                      before: int = Body(0, embed=True), after: int = Body(10, embed=True),
+                      fields: str = Body(None, embed=True), db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/sequence/practice/getQuestionWindow, user_exam_id={user_exam_id}, question_id={question_id}, before={before}, after={after}, fields={fields}")
+    field_selector = FieldSelector.parse(fields)
+
+    # 限制窗口大小
+    before = min(max(before, 0), exam_config.SEQUENCE_WINDOW_MAX_SIZE)
+    after = min(max(after, 0), exam_config.SEQUENCE_WINDOW_MAX_SIZE)
+
+    # 开启事务管理
+    with db_session.begin():
+        window = MpUserExamService_instance.get_question_window(db_session, user_exam_id, question_id, before, after)
+        # 检查用户考试记录是否存在
+        if window is None:
+            return ResponseUtil.error(code=400, message="用户考试记录不存在")
+        # 检查题目ID是否在题目ID列表中
+        if window["position"] is None:
+            return ResponseUtil.error(code=400, message="题目ID无效,题目ID不在用户考试记录中")
+
+        # 窗口中的题目来自题目缓存（完整字段），按稀疏字段裁剪每道题目
+        if field_selector:
+            for item in window["questions"]:
+                item["question_options"] = field_selector.apply(item["question_options"])
+
+        # 返回结果
+        return ResponseUtil.fast_success(code=200, message="success", data={
+            "user_exam_id": user_exam_id,
+            **window,
         })
 
 
@@ -234,6 +279,7 @@ def submitAnswer(
         right_options = MpOptionService_instance.get_list_by_filters(
             db_session,
             filters=MpOptionDTO(question_id=question_id, is_right=1, status=0).model_dump(),
+            columns=["id"],  # 只需要选项id
         )
         right_option_ids = [opt.id for opt in right_options]
 
@@ -253,20 +299,16 @@ def submitAnswer(
         )
         MpUserExamOptionService_instance.add(db_session, dict_data=user_option_dto.model_dump())
 
-        # 更新答对/答错题目数
+        # 更新用户考试记录：答对/答错题目数、最新答题题目ID（只更新变化的字段，不重写题目ID快照）
         if is_option_correct:
-            user_exam.correct_count += 1
+            update_data = {"correct_count": user_exam.correct_count + 1}
         else:
-            user_exam.error_count += 1
-
-        # 更新最新答题题目ID
-        user_exam.last_question_id = question_id
-
-        # 更新用户考试记录
+            update_data = {"error_count": user_exam.error_count + 1}
+        update_data["last_question_id"] = question_id
         MpUserExamService_instance.update_by_id(
             db_session,
             id=user_exam.id,
-            update_data=user_exam.to_dict(),
+            update_data=update_data,
         )
 
         # 返回结果
@@ -278,45 +320,26 @@ def submitAnswer(
 
 """
 获取答题卡信息
+format: 返回格式，默认json
+- json：all_question_ids 所有题目ID列表 + user_exam_options_list 已答题目的 {q_id, is_correct} 列表
+- bitset：answered_bitset/correct_bitset 两个base64位图（已答/答对），第i位（第i//8个字节的第i%8位）对应题目ID列表中的第i道题
 """
 @router.post("/getAnswerCardInfo", response_model=ResponseDTO)
 def getAnswerCardInfo(
         user_exam_id: int = Body(..., embed=True),
+        format: str = Body("json", embed=True),
         db_session: Session = Depends(get_db_session)
 ):
-    logger.info(f"/mp/exam/sequence/practice/getAnswerCardInfo, user_exam_id={user_exam_id}")
+    logger.info(f"/mp/exam/sequence/practice/getAnswerCardInfo, user_exam_id={user_exam_id}, format={format}")
 
     # 开启事务管理
     with db_session.begin():
-        # 查询对应的用户考试记录
-        user_exam: MpUserExamModel = MpUserExamService_instance.get_one_by_filters(
-            db_session,
-            filters=MpUserExamDTO(id=user_exam_id).model_dump(),
-        )
+        answer_card = MpUserExamService_instance.get_answer_card(db_session, user_exam_id, answer_format=format)
         # 检查用户考试记录是否存在
-        if user_exam is None:
+        if answer_card is None:
             return ResponseUtil.error(code=400, message="用户考试记录不存在")
 
-        # 获取考试记录中所有的问题id
-        all_question_ids = user_exam.question_ids or []
-
-        # 拉取所有已答题记录
-        user_exam_options: List[MpUserExamOptionModel] = MpUserExamOptionService_instance.get_list_by_filters(
-            db_session,
-            filters=MpUserExamOptionDTO(user_exam_id=user_exam_id).model_dump()
-        )
-        # 遍历所有答题记录，获取对应问题id,和答题情况
-        user_exam_options_list = []
-        for opt in user_exam_options:
-            aaa = {}
-            aaa["q_id"] = opt.question_id
-            aaa["is_correct"] = opt.is_correct
-            user_exam_options_list.append(aaa)
-
-        return ResponseUtil.success(code=200, message="success", data={
-            "all_question_ids": all_question_ids,
-            "user_exam_options_list": user_exam_options_list,
-        })
+        return ResponseUtil.fast_success(code=200, message="success", data=answer_card)
 
 
 """
@@ -324,102 +347,49 @@ def getAnswerCardInfo(
 1. user_exam_id 不能为空，否则报422错误
 2. 若用户顺序练习记录不存在，报400错误
 3. 若用户顺序练习记录存在，返回练习结果，包含答对题数、总题数、正确率、错误题数、题目详情。
+4. fields: 稀疏字段（可选），相对于 question_detail_list 中的每道题目，如 "question_id,is_correct"；汇总字段始终返回
 """
 @router.post("/practiceResult", response_model=ResponseDTO)
-def practiceResult(user_id: int = Body(..., embed=True), user_exam_id: int = Body(..., embed=True), db_session: Session = Depends(get_db_session)):
-    logger.info(f"/mp/exam/sequence/practice/practiceResult, user_id={user_id}, user_exam_id={user_exam_id}")
-
-    # 查询用户测试记录
-    user_exam = MpUserExamService_instance.get_one_by_filters(
-        db_session,
-        filters=MpUserExamDTO(id=user_exam_id, user_id=user_id, type=0).model_dump(),
-    )
-
-    if user_exam is None:
-        return ResponseUtil.error(code=400, message="用户顺序练习记录不存在")
-
-    # 查询考试信息
-    mp_exam = MpExamService_instance.get_one_by_filters(
-        db_session,
-        filters=MpExamDTO(id=user_exam.exam_id).model_dump(),
-    )
-
-    if mp_exam is None:
-        return ResponseUtil.error(code=400, message="考试记录不存在")
-
-    # 计算正确率（百分比，保留2位小数）
-    accuracy_rate = round((user_exam.correct_count / (user_exam.correct_count + user_exam.error_count)) * 100, 2) if user_exam.correct_count > 0 else 0.0
-    logger.info(
-        f"用户顺序练习完成，user_exam_id={user_exam_id}, 答对题数={user_exam.correct_count}, 错误题数={user_exam.error_count}, 总题数={user_exam.total_count}, 正确率={accuracy_rate}%")
-
-    # 获取题目答题详情信息
-    question_details = []
-    question_ids = user_exam.question_ids if user_exam.question_ids else []
-
-    for question_id in question_ids:
-        # 查询题目信息（包含选项）
-        question_with_options = MpQuestionService_instance.get_one_questions_with_options(db_session, question_id)
-        if question_with_options is None:
-            logger.warning(f"question_id={question_id} 不存在，跳过")
-            continue
+def practiceResult(user_id: int = Body(..., embed=True), user_exam_id: int = Body(..., embed=True),
+                   fields: str = Body(None, embed=True), db_session: Session = Depends(get_db_session)):
+    logger.info(f"/mp/exam/sequence/practice/practiceResult, user_id={user_id}, user_exam_id={user_exam_id}, fields={fields}")
+    field_selector = FieldSelector.parse(fields)
 
-        question = question_with_options.question
-
-        # 创建选项ID到文本的映射
-        option_id_to_text = {}
-        for option in question_with_options.options:
-            option_id_to_text[option.id] = option.content
-
-        # 查询用户答案
-        user_option_record = MpUserExamOptionService_instance.get_one_by_filters(
+    # 开启事务管理
+    with db_session.begin():
+        # 已完成的顺序练习结果不再变化，优先读取结果快照（一次主键查询）
+        result = MpUserExamResultService_instance.get_snapshot(db_session, user_exam_id=user_exam_id, user_id=user_id, user_exam_type=0)
+        if result is not None:
+            if field_selector:
+                result = {**result, "question_detail_list": field_selector.apply(result["question_detail_list"])}
+            return ResponseUtil.fast_success(code=200, message="success", data=result)
+
+        # 查询用户测试记录
+        user_exam = MpUserExamService_instance.get_one_by_filters(
             db_session,
-            filters=MpUserExamOptionDTO(user_exam_id=user_exam_id, question_id=question_id).model_dump()
+            filters=MpUserExamDTO(id=user_exam_id, user_id=user_id, type=0).model_dump(),
         )
-        user_answer = user_option_record.option_ids if user_option_record else None
-        # 统一处理用户答案格式（转为列表）
-        if user_answer is not None:
-            user_answer_ids = user_answer if isinstance(user_answer, list) else [user_answer]
-        else:
-            user_answer_ids = []
 
-        # 查询正确答案
-        right_options = MpOptionService_instance.get_list_by_filters(
+        if user_exam is None:
+            return ResponseUtil.error(code=400, message="用户顺序练习记录不存在")
+
+        # 查询考试信息
+        mp_exam = MpExamService_instance.get_one_by_filters(
             db_session,
-            filters=MpOptionDTO(question_id=question_id, is_right=1, status=0).model_dump(),
+            filters=MpExamDTO(id=user_exam.exam_id).model_dump(),
         )
-        correct_answer_ids = [opt.id for opt in right_options]
 
-        # 判断是否答对/答对/未答（集合比较）
-        if len(set(user_answer_ids)) == 0:
-            is_correct = -1  # 未答
-        elif (set(correct_answer_ids) == set(user_answer_ids)):
-            is_correct = 1
-        else:
-            is_correct = 0
-
-        # 将答案ID转换为包含文本的字典
-        user_answer_with_text = [option_id_to_text.get(id, "") for id in user_answer_ids]
-        correct_answer_with_text = [option_id_to_text.get(id, "") for id in correct_answer_ids]
-
-        # 构建题目详情
-        question_details.append({
-            "question_id": question.id,
-            "question_type": question.type,
-            "question_type_name": question.type_name,
-            "question_name": question.name,
-            "user_answer": user_answer_with_text,
-            "correct_answer": correct_answer_with_text,
-            "is_correct": is_correct,
-        })
+        if mp_exam is None:
+            return ResponseUtil.error(code=400, message="考试记录不存在")
+
+        # 计算结果（批量查询题目、选项和答题记录）。练习已完成时保存快照，未完成时每次实时计算
+        result = MpUserExamResultService_instance.build_result(db_session, user_exam, mp_exam.name)
+        if user_exam.finish_time is not None:
+            MpUserExamResultService_instance.save_snapshot(db_session, user_exam, result)
+
+        logger.info(
+            f"用户顺序练习完成，user_exam_id={user_exam_id}, 答对题数={result['correct_count']}, 错误题数={result['error_count']}, 总题数={result['total_count']}, 正确率={result['accuracy_rate']}%")
 
-    return ResponseUtil.success(code=200, message="success", data={
-        "user_exam_id": user_exam.id,
-        "exam_id": user_exam.exam_id,
-        "exam_name": mp_exam.name,
-        "user_id": user_exam.user_id,
-        "correct_count": user_exam.correct_count,
-        "error_count": user_exam.error_count,
-        "total_count": user_exam.total_count,
-        "accuracy_rate": accuracy_rate,
-        "question_detail_list": question_details,
-    })
\ No newline at end of file
+        if field_selector:
+            result = {**result, "question_detail_list": field_selector.apply(result["question_detail_list"])}
+        return ResponseUtil.fast_success(code=200, message="success", data=result)
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from module_exam.model.mp_offline_pack_sync_model import MpOfflinePackSyncModel
+from base.base_dao import BaseDao
+
+
+
+# 继承BaseDao类，专注于数据访问操作, 可添加自定义方法
+class MpOfflinePackSyncDao(BaseDao[MpOfflinePackSyncModel]):
+    def __init__(self):
+        """初始化DAO实例"""
+        super().__init__(model = MpOfflinePackSyncModel)
+
+    # 可以根据业务需求添加自定义方法
+
+    def get_by_pack_id(self, db_session, pack_id: str) -> Optional[MpOfflinePackSyncModel]:
+        """
+        根据离线练习包ID查询同步记录（主键查询）
+        :param pack_id: 离线练习包ID
+        :return: 同步记录，不存在返回None
+        """
+        return db_session.get(self.model, pack_id)
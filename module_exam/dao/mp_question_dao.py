@@ -1,7 +1,7 @@
 from typing import List
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from module_exam.model.mp_option_model import MpOptionModel
 from module_exam.model.mp_question_model import MpQuestionModel
 from base.base_dao import BaseDao
@@ -12,6 +12,32 @@ class MpQuestionDao(BaseDao[MpQuestionModel]):
         """初始化DAO实例"""
         super().__init__(model = MpQuestionModel)
 
+    def get_question_ids_by_exam_id(self, db_session: Session, exam_id: int, status: int = 0) -> List[int]:
+        """
+        获取指定考试下指定状态的题目ID列表（按id升序）
+        :param exam_id: 考试ID
+        :param status: 题目状态，默认0（正常）
+        :return: 题目ID列表
+        """
+        sql = select(MpQuestionModel.id).where(
+            MpQuestionModel.exam_id == exam_id,
+            MpQuestionModel.status == status
+        ).order_by(MpQuestionModel.id)
+        return db_session.execute(sql).scalars().all()
+
+    def get_question_id_types_by_exam_id(self, db_session: Session, exam_id: int, status: int = 0):
+        """
+        获取指定考试下指定状态的题目ID和题目类型（按id升序）
+        :param exam_id: 考试ID
+        :param status: 题目状态，默认0（正常）
+        :return: (id, type) 行列表
+        """
+        sql = select(MpQuestionModel.id, MpQuestionModel.type).where(
+            MpQuestionModel.exam_id == exam_id,
+            MpQuestionModel.status == status
+        ).order_by(MpQuestionModel.id)
+        return db_session.execute(sql).all()
+
     def get_questions_with_options(self, db_session: Session, exam_id: int):
         """
         使用join查询获取指定exam_id的问题及其选项
@@ -30,11 +56,14 @@ class MpQuestionDao(BaseDao[MpQuestionModel]):
 
         return db_session.execute(sql).all()
 
-    def get_questions_with_options_by_questionids(self, db_session: Session, question_ids: List[int]):
+    def get_questions_with_options_by_questionids(self, db_session: Session, question_ids: List[int],
+                                                  question_columns: List[str] = None, option_columns: List[str] = None):
         """
         使用join查询获取指定exam_id的问题及其选项
         :param db_session: 数据库会话
         :param question_ids: 题目ID列表
+        :param question_columns: 题目只加载的字段名列表，为空时加载全部字段
+        :param option_columns: 选项只加载的字段名列表，为空时加载全部字段
         :return: 包含问题和选项的字典列表
         """
         # 使用join查询获取问题和对应的选项
@@ -45,13 +74,17 @@ class MpQuestionDao(BaseDao[MpQuestionModel]):
             MpQuestionModel.id.in_(question_ids),
             MpQuestionModel.status == 0
         ).order_by(MpOptionModel.id)
+        sql = self._apply_load_only(sql, question_columns, option_columns)
         return db_session.execute(sql).all()
 
-    def get_one_questions_with_options(self, db_session: Session, question_id: int):
+    def get_one_questions_with_options(self, db_session: Session, question_id: int,
+                                       question_columns: List[str] = None, option_columns: List[str] = None):
         """
         使用join查询获取指定question_id的问题及其选项
         :param db_session: 数据库会话
         :param question_id: 问题ID
+        :param question_columns: 题目只加载的字段名列表，为空时加载全部字段
+        :param option_columns: 选项只加载的字段名列表，为空时加载全部字段
         :return: 包含问题和选项的字典列表
         """
         # 使用join查询获取问题和对应的选项
@@ -62,5 +95,18 @@ class MpQuestionDao(BaseDao[MpQuestionModel]):
             MpQuestionModel.id == question_id,
             MpQuestionModel.status == 0
         ).order_by(MpOptionModel.id)
+        sql = self._apply_load_only(sql, question_columns, option_columns)
 
-        return db_session.execute(sql).all()
\ No newline at end of file
+        return db_session.execute(sql).all()
+
+    @staticmethod
+    def _apply_load_only(sql, question_columns: List[str] = None, option_columns: List[str] = None):
+        """
+        题目、选项只加载指定的字段（稀疏字段查询时减少读取和传输的数据，如不加载题目解析）
+        主键和关联字段（题目id、选项question_id）始终加载
+        """
+        if question_columns:
+            sql = sql.options(load_only(*[getattr(MpQuestionModel, column) for column in dict.fromkeys(["id", *question_columns])]))
+        if option_columns:
+            sql = sql.options(load_only(*[getattr(MpOptionModel, column) for column in dict.fromkeys(["id", "question_id", *option_columns])]))
+        return sql
\ No newline at end of file
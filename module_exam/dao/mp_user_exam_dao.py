@@ -1,4 +1,8 @@
-from sqlalchemy import desc
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import case, desc, func, select, update
+from sqlalchemy.engine import Row
 
 from module_exam.model.mp_user_exam_model import MpUserExamModel
 from base.base_dao import BaseDao
@@ -13,7 +17,59 @@ class MpUserExamDao(BaseDao[MpUserExamModel]):
 
     # 可以根据业务需求添加自定义方法
 
+    def mark_finished(self, db_session, user_exam_id: int, finish_time: datetime) -> bool:
+        """
+        将未完成的测试记录标记为已完成（条件更新 finish_time IS NULL，并发提交时只有一个请求能更新成功）
+        :param user_exam_id: 用户测试记录ID
+        :param finish_time: 完成时间
+        :return: 是否更新成功，测试记录已完成或不存在时返回False
+        """
+        sql = update(self.model).where(
+            self.model.id == user_exam_id,
+            self.model.finish_time.is_(None),
+        ).values(finish_time=finish_time)
+        return (db_session.execute(sql).rowcount or 0) > 0
+
     # 查询最后一个已完成的考试记录
     def findLastOneByIsFinish(self, db):
         return db.query(self.model).filter(self.model.finish_time != None).order_by(desc(self.model.id)).first()
 
+    def get_history_page(self, db_session, user_id: int, exam_id: int, user_exam_type: int,
+                         limit: int, last_id: int = None) -> List[Row]:
+        """
+        键集分页查询用户某个考试的测试历史记录（按id降序，只查询摘要字段，不加载题目ID快照）
+        正确率在SQL中计算：模拟考试为 答对数/总题数，顺序练习为 答对数/已答题数，百分比保留2位小数
+        :param user_id: 用户ID
+        :param exam_id: 考试ID
+        :param user_exam_type: 用户测试类型 0是顺序练习，1是模拟考试
+        :param limit: 查询条数
+        :param last_id: 上一页最后一条记录的id，为None表示查询第一页
+        :return: 摘要行列表
+        """
+        answered_count = self.model.correct_count + self.model.error_count
+        denominator = case((self.model.type == 1, self.model.total_count), else_=answered_count)
+        accuracy = func.coalesce(func.round(self.model.correct_count * 100.0 / func.nullif(denominator, 0), 2), 0)
+
+        sql = select(
+            self.model.id,
+            self.model.user_id,
+            self.model.exam_id,
+            self.model.type,
+            self.model.type_name,
+            self.model.last_question_id,
+            self.model.correct_count,
+            self.model.error_count,
+            self.model.total_count,
+            answered_count.label("answered_count"),
+            accuracy.label("accuracy"),
+            self.model.create_time,
+            self.model.finish_time,
+        ).where(
+            self.model.user_id == user_id,
+            self.model.exam_id == exam_id,
+            self.model.type == user_exam_type,
+        )
+        if last_id is not None:
+            sql = sql.where(self.model.id < last_id)
+        sql = sql.order_by(self.model.id.desc()).limit(limit)
+        return db_session.execute(sql).all()
@@ -1,3 +1,8 @@
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+
 from module_exam.model.mp_user_exam_option_model import MpUserExamOptionModel
 from base.base_dao import BaseDao
 
@@ -10,3 +15,40 @@ class MpUserExamOptionDao(BaseDao[MpUserExamOptionModel]):
         super().__init__(model = MpUserExamOptionModel)
 
     # 可以根据业务需求添加自定义方法
+
+    def get_list_by_question_ids(self, db_session, user_exam_id: int, question_ids: List[int]) -> List[MpUserExamOptionModel]:
+        """
+        查询某次测试记录中指定题目的答题记录（一次IN查询，按id升序）
+        :param user_exam_id: 用户测试记录ID
+        :param question_ids: 题目ID列表
+        :return: 答题记录列表
+        """
+        if not question_ids:
+            return []
+        sql = select(self.model).where(
+            self.model.user_exam_id == user_exam_id,
+            self.model.question_id.in_(question_ids),
+        ).order_by(self.model.id)
+        return db_session.execute(sql).scalars().all()
+
+    def get_answer_stat_list(self, db_session, user_exam_id: int) -> List[Row]:
+        """
+        查询某次测试记录的答题情况（只查询 question_id 和 is_correct，按id升序）
+        :param user_exam_id: 用户测试记录ID
+        :return: (question_id, is_correct) 行列表
+        """
+        sql = select(self.model.question_id, self.model.is_correct).where(
+            self.model.user_exam_id == user_exam_id
+        ).order_by(self.model.id)
+        return db_session.execute(sql).all()
+
+    def get_list_by_user_exam_id(self, db_session, user_exam_id: int) -> List[MpUserExamOptionModel]:
+        """
+        查询某次测试记录的全部答题记录（按id升序，同一道题多次作答时后面的记录为最新答案）
+        :param user_exam_id: 用户测试记录ID
+        :return: 答题记录列表
+        """
+        sql = select(self.model).where(
+            self.model.user_exam_id == user_exam_id
+        ).order_by(self.model.id)
+        return db_session.execute(sql).scalars().all()
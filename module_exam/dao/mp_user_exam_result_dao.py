@@ -0,0 +1,43 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import undefer_group
+
+from module_exam.model.mp_user_exam_model import MpUserExamModel
+from module_exam.model.mp_user_exam_result_model import MpUserExamResultModel
+from base.base_dao import BaseDao
+
+
+
+# 继承BaseDao类，专注于数据访问操作, 可添加自定义方法
+class MpUserExamResultDao(BaseDao[MpUserExamResultModel]):
+    def __init__(self):
+        """初始化DAO实例"""
+        super().__init__(model = MpUserExamResultModel)
+
+    # 可以根据业务需求添加自定义方法
+
+    def get_by_user_exam_id(self, db_session, user_exam_id: int) -> Optional[MpUserExamResultModel]:
+        """
+        根据用户测试记录ID查询结果快照（主键查询）
+        :param user_exam_id: 用户测试记录ID
+        :return: 结果快照，不存在返回None
+        """
+        return db_session.get(self.model, user_exam_id)
+
+    def get_unsnapshotted_user_exam_list(self, db_session, last_id: int, limit: int) -> List[MpUserExamModel]:
+        """
+        按id升序查询已完成但还没有结果快照的用户测试记录（键集分页，用于历史数据回填）
+        :param last_id: 上一批最后一条记录的id，从该id之后开始查询
+        :param limit: 每批数量
+        :return: 用户测试记录列表
+        """
+        # 回填时每条记录都要读取题目ID快照，随记录一次加载（该字段默认延迟加载）
+        sql = select(MpUserExamModel).options(undefer_group('question_ids')).outerjoin(
+            self.model, self.model.user_exam_id == MpUserExamModel.id
+        ).where(
+            MpUserExamModel.id > last_id,
+            MpUserExamModel.finish_time.is_not(None),
+            self.model.user_exam_id.is_(None),
+        ).order_by(MpUserExamModel.id).limit(limit)
+        return db_session.execute(sql).scalars().all()
@@ -1,5 +1,8 @@
 from typing import List
 
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+
 from base.base_dao import BaseDao
 from module_exam.model.mp_user_question_ebbinghaus_track import MpUserQuestionEbbinghausTrackModel
 
@@ -12,6 +15,60 @@ class MpUserQuestionEbbinghausTrackDao(BaseDao[MpUserQuestionEbbinghausTrackMode
 
     # 可以根据业务需求添加自定义方法
 
+    def get_error_track_page(self, db_session, user_id: int, exam_id: int, page_num: int, page_size: int, sort_by: str = "error_count") -> List[Row]:
+        """
+        分页查询用户在某个考试中做错过的题目轨迹（只查询错题本需要的字段）
+        :param user_id: 用户ID
+        :param exam_id: 考试ID
+        :param page_num: 页码，从1开始
+        :param page_size: 每页大小
+        :param sort_by: 排序方式。error_count：按做错次数倒序；recent：按最后答题时间倒序
+        :return: (question_id, error_count, correct_count, total_count, last_answer_time) 行列表
+
+        走 (user_id, exam_id) 联合索引，只扫描该用户在该考试中的轨迹记录。
+        """
+        sql = select(
+            self.model.question_id,
+            self.model.error_count,
+            self.model.correct_count,
+            self.model.total_count,
+            self.model.last_answer_time,
+        ).where(
+            self.model.user_id == user_id,
+            self.model.exam_id == exam_id,
+            self.model.error_count > 0,
+        )
+        if sort_by == "recent":
+            sql = sql.order_by(self.model.last_answer_time.desc(), self.model.id.desc())
+        else:
+            sql = sql.order_by(self.model.error_count.desc(), self.model.last_answer_time.desc(), self.model.id.desc())
+        sql = sql.offset((max(page_num, 1) - 1) * page_size).limit(page_size)
+        return db_session.execute(sql).all()
+
+    def get_answer_stat_list(self, db_session, user_id: int, exam_id: int) -> List[Row]:
+        """
+        查询用户在某个考试中每道题的答题统计（按题目ID升序）
+        :return: (question_id, error_count, total_count) 行列表
+        """
+        sql = select(
+            self.model.question_id,
+            self.model.error_count,
+            self.model.total_count,
+        ).where(
+            self.model.user_id == user_id,
+            self.model.exam_id == exam_id,
+        ).order_by(self.model.question_id)
+        return db_session.execute(sql).all()
+
+    def get_error_track_total(self, db_session, user_id: int, exam_id: int) -> int:
+        """查询用户在某个考试中做错过的题目总数"""
+        sql = select(func.count()).select_from(self.model).where(
+            self.model.user_id == user_id,
+            self.model.exam_id == exam_id,
+            self.model.error_count > 0,
+        )
+        return db_session.execute(sql).scalar() or 0
+
     # 查询今日需要复习的题目ID列表，最多返回question_count个题目
     def get_today_review_question(self,db_session,user_id,exam_id,question_count):
         # 该sql主要是查询，轨迹表中，某个用户在某个试题中，今日需要复习的题目ID列表。
@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+# 定义离线练习模型类型
+# 注意：DTO 是数据传输对象，用于在不同层之间传递数据，而不是直接与数据库交互。
+class MpOfflineAnswerDTO(BaseModel):
+    question_id: int                        # 题目ID
+    option_ids: List[int]                   # 用户选择的选项id列表，单选多选都是列表
+    answer_time: Optional[datetime] = None  # 离线答题时间，为None时使用同步时间
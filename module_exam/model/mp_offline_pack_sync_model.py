@@ -0,0 +1,45 @@
+# 导入sqlalchemy框架中的相关字段
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Integer, String, DateTime, func, Index, LargeBinary
+from sqlalchemy.orm import Mapped, MappedColumn
+
+# 导入公共基类
+from base.base_model import myBaseModel
+
+class MpOfflinePackSyncModel(myBaseModel):
+    """
+    离线练习包同步记录表 mp_offline_pack_sync
+    每个离线练习包同步成功后记录一条，按 pack_id 主键去重：与答题记录在同一个事务中写入，
+    同一个练习包重复同步（重试、多进程并发）时主键冲突，整个事务回滚，答案不会重复记录，直接返回记录中的同步结果。
+    """
+    __tablename__ = 'mp_offline_pack_sync'
+
+    pack_id: Mapped[str] = MappedColumn(String(32), primary_key=True, comment='离线练习包id')
+    user_id: Mapped[int] = MappedColumn(Integer, nullable=False, comment='用户id')
+    exam_id: Mapped[int] = MappedColumn(Integer, nullable=False, comment='测试id')
+    user_exam_id: Mapped[Optional[int]] = MappedColumn(Integer, nullable=True, comment='用户测试id，随机练习为空')
+    # 同步结果通过 result 属性读写，不要直接访问该字段
+    result_packed: Mapped[bytes] = MappedColumn(LargeBinary(length=16777215), nullable=False, comment='同步结果（zlib压缩的JSON）')
+    create_time: Mapped[datetime] = MappedColumn(DateTime, comment='创建时间', default=func.now())
+
+    # 添加索引
+    __table_args__ = (
+        Index('index_user_id', 'user_id'),
+    )
+
+    # to_dict 不输出压缩后的同步结果
+    __dict_exclude_fields__ = ('result_packed',)
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        """同步结果（解压后的字典）"""
+        return json.loads(zlib.decompress(self.result_packed))
+
+    @result.setter
+    def result(self, result: Dict[str, Any]):
+        """设置同步结果，序列化为紧凑JSON后压缩保存"""
+        self.result_packed = zlib.compress(json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
@@ -26,4 +26,6 @@ class MpQuestionModel(myBaseModel):
     __table_args__ = (
         Index('index_id', 'id'),
         Index('index_exam_id', 'exam_id'),
+        # 按考试加载正常状态的题目ID，(exam_id, status) + 主键id 构成覆盖索引，无需回表
+        Index('index_exam_id_status', 'exam_id', 'status'),
     )
\ No newline at end of file
@@ -1,12 +1,13 @@
 # 导入sqlalchemy框架中的相关字段
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy import Integer, String, DateTime, func, Index, JSON
+from sqlalchemy import Integer, String, DateTime, func, Index, JSON, LargeBinary
 from sqlalchemy.orm import Mapped, MappedColumn
 
 # 导入公共基类
 from base.base_model import myBaseModel
+from utils.id_codec_util import IdCodecUtil
 
 class MpUserExamModel(myBaseModel):
     """
@@ -23,7 +24,11 @@ class MpUserExamModel(myBaseModel):
     correct_count: Mapped[int] = MappedColumn(Integer, nullable=False, comment='答对题目数')
     error_count: Mapped[int] = MappedColumn(Integer, nullable=False, comment='答错题目数')
     total_count: Mapped[int] = MappedColumn(Integer, nullable=False, comment='总题目数')
-    question_ids: Mapped[List[int]] = MappedColumn(JSON, nullable=False, comment='题目ID数组快照，例如：[1, 5, 12, 23, ...] ，不受后续题库变化影响')
+    # 题目ID数组快照，不受后续题库变化影响。通过 question_ids 属性读写，不要直接访问下面两个字段
+    # 两个字段延迟加载（deferred）：查询测试记录时不加载，首次访问 question_ids 时用一次查询同时加载两个字段。
+    # 需要批量读取快照时，在查询中使用 undefer_group('question_ids') 一次加载
+    question_ids_json: Mapped[Optional[List[int]]] = MappedColumn('question_ids', JSON(none_as_null=True), nullable=True, deferred=True, deferred_group='question_ids', comment='题目ID数组快照（旧格式JSON），例如：[1, 5, 12, 23, ...]。新记录使用question_ids_packed')
+    question_ids_packed: Mapped[Optional[bytes]] = MappedColumn(LargeBinary(length=16777215), nullable=True, deferred=True, deferred_group='question_ids', comment='题目ID数组快照（紧凑二进制格式，见IdCodecUtil）')
     create_time: Mapped[datetime] = MappedColumn(DateTime, comment='创建时间', default=func.now())
     finish_time: Mapped[datetime] = MappedColumn(DateTime, comment='测试完成时间')
 
@@ -32,8 +37,38 @@ class MpUserExamModel(myBaseModel):
         Index('index_id', 'id'),
         Index('index_user_id', 'user_id'),
         Index('index_exam_id', 'exam_id'),
+        # 历史记录按 (user_id, exam_id, type) 过滤后按id键集分页
+        Index('index_user_id_exam_id_type_id', 'user_id', 'exam_id', 'type', 'id'),
     )
 
+    # to_dict 不输出题目ID快照的存储字段
+    __dict_exclude_fields__ = ('question_ids_json', 'question_ids_packed')
+
+    @property
+    def question_ids(self) -> List[int]:
+        """
+        题目ID数组快照
+        优先读取紧凑二进制格式，旧记录读取JSON格式。首次访问时才解码，解码结果缓存在实例上
+        """
+        cached = self.__dict__.get('_question_ids_cache')
+        if cached is not None and cached[0] is self.question_ids_packed:
+            return cached[1]
+
+        if self.question_ids_packed is not None:
+            question_ids = IdCodecUtil.decode(self.question_ids_packed)
+        else:
+            question_ids = self.question_ids_json or []
+        self.__dict__['_question_ids_cache'] = (self.question_ids_packed, question_ids)
+        return question_ids
+
+    @question_ids.setter
+    def question_ids(self, question_ids: List[int]):
+        """设置题目ID数组快照，使用紧凑二进制格式保存"""
+        if question_ids is None:
+            return
+        self.question_ids_packed = IdCodecUtil.encode(question_ids)
+        self.question_ids_json = None
+
 
 if __name__ == '__main__':
     aaa = MpUserExamModel(id=1, user_id=1, exam_id=1, type=0, last_question_id=1, create_time=datetime.now(), finish_time=datetime.now())
@@ -31,4 +31,6 @@ class MpUserExamOptionModel(myBaseModel):
         Index('index_user_id', 'user_id'),
         Index('index_exam_id', 'exam_id'),
         Index('index_user_exam_id', 'user_exam_id'),
+        # 按测试记录批量查询若干题目的答题记录
+        Index('index_user_exam_id_question_id', 'user_exam_id', 'question_id'),
     )
\ No newline at end of file
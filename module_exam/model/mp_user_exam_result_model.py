@@ -0,0 +1,45 @@
+# 导入sqlalchemy框架中的相关字段
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import Integer, DateTime, func, Index, LargeBinary
+from sqlalchemy.orm import Mapped, MappedColumn
+
+# 导入公共基类
+from base.base_model import myBaseModel
+
+class MpUserExamResultModel(myBaseModel):
+    """
+    用户测试结果快照表 mp_user_exam_result
+    测试记录完成（finish_time不为空）后结果不再变化，结果数据只计算一次，压缩后按 user_exam_id 主键保存。
+    之后查看结果只需要一次主键查询，不再关联查询答题记录、题目、选项表。
+    """
+    __tablename__ = 'mp_user_exam_result'
+
+    user_exam_id: Mapped[int] = MappedColumn(Integer, primary_key=True, autoincrement=False, comment='用户测试id')
+    user_id: Mapped[int] = MappedColumn(Integer, nullable=False, comment='用户id')
+    exam_id: Mapped[int] = MappedColumn(Integer, nullable=False, comment='测试id')
+    type: Mapped[int] = MappedColumn(Integer, nullable=False, comment='用户测试类型  0是顺序练习，1是模拟考试')
+    # 结果数据通过 result 属性读写，不要直接访问该字段
+    result_packed: Mapped[bytes] = MappedColumn(LargeBinary(length=16777215), nullable=False, comment='结果数据（zlib压缩的JSON）')
+    create_time: Mapped[datetime] = MappedColumn(DateTime, comment='创建时间', default=func.now())
+
+    # 添加索引
+    __table_args__ = (
+        Index('index_user_id', 'user_id'),
+    )
+
+    # to_dict 不输出压缩后的结果数据
+    __dict_exclude_fields__ = ('result_packed',)
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        """结果数据（解压后的字典）"""
+        return json.loads(zlib.decompress(self.result_packed))
+
+    @result.setter
+    def result(self, result: Dict[str, Any]):
+        """设置结果数据，序列化为紧凑JSON后压缩保存"""
+        self.result_packed = zlib.compress(json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
@@ -33,6 +33,8 @@ class MpUserQuestionEbbinghausTrackModel(myBaseModel):
     __table_args__ = (
         Index('index_id', 'id'),
         Index('index_user_id', 'user_id'),
+        # 错题本按 (user_id, exam_id) 查询
+        Index('index_user_id_exam_id', 'user_id', 'exam_id'),
         Index('index_question_id', 'question_id'),
         Index('index_next_review_time', 'next_review_time'),
         Index('index_status', 'status'),
@@ -0,0 +1,71 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from module_exam.dao.mp_user_question_ebbinghaus_track_dao import MpUserQuestionEbbinghausTrackDao
+from module_exam.dto.mp_question_dto import MpQuestionOptionDTO, MpQuestionOptionTraceDTO
+from module_exam.model.mp_user_question_ebbinghaus_track import MpUserQuestionEbbinghausTrackModel
+from module_exam.service.mp_question_service import MpQuestionService
+from base.base_service import BaseService
+from utils.field_select_util import FieldSelector
+
+
+# 错题本服务：按用户查询做错过的题目，并合并题目、选项和答题统计
+class MpErrorBookService(BaseService[MpUserQuestionEbbinghausTrackModel]):
+    # 支持的排序方式。error_count：按做错次数倒序；recent：按最后答题时间倒序
+    SORT_BY_LIST = ("error_count", "recent")
+
+    def __init__(self):
+        """
+        初始化服务实例
+        创建DAO实例并传递给基类
+        """
+        self.dao_instance = MpUserQuestionEbbinghausTrackDao()
+        super().__init__(dao=self.dao_instance)
+
+        self.question_service = MpQuestionService()
+
+    def get_error_question_page(self, db_session: Session, user_id: int, exam_id: int, page_num: int, page_size: int,
+                                sort_by: str = "error_count", fields: FieldSelector = None) -> Tuple[List[MpQuestionOptionTraceDTO], int]:
+        """
+        分页获取用户在某个考试中的错题（题目 + 选项 + 答题统计）
+        :param user_id: 用户ID
+        :param exam_id: 考试ID
+        :param page_num: 页码，从1开始
+        :param page_size: 每页大小
+        :param sort_by: 排序方式，见 SORT_BY_LIST，不支持的值按做错次数排序
+        :param fields: 稀疏字段选择器（相对于每道错题），题目、选项只查询需要的列；为None时查询全部列
+        :return: (当前页错题列表, 错题总数)
+        """
+        if sort_by not in self.SORT_BY_LIST:
+            sort_by = "error_count"
+
+        total = self.dao_instance.get_error_track_total(db_session, user_id, exam_id)
+        if total == 0:
+            return [], 0
+
+        track_rows = self.dao_instance.get_error_track_page(db_session, user_id, exam_id, page_num, page_size, sort_by)
+        if not track_rows:
+            return [], total
+
+        # 一次查询当前页的题目 + 选项，按题目ID建立字典
+        question_option_list = self.question_service.get_questions_with_options_by_questionids(
+            db_session, question_ids=[row.question_id for row in track_rows], fields=fields
+        )
+        question_option_map: Dict[int, MpQuestionOptionDTO] = {item.question.id: item for item in question_option_list}
+
+        # 按轨迹的排序顺序合并，已删除（不存在）的题目跳过
+        result: List[MpQuestionOptionTraceDTO] = []
+        for row in track_rows:
+            question_option = question_option_map.get(row.question_id)
+            if question_option is None:
+                continue
+            result.append(MpQuestionOptionTraceDTO(
+                question=question_option.question,
+                options=question_option.options,
+                error_count=row.error_count,
+                correct_count=row.correct_count,
+                total_count=row.total_count,
+            ))
+
+        return result, total
@@ -0,0 +1,164 @@
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import exam_config
+from module_exam.dao.mp_offline_pack_sync_dao import MpOfflinePackSyncDao
+from module_exam.dao.mp_user_exam_option_dao import MpUserExamOptionDao
+from module_exam.dto.mp_offline_practice_dto import MpOfflineAnswerDTO
+from module_exam.model.mp_offline_pack_sync_model import MpOfflinePackSyncModel
+from module_exam.model.mp_user_exam_model import MpUserExamModel
+from module_exam.model.mp_user_exam_option_model import MpUserExamOptionModel
+from module_exam.service.mp_question_service import MpQuestionService
+from module_exam.service.mp_user_exam_service import MpUserExamService
+from module_exam.service.mp_user_question_ebbinghaus_track_service import MpUserQuestionEbbinghausTrackService
+from base.base_service import BaseService
+from utils.field_select_util import FieldSelector
+from utils.offline_pack_util import OfflinePackUtil
+from utils.response_util import RESPONSE_FORMAT_JSON
+
+
+# 离线练习服务：生成离线练习包（题目 + 加密的答案密钥），批量批改并保存离线答案
+class MpOfflinePracticeService(BaseService[MpUserExamOptionModel]):
+    # 练习包中题目返回的字段：不包含选项是否正确、题目解析
+    PACK_QUESTION_FIELDS = FieldSelector.parse(
+        "question.id,question.exam_id,question.name,question.type,question.type_name,options.id,options.question_id,options.content"
+    )
+
+    def __init__(self):
+        """
+        初始化服务实例
+        创建DAO实例并传递给基类
+        """
+        self.dao_instance = MpUserExamOptionDao()
+        super().__init__(dao=self.dao_instance)
+
+        self.question_service = MpQuestionService()
+        self.user_exam_service = MpUserExamService()
+        self.track_service = MpUserQuestionEbbinghausTrackService()
+        self.pack_sync_dao = MpOfflinePackSyncDao()
+
+    def build_pack(self, db_session: Session, user_id: int, exam_id: int, question_ids: List[int], user_exam_id: int = None,
+                   response_format: str = RESPONSE_FORMAT_JSON) -> Tuple[Dict[str, Any], bytes]:
+        """
+        生成离线练习包
+        :param user_id: 用户ID
+        :param exam_id: 考试ID
+        :param question_ids: 练习包中的题目ID列表
+        :param user_exam_id: 练习包所属的顺序练习记录ID，为None时（随机练习）同步答案只更新答题轨迹
+        :param response_format: 响应格式
+        :return: (练习包信息 {pack_id, pack_token, expire_time, question_count, ...}, 按题目顺序序列化好的题目数组)
+        """
+        # 题目数组（不含答案）优先从题目片段缓存读取；答案密钥从题目缓存读取
+        questions_payload, question_count = self.question_service.get_questions_payload(
+            db_session, question_ids, response_format=response_format, fields=self.PACK_QUESTION_FIELDS
+        )
+        answer_key = [
+            [item.question.id, item.question.type, [option.id for option in item.options or [] if option.is_right == 1]]
+            for item in self.question_service.get_questions_with_options_cached(db_session, question_ids)
+        ]
+
+        issue_time = int(time.time())
+        pack = {
+            "pack_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "exam_id": exam_id,
+            "user_exam_id": user_exam_id,
+            "issue_time": issue_time,
+            "expire_time": issue_time + exam_config.OFFLINE_PACK_EXPIRE_SECONDS,
+        }
+        pack_token = OfflinePackUtil.seal({**pack, "answers": answer_key})
+        return {**pack, "question_count": question_count, "pack_token": pack_token}, questions_payload
+
+    def get_sync_result(self, db_session: Session, pack: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        查询练习包已同步时的同步结果（主键查询）
+        :param pack: 已校验的练习包令牌内容（见 build_pack）
+        :return: 同步结果，未同步返回None
+        """
+        pack_sync = self.pack_sync_dao.get_by_pack_id(db_session, pack["pack_id"])
+        if pack_sync is None or pack_sync.user_id != pack["user_id"]:
+            return None
+        return pack_sync.result
+
+    def sync_answers(self, db_session: Session, pack: Dict[str, Any], answers: List[MpOfflineAnswerDTO],
+                     user_exam: Optional[MpUserExamModel] = None) -> Dict[str, Any]:
+        """
+        批改并保存离线答案：按练习包中的答案密钥在内存中批改，答题记录一条INSERT批量插入，答题轨迹批量更新
+        最后写入练习包同步记录（需要由调用方提交事务）。练习包已被其他请求同步时主键冲突，抛出 IntegrityError，调用方回滚整个事务
+        :param pack: 已校验的练习包令牌内容（见 build_pack）
+        :param answers: 离线答案列表，不在练习包中的题目忽略
+        :param user_exam: 练习包所属的顺序练习记录，为None时只更新答题轨迹
+        :return: 同步结果 {pack_id, answered_count, correct_count, error_count, results: [{question_id, is_correct, right_option_ids}]}
+        """
+        # 题目ID -> (题目类型, 正确选项ID集合)
+        answer_key = {question_id: (question_type, right_option_ids) for question_id, question_type, right_option_ids in pack["answers"]}
+        right_option_sets = {question_id: set(right_option_ids) for question_id, (_, right_option_ids) in answer_key.items()}
+
+        # 答题时间以客户端记录为准，限制在 练习包生成时间 ~ 当前时间 之间
+        now = datetime.now()
+        issue_time = datetime.fromtimestamp(pack["issue_time"])
+        graded: List[Tuple[MpOfflineAnswerDTO, int, int, datetime]] = []
+        for answer in answers:
+            if answer.question_id not in answer_key:
+                continue
+            answer_time = answer.answer_time or now
+            if answer_time.tzinfo is not None:
+                answer_time = answer_time.astimezone().replace(tzinfo=None)
+            is_correct = 1 if set(answer.option_ids) == right_option_sets[answer.question_id] else 0
+            graded.append((answer, answer_key[answer.question_id][0], is_correct, min(max(answer_time, issue_time), now)))
+        # 按答题时间先后处理（排序稳定，时间相同时保持上传顺序）
+        graded.sort(key=lambda item: item[3])
+
+        correct_count = sum(is_correct for _, _, is_correct, _ in graded)
+        if graded:
+            if user_exam is not None:
+                self.dao_instance.batch_add(db_session, [
+                    {
+                        "user_id": user_exam.user_id,
+                        "exam_id": user_exam.exam_id,
+                        "user_exam_id": user_exam.id,
+                        "question_id": answer.question_id,
+                        "question_type": question_type,
+                        "option_ids": answer.option_ids,
+                        "is_correct": is_correct,
+                        "create_time": answer_time,
+                    }
+                    for answer, question_type, is_correct, answer_time in graded
+                ])
+                # 更新用户测试记录：答对/答错题目数、最新答题题目ID（与逐题提交的累计方式一致）
+                self.user_exam_service.update_by_id(db_session, id=user_exam.id, update_data={
+                    "correct_count": user_exam.correct_count + correct_count,
+                    "error_count": user_exam.error_count + len(graded) - correct_count,
+                    "last_question_id": graded[-1][0].question_id,
+                })
+
+            self.track_service.batch_update_question_tracks(db_session, user_id=pack["user_id"], exam_id=pack["exam_id"], answers=[
+                (answer.question_id, question_type, is_correct, answer_time) for answer, question_type, is_correct, answer_time in graded
+            ])
+
+        result = {
+            "pack_id": pack["pack_id"],
+            "answered_count": len(graded),
+            "correct_count": correct_count,
+            "error_count": len(graded) - correct_count,
+            "results": [
+                {"question_id": answer.question_id, "is_correct": is_correct, "right_option_ids": answer_key[answer.question_id][1]}
+                for answer, _, is_correct, _ in graded
+            ],
+        }
+
+        # 写入同步记录（立即flush，重复同步时在本事务内抛出主键冲突）
+        pack_sync = MpOfflinePackSyncModel(
+            pack_id=pack["pack_id"],
+            user_id=pack["user_id"],
+            exam_id=pack["exam_id"],
+            user_exam_id=pack["user_exam_id"],
+        )
+        pack_sync.result = result
+        db_session.add(pack_sync)
+        db_session.flush()
+        return result
@@ -1,10 +1,17 @@
-from typing import List
+from itertools import islice
+from typing import List, Tuple
 
+from module_exam.cache.question_cache import question_cache
+from module_exam.cache.question_payload_cache import question_payload_cache
 from module_exam.dao.mp_question_dao import MpQuestionDao
 from module_exam.dto.mp_option_dto import MpOptionDTO
 from module_exam.dto.mp_question_dto import MpQuestionDTO, MpQuestionOptionDTO
+from module_exam.model.mp_option_model import MpOptionModel
 from module_exam.model.mp_question_model import MpQuestionModel
 from base.base_service import BaseService
+from utils.conversion_util import models_to_dtos
+from utils.field_select_util import FieldSelector
+from utils.response_util import RESPONSE_FORMAT_JSON, dumps_raw_array
 
 # 继承Service类，专注于业务操作, 可添加自定义方法
 class MpQuestionService(BaseService[MpQuestionModel]):
@@ -20,84 +27,112 @@ class MpQuestionService(BaseService[MpQuestionModel]):
 
     def get_all_questionids(self, db_session, exam_id: int) -> List[int]:
         """
-        获取指定考试下的所有题目ID列表
+        获取指定考试下的所有正常状态的题目ID列表
         :param exam_id: 考试ID
-        :return: 包含随机题目ID的列表
+        :return: 题目ID列表
         """
-        sql = f"SELECT id FROM mp_question WHERE exam_id = {exam_id}"
-        result = self.dao_instance.get_list_by_execute_sql(db_session, sql=sql)
-        # 提取ID列表
-        question_ids = [item['id'] for item in result]
-        return question_ids
+        return self.dao_instance.get_question_ids_by_exam_id(db_session, exam_id, status=0)
 
-    def get_questions_with_options_by_questionids(self, db_session, question_ids: List[int]) -> List[MpQuestionOptionDTO]:
+    def get_questions_with_options_by_questionids(self, db_session, question_ids: List[int], fields: FieldSelector = None) -> List[MpQuestionOptionDTO]:
         """
         根据题目ID列表获取指定问题和对应的选项
         :param question_ids: 题目ID列表
+        :param fields: 稀疏字段选择器（相对于每个问题选项），只查询需要的列；为None时查询全部列
         :return: 包含问题和选项的列表
         """
 
         # 查询指定exam_id的所有问题
-        query_result = self.dao_instance.get_questions_with_options_by_questionids(db_session, question_ids)
-
-        # 构建问题选项字典
-        question_option_dict = {}
-        for question, option in query_result:
-            if question.id not in question_option_dict:
-                # 初始化问题条目
-                question_option_dict[question.id] = {
-                    "question": question,
-                    "options": []
-                }
-            # 如果选项不为None（outerjoin可能产生None），则添加到选项列表
-            if option is not None:
-                question_option_dict[question.id]["options"].append(option)
-
+        query_result = self.dao_instance.get_questions_with_options_by_questionids(db_session, question_ids, *self._select_columns(fields))
 
         # 转换为问题选项DTO列表
-        result_dto = []
-        for data in question_option_dict.values():
-            dto = MpQuestionOptionDTO(
-                question=MpQuestionDTO.model_validate(data["question"]),
-                options=[MpOptionDTO.model_validate(opt) for opt in data["options"]]
-            )
-            result_dto.append(dto)
+        return self._to_question_option_dtos(query_result)
 
-        # 返回问题选项DTO列表
-        return result_dto
 
+    def get_questions_with_options_cached(self, db_session, question_ids: List[int]) -> List[MpQuestionOptionDTO]:
+        """
+        根据题目ID列表获取问题和对应的选项（优先从题目缓存读取）
+        :param question_ids: 题目ID列表
+        :return: 按question_ids顺序排列的问题选项列表，不存在的题目不返回
+        """
+        question_option_map, missing_ids = question_cache.get_many(question_ids)
+        if missing_ids:
+            # 未命中的题目一次查询加载，并写回缓存
+            loaded_list = self.get_questions_with_options_by_questionids(db_session, missing_ids)
+            question_cache.set_many(loaded_list)
+            for item in loaded_list:
+                question_option_map[item.question.id] = item
+
+        return [question_option_map[question_id] for question_id in question_ids if question_id in question_option_map]
+
+    def get_questions_payload(self, db_session, question_ids: List[int], response_format: str = RESPONSE_FORMAT_JSON,
+                              fields: FieldSelector = None) -> Tuple[bytes, int]:
+        """
+        根据题目ID列表获取问题和对应的选项，直接返回序列化后的数组（优先从题目片段缓存读取）
+        :param question_ids: 题目ID列表
+        :param response_format: 响应格式（JSON或MessagePack）
+        :param fields: 稀疏字段选择器（相对于每个问题选项），为None时返回全部字段
+        :return: (按question_ids顺序排列的问题选项数组字节, 题目数量)，不存在的题目不返回
+        """
+        payload_map, missing_ids = question_payload_cache.get_many(question_ids, response_format, fields)
+        if missing_ids:
+            # 未命中的题目从题目缓存（或数据库）加载完整DTO，按稀疏字段裁剪、序列化后写回
+            # 完整DTO由题目缓存共享，不同字段组合不会重复查询数据库
+            payload_map.update(question_payload_cache.set_many(self.get_questions_with_options_cached(db_session, missing_ids), response_format, fields))
+
+        fragments = [payload_map[question_id] for question_id in question_ids if question_id in payload_map]
+        return dumps_raw_array(fragments, response_format), len(fragments)
 
-    def get_one_questions_with_options(self, db_session, question_id: int) -> MpQuestionOptionDTO:
+    def get_one_questions_with_options(self, db_session, question_id: int, fields: FieldSelector = None) -> MpQuestionOptionDTO:
         """
         根据问题ID获取问题和对应的选项
         :param question_id: 问题ID
+        :param fields: 稀疏字段选择器（相对于问题选项），只查询需要的列；为None时查询全部列
         :return: 包含问题和选项的列表
         """
 
         # 查询指定exam_id的所有问题
-        query_result = self.dao_instance.get_one_questions_with_options(db_session, question_id)
+        query_result = self.dao_instance.get_one_questions_with_options(db_session, question_id, *self._select_columns(fields))
+
+        # 转换为问题选项DTO
+        result_dto = self._to_question_option_dtos(query_result)
+        return result_dto[0] if result_dto else None
 
-        # 构建问题选项字典
+    @staticmethod
+    def _select_columns(fields: FieldSelector = None) -> Tuple[List[str], List[str]]:
+        """
+        稀疏字段转换为题目、选项需要查询的列
+        :return: (题目列名列表, 选项列名列表)，为None表示查询全部列
+        """
+        if fields is None:
+            return None, None
+        return (
+            fields.columns_of("question", MpQuestionModel.__table__.columns.keys()),
+            fields.columns_of("options", MpOptionModel.__table__.columns.keys(), required=("id", "question_id")),
+        )
+
+    @staticmethod
+    def _to_question_option_dtos(query_result) -> List[MpQuestionOptionDTO]:
+        """
+        (题目, 选项) 联表查询结果转换为问题选项DTO列表
+        所有题目、所有选项各自批量校验一次（缓存的TypeAdapter），不再逐个 model_validate
+        :param query_result: (MpQuestionModel, MpOptionModel或None) 的查询结果
+        :return: 问题选项DTO列表，按题目在查询结果中首次出现的顺序排列
+        """
+        # 构建问题 -> 选项列表字典
         question_option_dict = {}
         for question, option in query_result:
             if question.id not in question_option_dict:
-                # 初始化问题条目
-                question_option_dict[question.id] = {
-                    "question": question,
-                    "options": []
-                }
+                question_option_dict[question.id] = (question, [])
             # 如果选项不为None（outerjoin可能产生None），则添加到选项列表
             if option is not None:
-                question_option_dict[question.id]["options"].append(option)
+                question_option_dict[question.id][1].append(option)
 
+        groups = list(question_option_dict.values())
+        question_dtos = models_to_dtos([question for question, _ in groups], MpQuestionDTO)
+        option_dtos = iter(models_to_dtos([option for _, options in groups for option in options], MpOptionDTO))
 
-        # 转换为问题选项DTO
-        result_dto = None
-        for data in question_option_dict.values():
-            result_dto = MpQuestionOptionDTO(
-                question=MpQuestionDTO.model_validate(data["question"]),
-                options=[MpOptionDTO.model_validate(opt) for opt in data["options"]]
-            )
-
-        # 返回问题选项DTO列表
-        return result_dto
\ No newline at end of file
+        # 批量校验结果按原顺序依次分配回各题目
+        return [
+            MpQuestionOptionDTO(question=question_dto, options=list(islice(option_dtos, len(options))))
+            for question_dto, (_, options) in zip(question_dtos, groups)
+        ]
\ No newline at end of file
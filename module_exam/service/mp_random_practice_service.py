@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from config import exam_config
+from module_exam.cache.question_id_cache import question_id_cache
+from module_exam.dao.mp_question_dao import MpQuestionDao
+from module_exam.dao.mp_user_question_ebbinghaus_track_dao import MpUserQuestionEbbinghausTrackDao
+from module_exam.model.mp_question_model import MpQuestionModel
+from base.base_service import BaseService
+from utils.sampling_util import SamplingUtil
+
+
+# 随机练习抽题服务：按题型分层抽题，并按用户的错误率加权
+class MpRandomPracticeService(BaseService[MpQuestionModel]):
+    def __init__(self):
+        """
+        初始化服务实例
+        创建DAO实例并传递给基类
+        """
+        self.dao_instance = MpQuestionDao()
+        super().__init__(dao=self.dao_instance)
+
+        self.track_dao = MpUserQuestionEbbinghausTrackDao()
+
+    def choose_question_ids(self, db_session: Session, exam_id: int, count: int, user_id: int = None,
+                            type_mix: Dict[int, int] = None) -> List[int]:
+        """
+        随机抽取题目ID
+        :param exam_id: 考试ID
+        :param count: 最多抽题数量
+        :param user_id: 用户ID。不为空时按该用户的错误率加权，做错越多的题目越容易被抽中
+        :param type_mix: 题目类型 -> 抽题数量，例如 {1: 30, 2: 10, 3: 10}（1单选 2多选 3判断）。
+                         为空时按题库中各题型的数量等比例分配；各题型数量之和超过count时按比例缩减到count道
+        :return: 题目ID列表，按type_mix的题型顺序分组，组内随机顺序。某个题型题目不足时抽取该题型的全部题目
+        """
+        if type_mix:
+            type_mix = {question_type: type_count for question_type, type_count in type_mix.items() if type_count > 0}
+            # 客户端指定的数量不可信，超过抽题数量时按比例缩减，避免一次返回整个题库
+            if sum(type_mix.values()) > count:
+                type_mix = SamplingUtil.allocate_by_size(type_mix, count)
+
+        # 不分题型、不加权时，直接等概率抽样
+        if user_id is None and not type_mix:
+            return question_id_cache.sample(db_session, exam_id, count)
+
+        pool = question_id_cache.get_pool(db_session, exam_id)
+        if not type_mix:
+            type_mix = SamplingUtil.allocate_by_size({t: len(ids) for t, ids in pool.type_pools.items()}, count)
+
+        track_question_ids, track_error_rates = self._get_error_rates(db_session, user_id, exam_id)
+
+        result: List[int] = []
+        for question_type, type_count in type_mix.items():
+            type_ids = pool.type_pools.get(question_type)
+            if type_ids is None or type_count <= 0:
+                continue
+            weights = self._build_weights(type_ids, track_question_ids, track_error_rates)
+            result.extend(SamplingUtil.weighted_sample(type_ids, weights, type_count).tolist())
+        return result
+
+    def _get_error_rates(self, db_session: Session, user_id: Optional[int], exam_id: int):
+        """
+        查询用户在考试中每道题的错误率
+        :return: (题目ID数组(升序), 错误率数组)，用户为空或没有做题记录时返回空数组
+        """
+        if user_id is None:
+            return np.empty(0, dtype=np.uint32), np.empty(0)
+
+        rows = self.track_dao.get_answer_stat_list(db_session, user_id, exam_id)
+        question_ids = np.fromiter((row.question_id for row in rows), dtype=np.uint32, count=len(rows))
+        error_counts = np.fromiter((row.error_count for row in rows), dtype=np.float64, count=len(rows))
+        total_counts = np.fromiter((row.total_count for row in rows), dtype=np.float64, count=len(rows))
+        error_rates = np.divide(error_counts, total_counts, out=np.zeros_like(error_counts), where=total_counts > 0)
+        return question_ids, error_rates
+
+    @staticmethod
+    def _build_weights(type_ids: np.ndarray, track_question_ids: np.ndarray, track_error_rates: np.ndarray) -> np.ndarray:
+        """
+        计算题目池中每道题的抽题权重：1 + 系数 * 错误率
+        题目池和做题记录都按题目ID升序，用二分查找对齐，没有做题记录的题目错误率为0
+        """
+        weights = np.ones(len(type_ids))
+        if len(track_question_ids) == 0:
+            return weights
+
+        position = np.minimum(np.searchsorted(track_question_ids, type_ids), len(track_question_ids) - 1)
+        matched = track_question_ids[position] == type_ids
+        weights += exam_config.RANDOM_PRACTICE_ERROR_WEIGHT * np.where(matched, track_error_rates[position], 0.0)
+        return weights
@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config.log_config import logger
+from module_exam.dao.mp_user_exam_option_dao import MpUserExamOptionDao
+from module_exam.dao.mp_user_exam_result_dao import MpUserExamResultDao
+from module_exam.model.mp_user_exam_model import MpUserExamModel
+from module_exam.model.mp_user_exam_result_model import MpUserExamResultModel
+from module_exam.service.mp_question_service import MpQuestionService
+from base.base_service import BaseService
+
+# 继承Service类，专注于业务操作, 可添加自定义方法
+class MpUserExamResultService(BaseService[MpUserExamResultModel]):
+    def __init__(self):
+        """
+        初始化服务实例
+        创建DAO实例并传递给基类
+        """
+        self.dao_instance = MpUserExamResultDao()
+        super().__init__(dao = self.dao_instance)
+
+        self.user_exam_option_dao = MpUserExamOptionDao()
+        self.question_service = MpQuestionService()
+
+    # 可以根据业务需求添加自定义方法
+
+    def get_snapshot(self, db_session: Session, user_exam_id: int, user_id: int, user_exam_type: int) -> Optional[Dict[str, Any]]:
+        """
+        查询已完成测试记录的结果快照（主键查询）
+        :param user_exam_id: 用户测试记录ID
+        :param user_id: 用户ID，与快照所属用户不一致时视为不存在
+        :param user_exam_type: 用户测试类型，与快照类型不一致时视为不存在
+        :return: 结果数据，不存在返回None
+        """
+        snapshot = self.dao_instance.get_by_user_exam_id(db_session, user_exam_id)
+        if snapshot is None or snapshot.user_id != user_id or snapshot.type != user_exam_type:
+            return None
+        return snapshot.result
+
+    def save_snapshot(self, db_session: Session, user_exam: MpUserExamModel, result: Dict[str, Any]):
+        """
+        保存结果快照（只保存已完成的测试记录，需要由调用方提交事务）
+        并发首次查看同一测试记录时，只有一个请求能写入成功，其余请求忽略主键冲突
+        :param user_exam: 用户测试记录
+        :param result: build_result 生成的结果数据
+        """
+        if user_exam.finish_time is None:
+            return
+        snapshot = MpUserExamResultModel(
+            user_exam_id=user_exam.id,
+            user_id=user_exam.user_id,
+            exam_id=user_exam.exam_id,
+            type=user_exam.type,
+        )
+        snapshot.result = result
+        try:
+            # 使用SAVEPOINT，主键冲突时只回滚本次写入，不影响外层事务
+            with db_session.begin_nested():
+                db_session.add(snapshot)
+        except IntegrityError:
+            logger.info(f"结果快照已存在，user_exam_id={user_exam.id}")
+
+    def build_result(self, db_session: Session, user_exam: MpUserExamModel, exam_name: str) -> Dict[str, Any]:
+        """
+        计算测试记录的结果数据（题目+选项一次查询，答题记录一次查询）
+        :param user_exam: 用户测试记录
+        :param exam_name: 考试名称
+        :return: 结果数据。模拟考试(type=1)与顺序练习(type=0)的字段格式与各自的结果接口一致
+        """
+        question_ids = user_exam.question_ids if user_exam.question_ids else []
+        question_option_map = {
+            item.question.id: item
+            for item in self.question_service.get_questions_with_options_by_questionids(db_session, question_ids=question_ids)
+        } if question_ids else {}
+
+        # 题目ID -> 用户选择的选项ID列表（同一道题多次作答时取最新的答案）
+        user_answer_map: Dict[int, List[int]] = {}
+        for record in self.user_exam_option_dao.get_list_by_user_exam_id(db_session, user_exam.id):
+            option_ids = record.option_ids
+            if option_ids is not None:
+                user_answer_map[record.question_id] = option_ids if isinstance(option_ids, list) else [option_ids]
+
+        is_kaoshi = user_exam.type == 1
+        question_details = []
+        for question_id in question_ids:
+            question_with_options = question_option_map.get(question_id)
+            if question_with_options is None:
+                logger.warning(f"question_id={question_id} 不存在，跳过")
+                continue
+
+            question = question_with_options.question
+            options = question_with_options.options or []
+            option_id_to_text = {opt.id: opt.content for opt in options}
+            correct_answer_ids = [opt.id for opt in options if opt.is_right == 1]
+            user_answer_ids = user_answer_map.get(question_id, [])
+
+            # 判断是否答对（集合比较）
+            if is_kaoshi:
+                is_correct = 1 if set(correct_answer_ids) == set(user_answer_ids) else 0
+                question_details.append({
+                    "question_id": question.id,
+                    "question_type": question.type,
+                    "question_type_name": question.type_name,
+                    "question_name": question.name,
+                    "user_answer_text": [option_id_to_text[opt_id] for opt_id in user_answer_ids if opt_id in option_id_to_text],
+                    "correct_answer_text": [option_id_to_text[opt_id] for opt_id in correct_answer_ids],
+                    "is_correct": is_correct,
+                })
+            else:
+                if len(user_answer_ids) == 0:
+                    is_correct = -1  # 未答
+                else:
+                    is_correct = 1 if set(correct_answer_ids) == set(user_answer_ids) else 0
+                question_details.append({
+                    "question_id": question.id,
+                    "question_type": question.type,
+                    "question_type_name": question.type_name,
+                    "question_name": question.name,
+                    "user_answer": [option_id_to_text.get(opt_id, "") for opt_id in user_answer_ids],
+                    "correct_answer": [option_id_to_text[opt_id] for opt_id in correct_answer_ids],
+                    "is_correct": is_correct,
+                })
+
+        # 计算正确率（百分比，保留2位小数）
+        if is_kaoshi:
+            accuracy_rate = round((user_exam.correct_count / user_exam.total_count * 100), 2) if user_exam.total_count > 0 else 0.0
+            return {
+                "user_exam_id": user_exam.id,
+                "exam_id": user_exam.exam_id,
+                "exam_name": exam_name,
+                "user_id": user_exam.user_id,
+                "correct_count": user_exam.correct_count,
+                "total_count": user_exam.total_count,
+                "accuracy_rate": accuracy_rate,
+                "error_count": user_exam.total_count - user_exam.correct_count,
+                "question_detail_list": question_details,
+            }
+
+        accuracy_rate = round((user_exam.correct_count / (user_exam.correct_count + user_exam.error_count)) * 100, 2) if user_exam.correct_count > 0 else 0.0
+        return {
+            "user_exam_id": user_exam.id,
+            "exam_id": user_exam.exam_id,
+            "exam_name": exam_name,
+            "user_id": user_exam.user_id,
+            "correct_count": user_exam.correct_count,
+            "error_count": user_exam.error_count,
+            "total_count": user_exam.total_count,
+            "accuracy_rate": accuracy_rate,
+            "question_detail_list": question_details,
+        }
@@ -1,8 +1,16 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
+from module_exam.cache.user_exam_question_index_cache import user_exam_question_index_cache
 from module_exam.dao.mp_user_exam_dao import MpUserExamDao
+from module_exam.dao.mp_user_exam_option_dao import MpUserExamOptionDao
 from module_exam.model.mp_user_exam_model import MpUserExamModel
+from module_exam.service.mp_question_service import MpQuestionService
 from base.base_service import BaseService
+from utils.bitset_util import BitsetUtil
 
 # 继承Service类，专注于业务操作, 可添加自定义方法
 class MpUserExamService(BaseService[MpUserExamModel]):
@@ -14,6 +22,9 @@ class MpUserExamService(BaseService[MpUserExamModel]):
         self.dao_instance = MpUserExamDao()
         super().__init__(dao = self.dao_instance)
 
+        self.user_exam_option_dao = MpUserExamOptionDao()
+        self.question_service = MpQuestionService()
+
     # 可以根据业务需求添加自定义方法
 
 
@@ -34,3 +45,131 @@ class MpUserExamService(BaseService[MpUserExamModel]):
         # 根据user_id, exam_id, finish_time 字段 查询最近的已完成记录,按照id降序
         last_finished_user_exam = self.dao_instance.get_one_by_filter(db_session, {"user_id": user_id, "exam_id": exam_id, "finish_time": True}, ["-id"])
         return last_finished_user_exam
+
+
+    def mark_finished(self, db_session: Session, user_exam_id: int) -> bool:
+        """
+        将未完成的测试记录标记为已完成（完成时间为当前时间）
+        :return: 是否标记成功，测试记录已完成（如重复交卷）时返回False
+        """
+        return self.dao_instance.mark_finished(db_session, user_exam_id, datetime.now())
+
+    def get_history_page(self, db_session: Session, user_id: int, exam_id: int, user_exam_type: int,
+                         page_size: int, cursor: int = None) -> Tuple[List[Row], Optional[int]]:
+        """
+        键集分页获取用户某个考试的测试历史记录摘要（按id降序）
+        :param user_exam_type: 用户测试类型 0是顺序练习，1是模拟考试
+        :param page_size: 每页大小
+        :param cursor: 分页游标（上一页最后一条记录的id），为None表示查询第一页
+        :return: (当前页摘要行列表, 下一页游标)，下一页游标为None表示没有更多数据
+        """
+        # 多查一条，用来判断是否还有下一页
+        rows = self.dao_instance.get_history_page(db_session, user_id, exam_id, user_exam_type, page_size + 1, cursor)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = rows[-1].id if has_more else None
+        return rows, next_cursor
+
+    def get_question_window(self, db_session: Session, user_exam_id: int, question_id: int = None,
+                            before: int = 0, after: int = 10) -> Optional[Dict]:
+        """
+        获取测试记录中以某道题为中心的一批题目（题目 + 选项 + 本次测试的答题记录）
+        :param user_exam_id: 用户测试记录ID
+        :param question_id: 中心题目ID，为None时取测试记录的last_question_id
+        :param before: 向前取的题目数量
+        :param after: 向后取的题目数量
+        :return: 窗口数据字典；测试记录不存在返回None；题目不在测试记录中时 questions 为空列表
+
+        题目ID的位置从缓存的题目索引中查找，题目从题目缓存读取，答题记录用一次IN查询加载。
+        """
+        user_exam = None
+        if question_id is None:
+            user_exam = self.dao_instance.get_by_id(db_session, user_exam_id)
+            if user_exam is None:
+                return None
+            question_id = user_exam.last_question_id
+
+        index = user_exam_question_index_cache.get(db_session, user_exam_id, user_exam)
+        if index is None:
+            return None
+
+        position = index.position_of(question_id)
+        if position is None:
+            return {"question_id": question_id, "position": None, "total_count": len(index), "questions": []}
+
+        start, window_question_ids = index.window(position, before, after)
+        end = start + len(window_question_ids)
+
+        # 题目 + 选项（优先从题目缓存读取）
+        question_option_map = {
+            item.question.id: item
+            for item in self.question_service.get_questions_with_options_cached(db_session, window_question_ids)
+        }
+        # 本次测试中窗口内题目的答题记录，同一题多次作答时取最后一次
+        user_exam_option_map = {
+            item.question_id: item
+            for item in self.user_exam_option_dao.get_list_by_question_ids(db_session, user_exam_id, window_question_ids)
+        }
+
+        questions = []
+        for offset, window_question_id in enumerate(window_question_ids):
+            question_option = question_option_map.get(window_question_id)
+            user_exam_option = user_exam_option_map.get(window_question_id)
+            questions.append({
+                "position": start + offset,
+                "question_id": window_question_id,
+                "question_options": question_option.model_dump() if question_option else None,  # 题目已被删除时为None
+                "selected_option_ids": user_exam_option.option_ids if user_exam_option else None,  # 为None表示未答题
+                "is_correct": user_exam_option.is_correct if user_exam_option else None,
+            })
+
+        return {
+            "question_id": question_id,
+            "position": position,
+            "total_count": len(index),
+            "start_position": start,
+            "prev_question_id": index.question_ids[start - 1] if start > 0 else None,  # 窗口之前的一题，为None表示已到第一题
+            "next_question_id": index.question_ids[end] if end < len(index) else None,  # 窗口之后的一题，为None表示已到最后一题
+            "questions": questions,
+        }
+
+    def get_answer_card(self, db_session: Session, user_exam_id: int, answer_format: str = "json") -> Optional[Dict]:
+        """
+        获取测试记录的答题卡
+        :param user_exam_id: 用户测试记录ID
+        :param answer_format: 返回格式
+            - json：所有题目ID列表 + 已答题目的 {q_id, is_correct} 列表（兼容旧版客户端）
+            - bitset：已答/答对 两个base64位图，第i位对应测试记录题目ID快照中的第i道题
+        :return: 答题卡数据字典，测试记录不存在返回None
+        """
+        index = user_exam_question_index_cache.get(db_session, user_exam_id)
+        if index is None:
+            return None
+
+        # 只查询题目ID和是否答对，同一题多次作答时取最后一次
+        answer_map = {row.question_id: row.is_correct for row in self.user_exam_option_dao.get_answer_stat_list(db_session, user_exam_id)}
+
+        if answer_format != "bitset":
+            return {
+                "all_question_ids": index.question_ids.tolist(),
+                "user_exam_options_list": [{"q_id": question_id, "is_correct": is_correct} for question_id, is_correct in answer_map.items()],
+            }
+
+        answered_positions = []
+        correct_positions = []
+        for question_id, is_correct in answer_map.items():
+            position = index.position_of(question_id)
+            if position is None:
+                continue
+            answered_positions.append(position)
+            if is_correct:
+                correct_positions.append(position)
+
+        total_count = len(index)
+        return {
+            "total_count": total_count,
+            "answered_count": len(answered_positions),
+            "correct_count": len(correct_positions),
+            "answered_bitset": BitsetUtil.encode(answered_positions, total_count),
+            "correct_bitset": BitsetUtil.encode(correct_positions, total_count),
+        }
@@ -1,5 +1,5 @@
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -7,6 +7,17 @@ from module_exam.dao.mp_user_question_ebbinghaus_track_dao import MpUserQuestion
 from module_exam.model.mp_user_question_ebbinghaus_track import MpUserQuestionEbbinghausTrackModel
 from base.base_service import BaseService
 
+# 艾宾浩斯复习周期（天），复习周期索引对应的下次复习间隔
+REVIEW_CYCLE_LIST = [0, 1, 3, 7, 14, 30]
+
+# 轨迹记录中参与复习计算的字段
+_TRACK_STATE_FIELDS = ("correct_count", "error_count", "total_count", "last_answer_time", "status", "cycle_index", "next_review_time")
+
+
+def _to_date(value: date) -> date:
+    """datetime 转为日期（date 原样返回）"""
+    return value.date() if isinstance(value, datetime) else value
+
 # 继承Service类，专注于业务操作, 可添加自定义方法
 class MpUserQuestionEbbinghausTrackService(BaseService[MpUserQuestionEbbinghausTrackModel]):
     def __init__(self):
@@ -110,8 +121,6 @@ class MpUserQuestionEbbinghausTrackService(BaseService[MpUserQuestionEbbinghausT
 
         """
 
-        review_cycle_list = [0,1,3,7,14,30]
-
         # 先根据user_id,question_id查询该题目是否存在轨迹记录
         track_one = self.dao_instance.get_one_by_filters(
             db_session,
@@ -123,117 +132,142 @@ class MpUserQuestionEbbinghausTrackService(BaseService[MpUserQuestionEbbinghausT
 
         if not track_one:
             # 如果不存在轨迹记录，创建新记录
-            self.dao_instance.add(db_session, dict_data=MpUserQuestionEbbinghausTrackModel(
-                user_id=user_id,
-                exam_id=exam_id,
-                question_id=question_id,
-                question_type=question_type,
-                correct_count=1 if is_correct else 0,    # 答对次数
-                error_count=1 if not is_correct else 0,  # 答错次数
-                total_count=1,                       # 总答题次数
-                last_answer_time=datetime.now(), # 最后一次答题时间
-                status=0,       # 0:待复习 1:已巩固
-                cycle_index=0,  # 复习周期索引初始化为0，-1表示已巩固，其他值表示待复习的复习周期索引
-                next_review_time= datetime.now() + timedelta(days=review_cycle_list[0]),  # 下一次复习时间初始化为当前时间+复习周期对应的天数
-            ).to_dict())
-
+            self.dao_instance.add(db_session, dict_data={
+                "user_id": user_id,
+                "exam_id": exam_id,
+                "question_id": question_id,
+                "question_type": question_type,
+                **self._next_track_state(None, is_correct, datetime.now()),
+            })
         else:
-            # 若存在轨迹记录,则需要先判断该题目是什么？
-
-            new_cycle_index = None
-            new_next_review_time = None
-
-            # 如果当前题目是待复习题目
-            if track_one.status == 0:
-                if track_one.next_review_time == datetime.now().date():
-                    # 如果是当天待复习题目，答对索引+1，答错索引重置为0。下次更新时间为当前时间+复习周期对应的天数。
-                    if is_correct:
-                        new_cycle_index = track_one.cycle_index+1
-                        new_next_review_time = datetime.now() + timedelta(days=review_cycle_list[new_cycle_index])
-                    else:
-                        new_cycle_index = 0
-                        new_next_review_time = datetime.now() + timedelta(days=review_cycle_list[new_cycle_index])
-                elif track_one.next_review_time > datetime.now().date():
-                    # 如果是未到期待复习题，索引不变,下次复习时间不会改变
-                    new_cycle_index = track_one.cycle_index
-                    new_next_review_time = track_one.next_review_time
-                elif track_one.next_review_time < datetime.now().date():
-                    # 如果是已过期待复习题，根据是否在14天内判断是否需要更新索引
-                    if (datetime.now().date() - track_one.next_review_time).days <= 14:
-                        # 如果在14天内，答对索引+1。下次更新时间为当前时间+复习周期对应的天数。
-                        # 答错索引重置为0。下次更新时间为当前时间+复习周期对应的天数。
-                        if is_correct:
-                            new_cycle_index = track_one.cycle_index+1
-                            new_next_review_time = datetime.now() + timedelta(days=review_cycle_list[new_cycle_index])
-                        else:
-                            new_cycle_index = 0
-                            new_next_review_time = datetime.now() + timedelta(days=review_cycle_list[new_cycle_index])
-                    else:
-                        # 如果在14天外，答对索引不变。下次更新时间为当前时间。需要未来14天内再次复习。
-                        # 答错索引重置为0。下次更新时间为当前时间+复习周期对应的天数。
-                        if is_correct:
-                            new_cycle_index = track_one.cycle_index
-                            new_next_review_time = datetime.now()
-                        else:
-                            new_cycle_index = 0
-                            new_next_review_time = datetime.now() + timedelta(days=review_cycle_list[new_cycle_index])
-            else:
-                # 如果是已巩固题目，根据情况具体更新
-                if is_correct:
-                    # 若答对，索引和状态不变，更新其他信息
-                    new_cycle_index = track_one.cycle_index
-                    new_next_review_time = track_one.next_review_time
-                else:
-                    # 若答错，根据是否在120天内判断是否需要更新索引
-                    if (datetime.now().date() - track_one.last_answer_time).days <= 120:
-                        # 如果在120天内，索引和状态不变，更新其他信息
-                        new_cycle_index = track_one.cycle_index
-                        new_next_review_time = track_one.next_review_time
-                    else:
-                        # 如果在120天外，索引重置为0。下次复习时间为当前时间+复习周期对应的天数。
-                        # 即超过120天答错，已巩固题变为当天待复习题。
-                        new_cycle_index = 0
-                        new_next_review_time = datetime.now() + timedelta(days=review_cycle_list[new_cycle_index])
-
-
-            if new_cycle_index >= len(review_cycle_list):
-                # 如果新的复习周期索引超过了最大索引，说明待复习题变为已巩固，则设置status为1，cycle_index为-1
-                new_status = 1
-                new_cycle_index = -1
-            else:
-                # 如果新的复习周期索引未超过最大索引，说明仍然是待复习题
-                new_status = track_one.status
-
-            # 更新轨迹记录
+            # 若存在轨迹记录，按题目当前所处的复习阶段更新记录
             self.dao_instance.update_by_id(
                 db_session,
                 id=track_one.id,
-                update_data=MpUserQuestionEbbinghausTrackModel(
-                    correct_count=track_one.correct_count+1 if is_correct else track_one.correct_count, # 答对次数
-                    error_count=track_one.error_count+1 if not is_correct else track_one.error_count, # 答错次数
-                    total_count=track_one.total_count+1,                       # 总答题次数
-                    last_answer_time=datetime.now(), # 最后一次答题时间
-                    status=new_status,       # 更新状态 0:待复习 1:已巩固
-                    cycle_index=new_cycle_index,  # 更新复习周期索引初始化为0，-1表示已巩固，其他值表示待复习的复习周期索引
-                    next_review_time= new_next_review_time,  # 更新下一次复习时间
-                ).to_dict(),
+                update_data=self._next_track_state(self._track_state_of(track_one), is_correct, datetime.now()),
             )
 
-
-    def find_missed_question_ids(self, db_session: Session, exam_id: int) -> List[MpUserQuestionEbbinghausTrackModel]:
+    def batch_update_question_tracks(self, db_session: Session, user_id: int, exam_id: int,
+                                     answers: List[Tuple[int, int, int, datetime]]) -> int:
+        """
+        批量更新题目答题轨迹记录（规则与 update_question_track 相同）
+        一次查询所有题目的轨迹，在内存中按答题顺序依次计算，新记录一条INSERT批量插入，已有记录按主键批量UPDATE
+        :param answers: 答题列表 [(题目ID, 题目类型, 是否答对 0/1, 答题时间)]，按答题时间先后排列；同一题目可出现多次
+        :return: 更新（含新建）的轨迹记录数
         """
-        从轨迹表中查询用户已做过且错过的题目ID列表
+        if not answers:
+            return 0
+
+        question_ids = list(dict.fromkeys(question_id for question_id, _, _, _ in answers))
+        track_map: Dict[int, MpUserQuestionEbbinghausTrackModel] = {}
+        for track in self.dao_instance.get_list_by_filters(
+                db_session, filters={"user_id": user_id, "question_id__in": question_ids}, sort_by=["id"]):
+            # 与单题更新一致，同一题目有多条轨迹时取第一条
+            track_map.setdefault(track.question_id, track)
+
+        # 题目ID -> 答题后的轨迹字段
+        state_map: Dict[int, Dict[str, Any]] = {question_id: self._track_state_of(track) for question_id, track in track_map.items()}
+        question_type_map: Dict[int, int] = {}
+        for question_id, question_type, is_correct, answer_time in answers:
+            state_map[question_id] = self._next_track_state(state_map.get(question_id), is_correct, answer_time)
+            question_type_map[question_id] = question_type
+
+        self.dao_instance.batch_add(db_session, [
+            {"user_id": user_id, "exam_id": exam_id, "question_id": question_id, "question_type": question_type_map[question_id], **state_map[question_id]}
+            for question_id in question_ids if question_id not in track_map
+        ])
+        self.dao_instance.batch_update_by_id(db_session, [
+            {"id": track_map[question_id].id, **state_map[question_id]}
+            for question_id in question_ids if question_id in track_map
+        ])
+        return len(question_ids)
+
+    @staticmethod
+    def _track_state_of(track: MpUserQuestionEbbinghausTrackModel) -> Dict[str, Any]:
+        """轨迹记录中参与复习计算的字段"""
+        return {name: getattr(track, name) for name in _TRACK_STATE_FIELDS}
+
+    @staticmethod
+    def _next_track_state(track_state: Optional[Dict[str, Any]], is_correct: int, answer_time: datetime) -> Dict[str, Any]:
         """
+        计算一次答题后的轨迹字段（规则见 update_question_track 的说明）
+        :param track_state: 答题前的轨迹字段（见 _TRACK_STATE_FIELDS），为None表示该题目未答过
+        :param is_correct: 是否答对 0:答错 1:答对
+        :param answer_time: 答题时间
+        :return: 答题后的轨迹字段
+        """
+        if track_state is None:
+            # 未答过的题目：复习周期索引初始为0，下次复习时间为答题时间+复习周期对应的天数
+            return {
+                "correct_count": 1 if is_correct else 0,    # 答对次数
+                "error_count": 1 if not is_correct else 0,  # 答错次数
+                "total_count": 1,                           # 总答题次数
+                "last_answer_time": answer_time,            # 最后一次答题时间
+                "status": 0,       # 0:待复习 1:已巩固
+                "cycle_index": 0,  # 复习周期索引初始化为0，-1表示已巩固，其他值表示待复习的复习周期索引
+                "next_review_time": answer_time + timedelta(days=REVIEW_CYCLE_LIST[0]),
+            }
+
+        # 数据库中的复习时间为datetime，按日期比较
+        answer_date = answer_time.date()
+        next_review_date = _to_date(track_state["next_review_time"])
+        cycle_index = track_state["cycle_index"]
+        new_cycle_index = cycle_index
+        new_next_review_time = track_state["next_review_time"]
+        if track_state["status"] == 0:
+            if next_review_date == answer_date:
+                # 如果是当天待复习题目，答对索引+1，答错索引重置为0
+                new_cycle_index = cycle_index + 1 if is_correct else 0
+                new_next_review_time = None
+            elif next_review_date < answer_date:
+                if (answer_date - next_review_date).days <= 14:
+                    # 已过期14天内：答对索引+1，答错索引重置为0
+                    new_cycle_index = cycle_index + 1 if is_correct else 0
+                    new_next_review_time = None
+                elif is_correct:
+                    # 已过期14天外答对：索引不变，下次复习时间为答题时间，需要未来14天内再次复习
+                    new_next_review_time = answer_time
+                else:
+                    new_cycle_index = 0
+                    new_next_review_time = None
+            # 未到期待复习题：索引和下次复习时间不变
+        elif not is_correct and (answer_date - _to_date(track_state["last_answer_time"])).days > 120:
+            # 已巩固题目超过120天答错，变为当天待复习题；其余情况索引和状态不变
+            new_cycle_index = 0
+            new_next_review_time = None
 
-        question_ids: List[dict] = self.dao_instance.get_list_by_execute_sql(
+        new_status = track_state["status"]
+        if new_cycle_index >= len(REVIEW_CYCLE_LIST):
+            # 如果新的复习周期索引超过了最大索引，说明待复习题变为已巩固，则设置status为1，cycle_index为-1
+            new_status = 1
+            new_cycle_index = -1
+            new_next_review_time = answer_time + timedelta(days=REVIEW_CYCLE_LIST[-1])
+        elif new_next_review_time is None:
+            # 下次复习时间为答题时间+新的复习周期对应的天数
+            new_status = 0
+            new_next_review_time = answer_time + timedelta(days=REVIEW_CYCLE_LIST[new_cycle_index])
+
+        return {
+            "correct_count": track_state["correct_count"] + 1 if is_correct else track_state["correct_count"],  # 答对次数
+            "error_count": track_state["error_count"] + 1 if not is_correct else track_state["error_count"],  # 答错次数
+            "total_count": track_state["total_count"] + 1,  # 总答题次数
+            "last_answer_time": answer_time,  # 最后一次答题时间
+            "status": new_status,  # 更新状态 0:待复习 1:已巩固
+            "cycle_index": new_cycle_index,  # 更新复习周期索引，-1表示已巩固
+            "next_review_time": new_next_review_time,  # 更新下一次复习时间
+        }
+
+
+    def find_missed_question_ids(self, db_session: Session, user_id: int, exam_id: int) -> List[MpUserQuestionEbbinghausTrackModel]:
+        """
+        从轨迹表中查询用户在某个考试中已做过且错过的题目轨迹列表
+        分页查询请使用 MpErrorBookService.get_error_question_page
+        """
+        return self.dao_instance.get_list_by_filters(
             db_session,
-            sql="SELECT * FROM mp_user_question_ebbinghaus_track WHERE exam_id = :exam_id AND error_count > 0 ",
-            params={"exam_id": exam_id},
+            filters={
+                "user_id": user_id,
+                "exam_id": exam_id,
+                "error_count__gt": 0,
+            },
         )
-        return [ MpUserQuestionEbbinghausTrackModel(**item) for item in question_ids]
-
-
-
-
-
-
@@ -0,0 +1,63 @@
+import argparse
+
+from config.database_config import mySessionLocal
+from config.log_config import logger
+from module_exam.dao.mp_exam_dao import MpExamDao
+from module_exam.service.mp_user_exam_result_service import MpUserExamResultService
+
+"""
+用户测试结果快照回填任务
+为已完成但还没有结果快照的历史测试记录生成快照（上线结果快照功能后执行一次即可，可重复执行）
+1. 按id键集分页扫描已完成且没有快照的测试记录，每批一个独立的短事务
+2. 每条记录的结果计算只需两次查询（题目+选项、答题记录），考试名称按批次一次查询
+执行方式（项目根目录下）：python -m module_exam.task.user_exam_result_backfill --batch-size 200
+"""
+
+# 创建服务实例
+user_exam_result_service = MpUserExamResultService()
+exam_dao = MpExamDao()
+
+
+def backfill_user_exam_results(batch_size: int = 200) -> int:
+    """
+    执行结果快照回填
+    :param batch_size: 每批处理的测试记录数量
+    :return: 本次生成的快照数量
+    """
+    total = 0
+    last_id = 0
+    while True:
+        # 每个批次使用独立的会话和事务
+        db_session = mySessionLocal()
+        try:
+            with db_session.begin():
+                user_exam_list = user_exam_result_service.dao_instance.get_unsnapshotted_user_exam_list(db_session, last_id, batch_size)
+                if not user_exam_list:
+                    break
+
+                exam_name_map = {
+                    exam.id: exam.name
+                    for exam in exam_dao.get_list_by_ids(db_session, list({user_exam.exam_id for user_exam in user_exam_list}))
+                }
+                for user_exam in user_exam_list:
+                    result = user_exam_result_service.build_result(db_session, user_exam, exam_name_map.get(user_exam.exam_id))
+                    user_exam_result_service.save_snapshot(db_session, user_exam, result)
+                last_id = user_exam_list[-1].id
+        finally:
+            db_session.close()
+
+        total += len(user_exam_list)
+        logger.info(f"结果快照回填：本批{len(user_exam_list)}条，累计{total}条，last_id={last_id}")
+        if len(user_exam_list) < batch_size:
+            break
+
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="为已完成的历史测试记录生成结果快照")
+    parser.add_argument("--batch-size", type=int, default=200, help="每批处理的测试记录数量")
+    args = parser.parse_args()
+
+    count = backfill_user_exam_results(batch_size=max(args.batch_size, 1))
+    logger.info(f"结果快照回填完成，共生成{count}条")
@@ -0,0 +1,71 @@
+from typing import FrozenSet
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import mall_config
+from module_mall.dao.order_product_dao import OrderProductDao
+from utils.cache_util import TTLCache
+
+
+class EntitlementCache:
+    """
+    用户商品权益进程内缓存
+    - 以用户为单位缓存该用户已支付订单中的商品ID集合（frozenset）
+    - 权限检查命中缓存时是一次集合查找；缓存中没有该商品时重新查询数据库再判断，拒绝访问总是以数据库为准
+      （其他worker进程刚支付的订单不会因为本进程缓存的旧数据被拒绝）
+    - 订单支付、退款时调用 refresh_on_commit 主动刷新本进程中该用户的缓存
+    - 缓存有效期由 ENTITLEMENT_CACHE_TTL_SECONDS 控制（较短），其他进程退款后已缓存的权益最多保留该时长
+    """
+
+    def __init__(self, ttl_seconds: int, max_users: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        :param max_users: 最多缓存的用户数量
+        """
+        self._cache: TTLCache[FrozenSet[int]] = TTLCache(ttl_seconds=ttl_seconds, max_size=max_users)
+        self._order_product_dao = OrderProductDao()
+
+    def get_product_ids(self, db_session: Session, user_id: int) -> FrozenSet[int]:
+        """
+        获取用户已购买的商品ID集合
+        :param user_id: 用户ID
+        :return: 商品ID集合
+        """
+        return self._cache.get_or_load(
+            user_id,
+            lambda: frozenset(self._order_product_dao.get_paid_product_ids_by_user_id(db_session, user_id)),
+        )
+
+    def has_access(self, db_session: Session, user_id: int, product_id: int) -> bool:
+        """
+        判断用户是否已购买某个商品
+        :param user_id: 用户ID
+        :param product_id: 商品ID
+        """
+        product_ids = self._cache.get(user_id)
+        if product_ids is not None:
+            if product_id in product_ids:
+                return True
+            # 缓存中没有该商品：可能是其他进程刚支付的订单，丢弃缓存后按数据库重新判断
+            self.invalidate(user_id)
+        return product_id in self.get_product_ids(db_session, user_id)
+
+    def invalidate(self, user_id: int):
+        """立即失效某个用户的缓存，下一次访问时重新加载"""
+        self._cache.pop(user_id)
+
+    def refresh_on_commit(self, db_session: Session, user_id: int):
+        """
+        失效某个用户的缓存，并在当前事务结束（提交或回滚）后再失效一次。
+        防止事务提交前有请求重新加载到旧数据。
+        """
+        self.invalidate(user_id)
+        event.listen(db_session, "after_transaction_end", lambda session, transaction: self.invalidate(user_id), once=True)
+
+
+# 全局单例，进程内共享
+entitlement_cache = EntitlementCache(
+    ttl_seconds=mall_config.ENTITLEMENT_CACHE_TTL_SECONDS,
+    max_users=mall_config.ENTITLEMENT_CACHE_MAX_USERS,
+)
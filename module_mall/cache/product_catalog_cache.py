@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from config import mall_config
+from module_mall.dto.product_dto import ProductDTO
+from module_mall.model.product_model import ProductModel
+
+
+class ProductCatalogCache:
+    """
+    商品目录进程内缓存
+    - 商品表数据量小、读多写少，整表加载到内存，按 (type_code, status) 分组保存商品id列表
+    - 分页查询、总数统计、商品详情、批量查询都直接从内存返回
+    - 商品变更时调用 invalidate / invalidate_on_commit 主动失效，下一次访问时重新加载
+    - 缓存有效期由 PRODUCT_CATALOG_CACHE_TTL_SECONDS 控制，用于兜底多worker进程间的数据同步
+    """
+
+    def __init__(self, ttl_seconds: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        """
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # 缓存快照：(商品id -> 商品DTO, (type_code, status) -> 商品id列表)，整体替换保证读取的一致性
+        self._snapshot: Tuple[Dict[int, ProductDTO], Dict[Tuple[Optional[str], Optional[int]], List[int]]] = ({}, {})
+        # 缓存过期时间（time.monotonic），0表示未加载或已失效
+        self._expire_at: float = 0.0
+        # 失效版本号，每次失效时递增。加载期间发生过失效时，加载到的快照可能是旧数据，不延长缓存有效期
+        self._generation = 0
+
+    def _load(self, db_session: Session):
+        """
+        从数据库整表加载商品，构建分组索引
+        :return: 缓存快照
+        """
+        product_list = db_session.execute(select(ProductModel).order_by(ProductModel.id)).scalars().all()
+
+        products: Dict[int, ProductDTO] = {}
+        groups: Dict[Tuple[Optional[str], Optional[int]], List[int]] = {}
+        for product in product_list:
+            dto = ProductDTO.model_validate(product)
+            products[dto.id] = dto
+            # 按 (type_code, status) 分组，同时按 (None, status) 保存不区分类型的分组
+            groups.setdefault((dto.type_code, dto.status), []).append(dto.id)
+            groups.setdefault((None, dto.status), []).append(dto.id)
+
+        return products, groups
+
+    def _get_snapshot(self, db_session: Session):
+        """
+        获取缓存快照，缓存过期时重新加载（同一时间只有一个线程加载）
+        加载期间缓存被失效时，加载到的可能是旧数据，保持失效状态，下一次访问时重新加载
+        """
+        if time.monotonic() >= self._expire_at:
+            with self._lock:
+                if time.monotonic() >= self._expire_at:
+                    generation = self._generation
+                    self._snapshot = self._load(db_session)
+                    self._expire_at = time.monotonic() + self._ttl_seconds
+                    # 先设置过期时间再检查版本号：invalidate 先递增版本号再清零过期时间，两者交错时过期时间总会被清零
+                    if generation != self._generation:
+                        self._expire_at = 0.0
+        return self._snapshot
+
+    def get(self, db_session: Session, product_id: int) -> Optional[ProductDTO]:
+        """
+        根据商品ID获取商品
+        :param product_id: 商品ID
+        :return: 商品DTO，不存在返回None
+        """
+        products, _ = self._get_snapshot(db_session)
+        return products.get(product_id)
+
+    def get_many(self, db_session: Session, product_ids: List[int]) -> Dict[int, ProductDTO]:
+        """
+        根据商品ID列表批量获取商品
+        :param product_ids: 商品ID列表
+        :return: 商品ID -> 商品DTO 的字典，不存在的商品不在字典中
+        """
+        products, _ = self._get_snapshot(db_session)
+        return {product_id: products[product_id] for product_id in product_ids if product_id in products}
+
+    def get_page(self, db_session: Session, page_num: int, page_size: int, type_code: str = None, status: int = 1) -> Tuple[List[ProductDTO], int]:
+        """
+        分页获取商品列表
+        :param page_num: 页码，从1开始
+        :param page_size: 每页大小
+        :param type_code: 商品类型编码，为None表示不区分类型
+        :param status: 商品状态，默认1（上架）
+        :return: (当前页商品列表, 满足条件的商品总数)
+        """
+        products, groups = self._get_snapshot(db_session)
+        product_ids = groups.get((type_code, status), [])
+        offset = (max(page_num, 1) - 1) * page_size
+        return [products[product_id] for product_id in product_ids[offset:offset + page_size]], len(product_ids)
+
+    def invalidate(self):
+        """
+        立即失效缓存，下一次访问时重新加载
+        不加锁，不会等待正在进行的加载：并发失效时递增可能丢失一次，但版本号仍与加载开始时不同
+        """
+        self._generation += 1
+        self._expire_at = 0.0
+
+    def invalidate_on_commit(self, db_session: Session):
+        """
+        失效缓存，并在当前事务结束（提交或回滚）后再失效一次。
+        防止事务提交前有请求重新加载到旧数据。
+        """
+        self.invalidate()
+        event.listen(db_session, "after_transaction_end", lambda session, transaction: self.invalidate(), once=True)
+
+
+# 全局单例，进程内共享
+product_catalog_cache = ProductCatalogCache(ttl_seconds=mall_config.PRODUCT_CATALOG_CACHE_TTL_SECONDS)
@@ -7,8 +7,6 @@ from sqlalchemy.orm import Session
 from config.database_config import get_db_session
 from config.log_config import logger
 from module_mall.dto.order_dto import OrderDTO
-from module_mall.model.order_model import OrderModel
-from module_mall.model.order_product_model import OrderProductModel
 from module_mall.service.order_product_service import OrderProductService
 from module_mall.service.product_service import ProductService
 from module_mall.service.order_service import OrderService
@@ -44,41 +42,37 @@ def create_order(userId: int = Body(...),productIds: List[int] = Body(...),db_se
         if not productIds:
             return ResponseUtil.error(message="请选择要购买的商品")
 
-        # 获取商品信息
-        products = []
+        # 一次查询获取所有商品，在内存中校验
+        product_map = product_service.get_product_map(db_session, productIds)
+
         total_amount = Decimal('0')
+        # 创建订单商品的数据
+        order_items: List[dict] = []
         for product_id in productIds:
-            product = product_service.get_by_id(db_session, product_id)
+            product = product_map.get(product_id)
             if not product:
                 return ResponseUtil.error(message=f"商品ID {product_id} 不存在")
             if product.status != 1:
                 return ResponseUtil.error(message=f"商品 {product.name} 已下架")
 
-            products.append(product)
             total_amount += Decimal(str(product.current_price))
+            order_items.append({
+                "product_id": product.id,
+                "product_name": product.name,
+                "product_price": product.current_price,
+            })
 
-            # 生成订单号
+        # 生成订单号
         order_no = CommonUtil.generate_order_no()
 
         # 创建订单数据
-        order_data = OrderModel(
-            user_id=userId,  # 用户ID
-            order_no=order_no,  # 订单号
-            total_amount=total_amount,   # 订单总金额
-            pay_amount=total_amount,  # 实际支付金额，这里可以添加优惠券逻辑
-            status="PENDING",     # 订单状态：PENDING(待支付), PAID(已支付), REFUND(已退款), CANCELLED(已取消)
-        )
-
-        # 创建订单商品的数据
-        order_items: List[OrderProductModel] = []
-        for product in products:
-            order_item = OrderProductModel(
-                order_id=0,  # 临时值，会在创建订单后更新
-                product_id=product.id,
-                product_name=product.name,
-                product_price=product.current_price,
-            )
-            order_items.append(order_item)
+        order_data = {
+            "user_id": userId,  # 用户ID
+            "order_no": order_no,  # 订单号
+            "total_amount": total_amount,   # 订单总金额
+            "pay_amount": total_amount,  # 实际支付金额，这里可以添加优惠券逻辑
+            "status": "PENDING",     # 订单状态：PENDING(待支付), PAID(已支付), REFUND(已退款), CANCELLED(已取消)
+        }
 
         try:
             # 创建订单
@@ -145,6 +139,35 @@ def get_user_orders(
     )
 
 
+@router.post("/getUserOrderHistory")
+def get_user_order_history(
+        user_id: int = Body(...),
+        status: str = Body(None),
+        page_size: int = Body(10),
+        cursor: str = Body(None),
+        db_session: Session = Depends(get_db_session)
+):
+    """
+    分页获取用户订单历史（包含订单商品）
+    第一页不传cursor，之后每页传入上一页返回的next_cursor，next_cursor为空表示没有更多数据
+    """
+    logger.info(f'/api/order/getUserOrderHistory, user_id={user_id}, status={status}, page_size={page_size}, cursor={cursor}')
+
+    # 限制每页大小
+    page_size = min(max(page_size, 1), 50)
+    orders, next_cursor = order_service.get_user_order_history(db_session, user_id, page_size, status, cursor)
+
+    return ResponseUtil.success(
+        code=200,
+        message="success",
+        data={
+            "orders": orders,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
+    )
+
+
 @router.post("/cancelOrder")
 def cancel_order(
         order_id: int = Body(...),
@@ -183,42 +206,69 @@ def confirm_order_payment(
     """
     确认订单支付（支付成功后调用）
     """
-    logger.info(f'/api/order/confirmOrderPayment, order_id={order_id}, transaction_id={transaction_id}')
+    with db_session.begin():
+        logger.info(f'/api/order/confirmOrderPayment, order_id={order_id}, transaction_id={transaction_id}')
 
-    order = order_service.get_by_id(db_session, order_id)
-    if not order:
-        return ResponseUtil.error(message="订单不存在")
+        order = order_service.get_by_id(db_session, order_id)
+        if not order:
+            return ResponseUtil.error(message="订单不存在")
 
-    if order.status != 'PENDING':
-        return ResponseUtil.error(message="订单状态异常")
+        if order.status != 'PENDING':
+            return ResponseUtil.error(message="订单状态异常")
 
-    try:
-        # 更新订单状态
-        updated_order = order_service.update_order_status(
-            db_session,
-            order_id,
-            'PAID',
-            transaction_id=transaction_id,
-            pay_channel='WECHAT'
-        )
+        try:
+            # 更新订单状态。用户已购商品由已支付订单决定，事务提交后会刷新该用户的权益缓存
+            order_service.update_order_status(
+                db_session,
+                order_id,
+                'PAID',
+                transaction_id=transaction_id,
+                pay_channel='WECHAT'
+            )
 
-        # 为用户添加商品
-        order_items = order_product_service.get_by_order_id(db_session, order_id)
-        for item in order_items:
-            pass
-            # user_product_service.add_user_product(
-            #     db_session,
-            #     user_id=order.user_id,
-            #     product_id=item.product_id,
-            #     source_type='PURCHASE',
-            #     source_id=order_id
-            # )
+            return ResponseUtil.success(
+                code=200,
+                message="支付确认成功",
+                data={"status": 'PAID'}
+            )
+        except Exception as e:
+            logger.error(f"确认支付失败: {str(e)}")
+            return ResponseUtil.error(message="支付确认失败")
 
-        return ResponseUtil.success(
-            code=200,
-            message="支付确认成功",
-            data={"status": updated_order.status}
-        )
-    except Exception as e:
-        logger.error(f"确认支付失败: {str(e)}")
-        return ResponseUtil.error(message="支付确认失败")
\ No newline at end of file
+
+@router.post("/refundOrder")
+def refund_order(
+        order_id: int = Body(...),
+        refund_amount: Decimal = Body(None),
+        db_session: Session = Depends(get_db_session)
+):
+    """
+    订单退款（退款成功后调用）
+    """
+    with db_session.begin():
+        logger.info(f'/api/order/refundOrder, order_id={order_id}, refund_amount={refund_amount}')
+
+        order = order_service.get_by_id(db_session, order_id)
+        if not order:
+            return ResponseUtil.error(message="订单不存在")
+
+        if order.status != 'PAID':
+            return ResponseUtil.error(message="只有已支付订单可以退款")
+
+        try:
+            # 更新订单状态。事务提交后会刷新该用户的权益缓存，退款商品不再可访问
+            order_service.update_order_status(
+                db_session,
+                order_id,
+                'REFUNDED',
+                refund_amount=refund_amount if refund_amount is not None else order.pay_amount
+            )
+
+            return ResponseUtil.success(
+                code=200,
+                message="退款成功",
+                data={"status": 'REFUNDED'}
+            )
+        except Exception as e:
+            logger.error(f"订单退款失败: {str(e)}")
+            return ResponseUtil.error(message="订单退款失败")
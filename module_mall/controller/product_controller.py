@@ -1,12 +1,11 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from sqlalchemy.orm import Session
 
+from config import mall_config
 from config.database_config import get_db_session
 from config.log_config import logger
-from module_mall.dto.product_dto import ProductDTO
-from module_mall.model.product_model import ProductModel
 from module_mall.service.order_product_service import OrderProductService
 from module_mall.service.product_service import ProductService
 from module_mall.service.order_service import OrderService
@@ -31,30 +30,28 @@ order_product_service = OrderProductService()
 """
 
 @router.post("/getProductList")
-def get_product_list(page_num: int = Body(1),page_size: int = Body(10),
+def get_product_list(request: Request, page_num: int = Body(1),page_size: int = Body(10),
                      type_code: str = Body(None),db_session: Session = Depends(get_db_session)):
     """
     获取商品列表，并标注是否已购买
     """
     logger.info(f'/api/product/getProductList, page_num={page_num}, page_size={page_size}, type_code={type_code}')
 
-    # 构建查询条件(status=1表示上架商品)
-    query_data = ProductModel(status=1,type_code=type_code).to_dict()
-
-    # 分页查询
-    product_list = product_service.get_page_list_by_filters(
+    # 从商品目录缓存中分页查询上架商品(status=1)，total为满足条件的商品总数
+    product_list, total = product_service.get_product_page(
         db_session,
         page_num=page_num,
         page_size=page_size,
-        filters=query_data
+        type_code=type_code,
     )
 
-    return ResponseUtil.success(data={
-          "products": [ProductDTO.model_validate(product) for product in product_list],
+    # 带ETag和Cache-Control，商品列表未变化时返回304
+    return ResponseUtil.etag_success(request, data={
+          "products": product_list,
           "page_num": page_num,
           "page_size": page_size,
-          "total": len(product_list)
-        }
+          "total": total
+        }, cache_control=mall_config.PRODUCT_LIST_CACHE_CONTROL
     )
 
 
@@ -66,12 +63,13 @@ def get_product_detail(product_id: int = Body(embed=True),db_session: Session =
     """
     logger.info(f'/api/product/getProductDetail, product_id={product_id}')
 
-    product = product_service.get_by_id(db_session, product_id)
+    # 从商品目录缓存中获取商品详情
+    product = product_service.get_product_detail(db_session, product_id)
     if not product:
         return ResponseUtil.error(message="商品不存在")
 
     return ResponseUtil.success(
-        data=ProductDTO.model_validate(product)
+        data=product
     )
 
 @router.post("/getUserProducts")
@@ -80,19 +78,17 @@ def get_user_products(
         db_session: Session = Depends(get_db_session)
 ):
     """
-    获取用户的商品列表
+    获取用户已购买的商品列表
     """
     logger.info(f'/mp/product/getUserProducts, user_id={user_id}')
 
-    user_products = product_service.get_list_by_filters(db_session, filters={
-        "user_id": user_id,
-    })
+    user_products = product_service.get_user_products(db_session, user_id)
 
     return ResponseUtil.success(
         code=200,
         message="success",
         data={
-            "user_products": [product for product in user_products]
+            "user_products": user_products
         }
     )
 
@@ -108,4 +104,12 @@ def check_product_access(
     """
     logger.info(f'/mp/product/checkProductAccess, user_id={user_id}, product_id={product_id}')
 
+    has_access = product_service.check_product_access(db_session, user_id, product_id)
 
+    return ResponseUtil.success(
+        code=200,
+        message="success",
+        data={
+            "has_access": has_access
+        }
+    )
@@ -1,3 +1,9 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.engine import Row
+
 from module_mall.model.order_model import OrderModel
 from base.base_dao import BaseDao
 
@@ -8,11 +14,75 @@ class OrderDao(BaseDao[OrderModel]):
 
     def get_by_order_no(self, db_session, order_no: str):
         """根据订单号获取订单"""
-        return db_session.query(self.model).filter(self.model.order_no == order_no).first()
+        sql = select(self.model).where(self.model.order_no == order_no)
+        return db_session.execute(sql).scalars().first()
 
     def get_by_user_id(self, db_session, user_id: int, status: str = None):
         """根据用户ID获取订单列表"""
-        query = db_session.query(self.model).filter(self.model.user_id == user_id)
+        sql = select(self.model).where(self.model.user_id == user_id)
+        if status:
+            sql = sql.where(self.model.status == status)
+        sql = sql.order_by(self.model.create_time.desc(), self.model.id.desc())
+        return db_session.execute(sql).scalars().all()
+
+    def get_user_order_page(self, db_session, user_id: int, limit: int, status: str = None,
+                            last_create_time: datetime = None, last_id: int = None) -> List[OrderModel]:
+        """
+        键集分页查询用户订单（按创建时间、id倒序）
+        :param user_id: 用户ID
+        :param limit: 本页最多返回的记录数
+        :param status: 订单状态，为None表示不过滤
+        :param last_create_time: 上一页最后一条订单的创建时间，为None表示查询第一页
+        :param last_id: 上一页最后一条订单的id
+        :return: 订单列表
+
+        走 (user_id, create_time) 联合索引，从上一页的位置继续扫描，不使用offset，翻到任何一页的耗时都相同。
+        """
+        sql = select(self.model).where(self.model.user_id == user_id)
         if status:
-            query = query.filter(self.model.status == status)
-        return query.order_by(self.model.create_time.desc()).all()
\ No newline at end of file
+            sql = sql.where(self.model.status == status)
+        if last_create_time is not None and last_id is not None:
+            # (create_time, id) < (last_create_time, last_id)
+            sql = sql.where(or_(
+                self.model.create_time < last_create_time,
+                and_(self.model.create_time == last_create_time, self.model.id < last_id),
+            ))
+        sql = sql.order_by(self.model.create_time.desc(), self.model.id.desc()).limit(limit)
+        return db_session.execute(sql).scalars().all()
+
+    def get_expired_pending_batch(self, db_session, expire_before: datetime, limit: int) -> List[Row]:
+        """
+        查询一批超时未支付的订单（只查询 id 和 order_no）
+        :param expire_before: 创建时间早于该时间的待支付订单视为超时
+        :param limit: 本批次最多返回的记录数
+        :return: (id, order_no) 行列表
+
+        走 (status, create_time) 联合索引做范围扫描，扫描行数只与超时订单数有关，与订单表总量无关。
+        使用 FOR UPDATE SKIP LOCKED，多个 worker 同时执行时互不阻塞，也不会重复处理同一批订单。
+        """
+        sql = (
+            select(self.model.id, self.model.order_no)
+            .where(self.model.status == 'PENDING', self.model.create_time < expire_before)
+            .order_by(self.model.create_time, self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return db_session.execute(sql).all()
+
+    def update_status_by_ids(self, db_session, ids: List[int], from_status: str, to_status: str) -> int:
+        """
+        批量更新订单状态（单条UPDATE语句）
+        :param ids: 订单ID列表
+        :param from_status: 原状态，只有处于该状态的订单才会被更新，防止覆盖并发的支付结果
+        :param to_status: 新状态
+        :return: 受影响的行数
+        """
+        if not ids:
+            return 0
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_(ids), self.model.status == from_status)
+            .values(status=to_status, update_time=datetime.now())
+        )
+        result = db_session.execute(stmt)
+        return result.rowcount or 0
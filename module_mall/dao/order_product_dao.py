@@ -1,3 +1,8 @@
+from typing import List
+
+from sqlalchemy import select
+
+from module_mall.model.order_model import OrderModel
 from module_mall.model.order_product_model import OrderProductModel
 from base.base_dao import BaseDao
 
@@ -8,8 +13,27 @@ class OrderProductDao(BaseDao[OrderProductModel]):
 
     def get_by_order_id(self, db_session, order_id: int):
         """根据订单ID获取订单商品列表"""
-        return db_session.query(self.model).filter(self.model.order_id == order_id).all()
+        sql = select(self.model).where(self.model.order_id == order_id).order_by(self.model.id)
+        return db_session.execute(sql).scalars().all()
+
+    def get_list_by_order_ids(self, db_session, order_ids: List[int]) -> List[OrderProductModel]:
+        """根据订单ID列表获取订单商品列表（一次IN查询）"""
+        if not order_ids:
+            return []
+        sql = select(self.model).where(self.model.order_id.in_(order_ids)).order_by(self.model.id)
+        return db_session.execute(sql).scalars().all()
 
     def get_by_product_id(self, db_session, product_id: int):
         """根据商品ID获取订单商品列表"""
-        return db_session.query(self.model).filter(self.model.product_id == product_id).all()
\ No newline at end of file
+        sql = select(self.model).where(self.model.product_id == product_id)
+        return db_session.execute(sql).scalars().all()
+
+    def get_paid_product_ids_by_user_id(self, db_session, user_id: int) -> List[int]:
+        """根据用户ID获取该用户已支付订单中的商品ID列表（去重）"""
+        sql = (
+            select(self.model.product_id)
+            .join(OrderModel, OrderModel.id == self.model.order_id)
+            .where(OrderModel.user_id == user_id, OrderModel.status == 'PAID')
+            .distinct()
+        )
+        return db_session.execute(sql).scalars().all()
@@ -4,6 +4,8 @@ from decimal import Decimal
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 
+from module_mall.dto.order_product_dto import OrderProductDTO
+
 class OrderDTO(BaseModel):
     """订单DTO"""
     id: Optional[int] = None
@@ -22,3 +24,7 @@ class OrderDTO(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+
+class OrderWithItemsDTO(OrderDTO):
+    """订单DTO（包含订单商品列表）"""
+    order_items: List[OrderProductDTO] = []  # 订单商品列表
@@ -40,5 +40,9 @@ class OrderModel(myBaseModel):
         Index('index_id', 'id'),
         Index('index_order_no', 'order_no'),
         Index('index_user_id', 'user_id'),
+        # 用户订单历史按 (user_id, create_time) 做键集分页
+        Index('index_user_id_create_time', 'user_id', 'create_time'),
         Index('index_status', 'status'),
+        # 超时订单扫描使用 (status, create_time) 范围查询
+        Index('index_status_create_time', 'status', 'create_time'),
     )
\ No newline at end of file
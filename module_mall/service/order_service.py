@@ -1,10 +1,12 @@
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
+from module_mall.cache.entitlement_cache import entitlement_cache
 from module_mall.dao.order_dao import OrderDao
 from module_mall.dao.order_product_dao import OrderProductDao
+from module_mall.dto.order_dto import OrderWithItemsDTO
+from module_mall.dto.order_product_dto import OrderProductDTO
 from module_mall.model.order_model import OrderModel
-from module_mall.model.order_product_model import OrderProductModel
 from base.base_service import BaseService
 
 
@@ -19,16 +21,20 @@ class OrderService(BaseService[OrderModel]):
 
         self.order_product_dao = OrderProductDao()
 
-    def create_order(self, db_session, order_data: OrderModel, order_items: List[OrderProductModel]):
-        """创建订单及订单项"""
-        # 创建订单信息
-        order_data.create_time = datetime.now()
-        order = self.dao_instance.add(db_session, order_data.to_dict())
+    def create_order(self, db_session, order_data: Dict, order_items: List[Dict]) -> OrderModel:
+        """
+        创建订单及订单项
+        :param order_data: 订单数据字典
+        :param order_items: 订单商品数据字典列表（无需包含order_id）
+        """
+        # 创建订单信息，flush后拿到自增id
+        order_data['create_time'] = datetime.now()
+        order = self.dao_instance.add(db_session, order_data)
 
-        # 创建订单商品信息
+        # 所有订单商品用一条INSERT语句批量写入
         for item in order_items:
-            item.order_id = order.id
-            self.order_product_dao.add(db_session, item.to_dict())
+            item['order_id'] = order.id
+        self.order_product_dao.batch_add(db_session, order_items)
 
         return order
 
@@ -50,8 +56,80 @@ class OrderService(BaseService[OrderModel]):
             update_data['refund_time'] = datetime.now()
             update_data.update(kwargs)
 
+        # 支付、退款会改变用户已购商品，事务结束后刷新该用户的权益缓存
+        if status in ('PAID', 'REFUNDED'):
+            order = self.dao_instance.get_by_id(db_session, order_id)
+            if order:
+                entitlement_cache.refresh_on_commit(db_session, order.user_id)
+
         return self.dao_instance.update_by_id(db_session, order_id, update_data)
 
     def get_user_orders(self, db_session, user_id: int, status: str = None):
         """获取用户订单列表"""
-        return self.dao_instance.get_by_user_id(db_session, user_id, status)
\ No newline at end of file
+        return self.dao_instance.get_by_user_id(db_session, user_id, status)
+
+    def get_user_order_history(self, db_session, user_id: int, page_size: int, status: str = None,
+                               cursor: str = None) -> Tuple[List[OrderWithItemsDTO], Optional[str]]:
+        """
+        键集分页获取用户订单历史（包含订单商品）
+        :param user_id: 用户ID
+        :param page_size: 每页大小
+        :param status: 订单状态，为None表示不过滤
+        :param cursor: 分页游标，取上一页返回的next_cursor，为None表示查询第一页
+        :return: (当前页订单列表, 下一页游标)，下一页游标为None表示没有更多数据
+        """
+        last_create_time, last_id = self._parse_order_cursor(cursor)
+
+        # 多查一条，用来判断是否还有下一页
+        orders = self.dao_instance.get_user_order_page(db_session, user_id, page_size + 1, status, last_create_time, last_id)
+        has_more = len(orders) > page_size
+        orders = orders[:page_size]
+        if not orders:
+            return [], None
+
+        # 整页订单的订单商品用一次IN查询加载，再按订单id分组
+        items_map: Dict[int, List] = {}
+        for item in self.order_product_dao.get_list_by_order_ids(db_session, [order.id for order in orders]):
+            items_map.setdefault(item.order_id, []).append(item)
+
+        order_list = []
+        for order in orders:
+            order_dto = OrderWithItemsDTO.model_validate(order)
+            order_dto.order_items = [OrderProductDTO.model_validate(item) for item in items_map.get(order.id, [])]
+            order_list.append(order_dto)
+
+        next_cursor = self._build_order_cursor(orders[-1]) if has_more else None
+        return order_list, next_cursor
+
+    @staticmethod
+    def _build_order_cursor(order: OrderModel) -> str:
+        """根据本页最后一条订单生成分页游标，格式：创建时间_订单id"""
+        return f"{order.create_time.isoformat()}_{order.id}"
+
+    @staticmethod
+    def _parse_order_cursor(cursor: str = None) -> Tuple[Optional[datetime], Optional[int]]:
+        """解析分页游标，游标为空或格式错误时从第一页开始查询"""
+        if not cursor:
+            return None, None
+        try:
+            create_time, order_id = cursor.rsplit('_', 1)
+            return datetime.fromisoformat(create_time), int(order_id)
+        except ValueError:
+            return None, None
+
+    def close_expired_order_batch(self, db_session, expire_minutes: int, batch_size: int) -> List[str]:
+        """
+        关闭一批超时未支付的订单（需要在事务中调用）
+        :param expire_minutes: 订单超时时间（分钟）
+        :param batch_size: 本批次最多处理的订单数
+        :return: 本批次被关闭的订单号列表，为空表示已没有超时订单
+        """
+        expire_before = datetime.now() - timedelta(minutes=expire_minutes)
+        # 范围查询一批超时订单
+        expired_rows = self.dao_instance.get_expired_pending_batch(db_session, expire_before, batch_size)
+        if not expired_rows:
+            return []
+
+        # 整批订单只执行一次UPDATE
+        self.dao_instance.update_status_by_ids(db_session, [row.id for row in expired_rows], 'PENDING', 'CANCELLED')
+        return [row.order_no for row in expired_rows]
@@ -1,6 +1,10 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
+
+from module_mall.cache.entitlement_cache import entitlement_cache
+from module_mall.cache.product_catalog_cache import product_catalog_cache
 from module_mall.dao.product_dao import ProductDao
+from module_mall.dto.product_dto import ProductDTO
 from module_mall.model.product_model import ProductModel
 from base.base_service import BaseService
 
@@ -18,18 +22,72 @@ class ProductService(BaseService[ProductModel]):
         status = None if include_inactive else 1
         return self.dao_instance.get_by_type_code(db_session, type_code, status)
 
+    def get_product_map(self, db_session, product_ids: List[int]) -> Dict[int, ProductModel]:
+        """
+        根据商品ID列表批量获取商品（一次IN查询，用于下单）
+        下单需要最新的价格和上架状态，不读取商品目录缓存：其他worker进程修改商品时，本进程的缓存在有效期内不会失效
+        :param product_ids: 商品ID列表（可包含重复ID）
+        :return: 商品ID -> 商品 的字典，不存在的商品不在字典中
+        """
+        unique_ids = list(set(product_ids))
+        if not unique_ids:
+            return {}
+        return {product.id: product for product in self.dao_instance.get_list_by_ids(db_session, unique_ids)}
+
+    def get_product_detail(self, db_session, product_id: int) -> Optional[ProductDTO]:
+        """根据商品ID获取商品详情（从商品目录缓存读取）"""
+        return product_catalog_cache.get(db_session, product_id)
+
+    def get_product_page(self, db_session, page_num: int, page_size: int, type_code: str = None, status: int = 1) -> Tuple[List[ProductDTO], int]:
+        """
+        分页获取商品列表（从商品目录缓存读取）
+        :return: (当前页商品列表, 满足条件的商品总数)
+        """
+        return product_catalog_cache.get_page(db_session, page_num, page_size, type_code, status)
+
+    def get_user_products(self, db_session, user_id: int) -> List[ProductDTO]:
+        """获取用户已购买的商品列表（从用户权益缓存和商品目录缓存读取）"""
+        product_ids = sorted(entitlement_cache.get_product_ids(db_session, user_id))
+        product_map = product_catalog_cache.get_many(db_session, product_ids)
+        return [product_map[product_id] for product_id in product_ids if product_id in product_map]
+
+    def check_product_access(self, db_session, user_id: int, product_id: int) -> bool:
+        """判断用户是否有商品的访问权限（已购买该商品）"""
+        return entitlement_cache.has_access(db_session, user_id, product_id)
+
     def get_active_products(self, db_session):
         """获取上架的商品列表"""
         return self.dao_instance.get_by_status(db_session, 1)
 
     def create_product(self, db_session, product_data):
         """创建商品"""
-        return self.dao_instance.create(db_session, product_data)
+        return self.add(db_session, product_data)
 
     def update_product_price(self, db_session, product_id: int, new_price: Decimal):
         """更新商品价格"""
+        product_catalog_cache.invalidate_on_commit(db_session)
         return self.dao_instance.update_by_id(db_session, product_id, {'current_price': new_price})
 
+    def update_product_status(self, db_session, product_id: int, status: int):
+        """更新商品状态（1上架 0下架）"""
+        product_catalog_cache.invalidate_on_commit(db_session)
+        return self.dao_instance.update_by_id(db_session, product_id, {'status': status})
+
+    def add(self, db_session, dict_data: Dict = None) -> ProductModel:
+        """添加商品，并失效商品目录缓存"""
+        product_catalog_cache.invalidate_on_commit(db_session)
+        return super().add(db_session, dict_data)
+
+    def update_by_id(self, db_session, id: int, update_data: Dict = None) -> bool:
+        """更新商品，并失效商品目录缓存"""
+        product_catalog_cache.invalidate_on_commit(db_session)
+        return super().update_by_id(db_session, id, update_data)
+
+    def delete_by_id(self, db_session, id: int) -> bool:
+        """删除商品，并失效商品目录缓存"""
+        product_catalog_cache.invalidate_on_commit(db_session)
+        return super().delete_by_id(db_session, id)
+
     def is_product_free(self, product: ProductModel):
         """判断商品是否免费"""
         return product.current_price == 0
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Optional
+
+import requests
+
+from config import mall_config
+from config.database_config import mySessionLocal
+from config.log_config import logger
+from module_mall.service.order_service import OrderService
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl
+    fcntl = None
+
+"""
+超时订单关闭定时任务
+1. 按 (status, create_time) 索引范围扫描超时的待支付订单，每批最多 ORDER_EXPIRE_BATCH_SIZE 条
+2. 每批订单在一个独立的短事务中，用一条UPDATE语句改为已取消(CANCELLED)
+3. 可选：并发调用微信支付的关闭订单接口
+任务的执行时间只与超时订单数量有关，与订单表的总数据量无关。
+uvicorn --workers 启动的多个worker进程中，同一时间只有持有本机文件锁的一个进程执行扫描；多机部署时各机器的扫描用 SKIP LOCKED 互不重复。
+"""
+
+# 创建服务实例
+order_service = OrderService()
+
+
+def close_wechat_order(order_no: str) -> bool:
+    """
+    调用微信支付V3关闭订单接口
+    :param order_no: 商户订单号
+    :return: 是否关闭成功
+    """
+    # 按需导入：只有开启微信关单时才需要加载商户证书相关的依赖
+    from utils.wechat_pay_v3_util import WechatPayV3Util
+
+    try:
+        request_url = f"https://api.mch.weixin.qq.com/v3/pay/transactions/out-trade-no/{order_no}/close"
+        request_body_data = {"mchid": WechatPayV3Util.get_mch_id()}
+
+        # 生成随机字符串、时间戳和签名
+        nonce_str = WechatPayV3Util.generate_nonce_str()
+        timestamp = WechatPayV3Util.generate_timestamp()
+        signature = WechatPayV3Util.generate_sign(
+            request_method='POST',
+            request_url=request_url.split('https://api.mch.weixin.qq.com')[1],
+            nonce_str=nonce_str,
+            timestamp=timestamp,
+            request_body_data=request_body_data
+        )
+
+        headers = {
+            'Authorization': WechatPayV3Util.build_authorization(nonce_str, timestamp, signature),
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+        }
+        response = requests.post(request_url, json=request_body_data, headers=headers, timeout=10)
+        # 关单成功时微信返回204
+        if response.status_code == 204:
+            return True
+        logger.warning(f"微信关单失败: order_no={order_no}, {response.status_code} - {response.text}")
+        return False
+    except Exception as e:
+        logger.error(f"微信关单异常: order_no={order_no}, {str(e)}")
+        return False
+
+
+def close_wechat_orders(order_nos: List[str]) -> int:
+    """
+    并发调用微信关闭订单接口
+    :param order_nos: 商户订单号列表
+    :return: 关闭成功的订单数
+    """
+    with ThreadPoolExecutor(max_workers=mall_config.ORDER_EXPIRE_CLOSE_CONCURRENCY) as executor:
+        results = list(executor.map(close_wechat_order, order_nos))
+    return sum(1 for ok in results if ok)
+
+
+def sweep_expired_orders() -> int:
+    """
+    执行一次超时订单关闭
+    :return: 本次关闭的订单数
+    """
+    closed_count = 0
+    for _ in range(mall_config.ORDER_EXPIRE_MAX_BATCHES):
+        # 每个批次使用独立的会话和事务，锁只在本批次内持有
+        db_session = mySessionLocal()
+        try:
+            with db_session.begin():
+                order_nos = order_service.close_expired_order_batch(
+                    db_session,
+                    expire_minutes=mall_config.ORDER_EXPIRE_MINUTES,
+                    batch_size=mall_config.ORDER_EXPIRE_BATCH_SIZE,
+                )
+        finally:
+            db_session.close()
+
+        if not order_nos:
+            break
+        closed_count += len(order_nos)
+
+        # 本地订单关闭后，再通知微信支付关单（失败不影响本地状态）
+        if mall_config.ORDER_EXPIRE_CLOSE_WECHAT_ORDER:
+            success_count = close_wechat_orders(order_nos)
+            logger.info(f"微信关单完成: 成功{success_count}个, 失败{len(order_nos) - success_count}个")
+
+        # 不足一批，说明已处理完所有超时订单
+        if len(order_nos) < mall_config.ORDER_EXPIRE_BATCH_SIZE:
+            break
+
+    return closed_count
+
+
+def try_acquire_task_lock() -> Optional[IO]:
+    """
+    尝试获取本机的任务文件锁（非阻塞），保证同一台机器上只有一个worker进程执行扫描
+    文件锁在进程退出时由操作系统释放，其他worker进程在下一次执行时接管
+    :return: 持有文件锁的文件对象（关闭即释放锁），锁已被其他进程持有时返回None。不支持文件锁的系统（Windows本地开发）直接返回打开的文件
+    """
+    lock_file = open(os.path.join(tempfile.gettempdir(), "order_expire_task.lock"), "a")
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+async def run_order_expire_task():
+    """
+    定时执行超时订单关闭（在应用启动时创建为后台任务）
+    每个worker进程都会创建该任务，只有获取到本机文件锁的进程执行扫描，其他进程每个执行间隔重试获取一次
+    数据库操作在线程池中执行，避免阻塞事件循环
+    """
+    logger.info(f"超时订单关闭任务启动: 超时时间={mall_config.ORDER_EXPIRE_MINUTES}分钟, 执行间隔={mall_config.ORDER_EXPIRE_SWEEP_INTERVAL_SECONDS}秒")
+    lock_file = None
+    try:
+        while True:
+            if lock_file is None:
+                lock_file = try_acquire_task_lock()
+                if lock_file is not None:
+                    logger.info(f"超时订单关闭任务: 进程 {os.getpid()} 获取到任务锁，开始执行扫描")
+
+            if lock_file is not None:
+                try:
+                    closed_count = await asyncio.to_thread(sweep_expired_orders)
+                    if closed_count > 0:
+                        logger.info(f"超时订单关闭任务: 本次关闭{closed_count}个订单")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"超时订单关闭任务执行失败: {str(e)}")
+
+            await asyncio.sleep(mall_config.ORDER_EXPIRE_SWEEP_INTERVAL_SECONDS)
+    finally:
+        # 任务取消（应用关闭）时释放文件锁，其他进程可以接管
+        if lock_file is not None:
+            lock_file.close()
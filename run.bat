@@ -13,6 +13,8 @@ REM 配置参数（可修改）
 set IMAGE_NAME=xdj-newexam-service-fastapi-image
 set CONTAINER_NAME=xdj-newexam-service-fastapi-container
 set PORT=39666
+REM 雪花ID的worker id起始值，同一套数据库的多个容器（多台机器）需配置不重叠的值（如 0、16、32）
+if "%SNOWFLAKE_WORKER_ID_BASE%"=="" set SNOWFLAKE_WORKER_ID_BASE=0
 
 REM 日志函数
 :log_info
@@ -88,10 +90,16 @@ REM 创建并运行容器
 :create_container
     call :check_docker || exit /b 1
 
+    REM 离线练习包加密密钥从当前环境变量传入容器（如 set OFFLINE_PACK_SECRET_KEY=至少16个字符的随机字符串），未配置时离线练习接口不可用
+    if "%OFFLINE_PACK_SECRET_KEY%"=="" (
+        call :log_error "未配置环境变量 OFFLINE_PACK_SECRET_KEY"
+        exit /b 1
+    )
+
     call :log_info "创建并启动容器..."
 
     REM 创建新容器
-    docker run -d --name %CONTAINER_NAME% -p %PORT%:%PORT% --restart unless-stopped %IMAGE_NAME%
+    docker run -d --name %CONTAINER_NAME% -p %PORT%:%PORT% --restart unless-stopped -e OFFLINE_PACK_SECRET_KEY -e SNOWFLAKE_WORKER_ID_BASE=%SNOWFLAKE_WORKER_ID_BASE% %IMAGE_NAME%
     if %errorlevel% neq 0 (
         call :log_error "容器创建失败"
         exit /b 1
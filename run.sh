@@ -28,6 +28,8 @@
 IMAGE_NAME="xdj-newexam-service-fastapi-image"
 CONTAINER_NAME="xdj-newexam-service-fastapi-container"
 PORT=39666
+# 雪花ID的worker id起始值，同一套数据库的多个容器（多台机器）需配置不重叠的值（如 0、16、32），可通过环境变量覆盖
+SNOWFLAKE_WORKER_ID_BASE="${SNOWFLAKE_WORKER_ID_BASE:-0}"
 
 # 日志函数
 log_info() {
@@ -102,10 +104,16 @@ build_image() {
 create_container() {
     check_docker || return 1
 
+    # 离线练习包加密密钥从宿主机环境变量传入容器（如 export OFFLINE_PACK_SECRET_KEY=$(openssl rand -hex 32)），未配置时离线练习接口不可用
+    if [ -z "$OFFLINE_PACK_SECRET_KEY" ]; then
+        log_error "未配置环境变量 OFFLINE_PACK_SECRET_KEY"
+        return 1
+    fi
+
     log_info "创建并启动容器..."
 
     # 创建新容器
-    if docker run -d --name "$CONTAINER_NAME" -p "$PORT:$PORT" --restart unless-stopped "$IMAGE_NAME"; then
+    if docker run -d --name "$CONTAINER_NAME" -p "$PORT:$PORT" --restart unless-stopped -e OFFLINE_PACK_SECRET_KEY -e SNOWFLAKE_WORKER_ID_BASE="$SNOWFLAKE_WORKER_ID_BASE" "$IMAGE_NAME"; then
         log_success "容器创建成功: $CONTAINER_NAME"
         log_info "应用地址: http://localhost:$PORT"
         return 0
@@ -0,0 +1,217 @@
+import asyncio
+import posixpath
+import traceback
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import msgpack
+import orjson
+from fastapi import Request
+from pydantic import BaseModel, Field
+from starlette.exceptions import HTTPException
+
+from config import http_config
+from config.log_config import logger
+from utils.response_util import RESPONSE_FORMAT_MSGPACK, RESPONSE_MEDIA_TYPES, dumps, dumps_with_raw_fields, get_response_format
+
+# 子请求沿用批量请求的连接信息和异常处理器
+_INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "root_path", "client", "server", "app", "starlette.exception_handlers")
+
+# 子请求scope中的标记：批量请求接口检查到该标记时拒绝执行（子请求不能再发起批量请求）
+BATCH_NESTED_SCOPE_KEY = "batch.nested"
+
+# 不传给子请求的请求头：请求体相关的请求头按子请求重新生成；压缩、ETag 只对批量请求的整体响应生效
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"transfer-encoding", b"accept-encoding", b"if-none-match"}
+
+
+class BatchRequestItemDTO(BaseModel):
+    """批量请求中的一个子请求"""
+    id: Optional[str] = None  # 子请求标识，响应中原样返回，为None时使用子请求在列表中的下标
+    method: str = "POST"  # 请求方法
+    path: str  # 请求路径，如 /mp/exam/kaoshi/getQuestion，可带查询参数
+    body: Optional[Any] = None  # 请求体（JSON），为None时不发送请求体
+    headers: Optional[Dict[str, str]] = None  # 额外的请求头，如 If-None-Match；认证等请求头沿用批量请求的请求头
+    depends_on: List[str] = Field(default_factory=list)  # 依赖的子请求id（只能是排在前面的子请求），依赖的子请求都成功（见 BatchUtil._is_failed）后才执行
+
+
+class BatchUtil:
+    """
+    批量请求工具类：在进程内把子请求直接交给路由处理，不经过中间件
+    - 认证、日志、响应格式协商、压缩只对批量请求执行一次
+    - 没有依赖关系的子请求并发执行（同步接口在线程池中执行），每个子请求使用各自的数据库会话
+    - 子请求的响应体按批量请求协商的响应格式原样拼接到批量响应中，不再解析、不再序列化
+    """
+
+    @staticmethod
+    def validate(request: Request, items: List[BatchRequestItemDTO]) -> Optional[str]:
+        """
+        检查子请求列表
+        :return: 错误信息，检查通过返回None
+        """
+        if not items:
+            return "子请求列表不能为空"
+        if len(items) > http_config.BATCH_MAX_REQUESTS:
+            return f"子请求数量不能超过{http_config.BATCH_MAX_REQUESTS}个"
+        item_ids = set()
+        for index, item in enumerate(items):
+            item_id = item.id if item.id is not None else str(index)
+            if item_id in item_ids:
+                return f"子请求id重复: {item_id}"
+            if not item.path.startswith("/"):
+                return f"子请求路径无效: {item.path}"
+            if BatchUtil._normalize_path(item.path.partition("?")[0]) == BatchUtil._normalize_path(request.url.path):
+                return "子请求不能是批量请求"
+            for dependency in item.depends_on:
+                if dependency not in item_ids:
+                    return f"子请求 {item_id} 只能依赖排在前面的子请求: {dependency}"
+            item_ids.add(item_id)
+        return None
+
+    @staticmethod
+    def _normalize_path(path: str) -> str:
+        """路径解码（与子请求路由时一致）并规范化，如 /%62atch/ -> /batch，用于比较路径"""
+        return posixpath.normpath("/" + unquote(path).lstrip("/")).rstrip("/") or "/"
+
+    @staticmethod
+    async def run(request: Request, items: List[BatchRequestItemDTO]) -> List[bytes]:
+        """
+        执行所有子请求（调用前需先 validate）
+        :return: 按子请求顺序排列的响应片段（已按当前响应格式序列化），每个片段为 {"id", "status", "etag", "body"}
+        """
+        response_format = get_response_format()
+        # 被其他子请求依赖的子请求，需要检查响应体中的业务状态码
+        depended_ids = {dependency for item in items for dependency in item.depends_on}
+        tasks: Dict[str, asyncio.Task] = {}
+        for index, item in enumerate(items):
+            item_id = item.id if item.id is not None else str(index)
+            dependencies = [tasks[dependency] for dependency in item.depends_on]
+            # 任务创建时复制当前上下文，子请求沿用批量请求协商的响应格式
+            tasks[item_id] = asyncio.ensure_future(BatchUtil._run_item(
+                request, item, item_id, dependencies, response_format, check_failed=item_id in depended_ids
+            ))
+
+        results = await asyncio.gather(*tasks.values())
+        return [fragment for _, fragment in results]
+
+    @staticmethod
+    async def _run_item(request: Request, item: BatchRequestItemDTO, item_id: str, dependencies: List[asyncio.Task],
+                        response_format: str, check_failed: bool = False) -> Tuple[bool, bytes]:
+        """
+        等待依赖的子请求完成后执行子请求，依赖的子请求失败时不执行，状态码为424
+        :param check_failed: 是否检查子请求是否失败（只有被其他子请求依赖时需要检查）
+        :return: (是否失败, 响应片段)
+        """
+        if dependencies:
+            dependency_results = await asyncio.gather(*dependencies)
+            if any(failed for failed, _ in dependency_results):
+                return True, dumps({"id": item_id, "status": 424, "etag": None, "body": None}, response_format)
+
+        status_code, headers, body = await BatchUtil._dispatch(request, item)
+        failed = check_failed and BatchUtil._is_failed(status_code, headers.get("content-type", ""), body)
+
+        # 子请求的响应体与批量响应格式一致时原样拼接；异常处理器返回的JSON按批量响应格式转换；304等没有响应体时为None
+        content_type = headers.get("content-type", "")
+        if not body:
+            body_fragment = dumps(None, response_format)
+        elif content_type.startswith(RESPONSE_MEDIA_TYPES[response_format]):
+            body_fragment = body
+        elif content_type.startswith("application/json"):
+            body_fragment = dumps(orjson.loads(body), response_format)
+        else:
+            logger.warning(f"BatchUtil ==> 子请求 {item.path} 的响应类型 {content_type} 不支持批量返回")
+            body_fragment = dumps(None, response_format)
+
+        return failed, dumps_with_raw_fields(
+            {"id": item_id, "status": status_code, "etag": headers.get("etag")}, {"body": body_fragment}, response_format
+        )
+
+    @staticmethod
+    def _is_failed(status_code: int, content_type: str, body: bytes) -> bool:
+        """
+        判断子请求是否失败：HTTP状态码>=400，或响应体中的业务状态码 code 不是200
+        （本项目的业务错误由 ResponseUtil.error 返回，HTTP状态码为200，错误码在响应体的 code 中）
+        304等没有响应体、或响应体没有 code 字段时视为成功
+        """
+        if status_code >= 400:
+            return True
+        if not body:
+            return False
+        try:
+            if content_type.startswith(RESPONSE_MEDIA_TYPES[RESPONSE_FORMAT_MSGPACK]):
+                content = msgpack.unpackb(body)
+            elif content_type.startswith("application/json"):
+                content = orjson.loads(body)
+            else:
+                return False
+        except (ValueError, msgpack.UnpackException):
+            return True
+        code = content.get("code") if isinstance(content, dict) else None
+        return code is not None and code != 200
+
+    @staticmethod
+    async def _dispatch(request: Request, item: BatchRequestItemDTO) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        在进程内执行一个子请求
+        :return: (状态码, 响应头（小写）, 响应体)
+        """
+        body = orjson.dumps(item.body) if item.body is not None else b""
+        extra_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (item.headers or {}).items()]
+        extra_names = {name for name, _ in extra_headers}
+        headers = [(name, value) for name, value in request.scope["headers"] if name not in _DROPPED_HEADERS and name not in extra_names]
+        if body:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+        headers += extra_headers
+
+        path, _, query_string = item.path.partition("?")
+        scope = {key: request.scope[key] for key in _INHERITED_SCOPE_KEYS if key in request.scope}
+        scope.update({
+            "method": item.method.upper(),
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query_string.encode("latin-1"),
+            "headers": headers,
+            "state": dict(request.scope.get("state") or {}),
+            BATCH_NESTED_SCOPE_KEY: True,
+        })
+
+        response_complete = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # 请求体已发送完，响应完成后才通知断开
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        response_start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            # 依赖项（如数据库会话）在子请求完成时释放
+            async with AsyncExitStack() as stack:
+                scope["fastapi_middleware_astack"] = stack
+                await request.app.router(scope, receive, send)
+        except HTTPException as e:
+            # 路由不存在等在路由匹配阶段抛出的异常（starlette的HTTPException，fastapi的HTTPException是其子类）
+            return e.status_code, {"content-type": "application/json"}, orjson.dumps({"detail": e.detail})
+        except Exception as e:
+            # 与全局异常处理中间件一致：记录异常堆栈，返回500
+            logger.error(f"BatchUtil ==> 子请求异常: {item.path}\n异常类型: {type(e).__name__}\n异常信息: {str(e)}\n堆栈信息:\n{traceback.format_exc()}")
+            if hasattr(e, 'code') and hasattr(e, 'message'):
+                return e.code, {"content-type": "application/json"}, orjson.dumps({"code": e.code, "message": e.message})
+            return 500, {"content-type": "application/json"}, orjson.dumps({"code": 500, "message": f"服务器内部错误: {str(e)}"})
+        finally:
+            response_complete.set()
+
+        response_headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in response_start.get("headers", [])}
+        return response_start.get("status", 500), response_headers, b"".join(chunks)
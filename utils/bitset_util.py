@@ -0,0 +1,55 @@
+import base64
+from typing import Iterable, List
+
+
+class BitsetUtil:
+    """
+    位图工具类
+    第i位表示第i个位置（从0开始），按字节从低位到高位排列：第i位在第 i // 8 个字节的第 i % 8 位。
+    编码为base64字符串传输，n个位置只占 ceil(n / 8) 个字节。
+    """
+
+    @staticmethod
+    def encode(positions: Iterable[int], size: int) -> str:
+        """
+        将位置集合编码为base64位图
+        :param positions: 需要置1的位置，超出 [0, size) 的位置会被忽略
+        :param size: 位图长度（位数）
+        :return: base64字符串
+        """
+        bits = bytearray((size + 7) // 8)
+        for position in positions:
+            if 0 <= position < size:
+                bits[position >> 3] |= 1 << (position & 7)
+        return base64.b64encode(bytes(bits)).decode("ascii")
+
+    @staticmethod
+    def decode(bitset: str, size: int) -> List[int]:
+        """
+        将base64位图解码为置1的位置列表（升序）
+        :param bitset: base64字符串
+        :param size: 位图长度（位数）
+        :return: 置1的位置列表
+        """
+        bits = base64.b64decode(bitset)
+        return [position for position in range(min(size, len(bits) * 8)) if bits[position >> 3] >> (position & 7) & 1]
+
+
+if __name__ == '__main__':
+    import json
+    import random
+
+    total = 5000
+    answered = sorted(random.sample(range(total), 3000))
+    correct = [position for position in answered if random.random() < 0.7]
+
+    answered_bitset = BitsetUtil.encode(answered, total)
+    correct_bitset = BitsetUtil.encode(correct, total)
+    assert BitsetUtil.decode(answered_bitset, total) == answered
+    assert BitsetUtil.decode(correct_bitset, total) == correct
+
+    json_size = len(json.dumps({
+        "all_question_ids": list(range(100000, 100000 + total)),
+        "user_exam_options_list": [{"q_id": 100000 + p, "is_correct": int(p in correct)} for p in answered],
+    }))
+    print(f"{total}道题、{len(answered)}道已答：JSON {json_size} 字节，位图 {len(answered_bitset) + len(correct_bitset)} 字节")
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    进程内 TTL + LRU 缓存（线程安全）
+    - 每个key独立过期，过期的key在下一次访问时重新加载
+    - 超过最大容量时淘汰最久未访问的key
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        """
+        :param ttl_seconds: 缓存有效期（秒）
+        :param max_size: 最大缓存key数量
+        """
+        self._ttl_seconds = ttl_seconds
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        # key -> (过期时间(time.monotonic), 值)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # 每次删除/清空时递增，用于丢弃删除前就已开始的加载结果
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """获取缓存值，不存在或已过期返回None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expire_at, value = entry
+            if time.monotonic() >= expire_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, generation: int = None):
+        """
+        设置缓存值
+        :param generation: 加载开始时的版本号，期间发生过删除/清空时不写入缓存
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self._ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], V]) -> V:
+        """
+        获取缓存值，不存在或已过期时调用loader加载并写入缓存
+        loader在锁外执行，并发未命中时可能重复加载，但不会阻塞其他key的读取。
+        加载期间如果有key被删除（数据已变更），本次加载结果只返回，不写入缓存
+        """
+        value = self.get(key)
+        if value is None:
+            generation = self._generation
+            value = loader()
+            self.set(key, value, generation)
+        return value
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        """删除缓存值"""
+        with self._lock:
+            self._generation += 1
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else None
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key) is not None
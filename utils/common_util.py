@@ -1,25 +1,19 @@
-import time
-from datetime import datetime
-import random
-
 import jwt
 from typing import Optional, Dict, Any
 
+from utils.snowflake_util import snowflake_id_generator
+
 class CommonUtil:
     """通用工具类"""
 
     @staticmethod
     def generate_order_no() -> str:
         """
-        生成订单号 - 年月日时分秒格式
-        格式：YYYYMMDDhhmmss + 3位随机数
-        总长度：19位
-        示例：ORDER_NO_2026013016400295864
+        生成订单号 - ORDERNO_ + 雪花算法ID
+        雪花算法ID由毫秒时间戳、worker id、进程内序列号组成，多进程并发生成也不会重复，且不需要访问数据库
+        示例：ORDERNO_370597419130589184
         """
-        now = datetime.now()
-        time_str = now.strftime('%Y%m%d%H%M%S')  # 14位：年月日时分秒
-        random_suffix = random.randint(10000, 99999)  # 5位随机数
-        return f"ORDERNO_{time_str}{random_suffix}"
+        return f"ORDERNO_{snowflake_id_generator.next_id()}"
 
 
 if __name__ == '__main__':
@@ -1,12 +1,16 @@
 from datetime import datetime, date
+from functools import lru_cache
+from operator import itemgetter
 
 from fastapi import HTTPException
 from pydantic import BaseModel,TypeAdapter
-from typing import List, Type, TypeVar, Union, cast
-from sqlalchemy import inspect
+from typing import Any, List, Tuple, Type, TypeVar, Union, cast
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.orm import DeclarativeBase
 from starlette import status
 
+from base.base_model import ModelDictPlan
+
 from module_exam.dto.mp_user_dto import MpUserDTO
 from module_exam.model.mp_user_model import MpUserModel
 
@@ -18,65 +22,29 @@ DtoType = TypeVar("DtoType", bound=BaseModel)  # 绑定到Pydantic基类
 """
     将sqlalchemy模型实例转换为字典，仅包含表映射字段，排除内部属性
         :param model_instance: SQLAlchemy模型实例或实例列表
-        :param exclude_fields: 要排除的字段列表（可选） 例如 ['password', 'create_time']
+        :param exclude_fields: 要排除的字段列表（可选） 例如 ['password', 'create_time']，会与模型类的 __dict_exclude_fields__ 合并
         :return: 包含表映射字段的字典（单实例/列表）
 
-    基于inspect的原生转换：仅获取表映射字段，排除内部属性
+    基于inspect的原生转换：仅获取表映射字段，排除内部属性。字段列表按模型类只反射一次（见 ModelDictPlan）
 """
 def model_to_dict(model_instance: Union[ModelType, List[ModelType]], exclude_fields: list = None) -> Union[dict, List[dict]]:
     try:
-        # 处理排除字段（默认空列表）
-        exclude_fields = exclude_fields or []
-
-        # 如果是列表，递归处理每个实例
+        # 如果是列表，同一模型类的字段计划只获取一次，一次遍历完成转换
         if isinstance(model_instance, list):
             # 列表场景
+            plans = {}
             result_list = []
-            # 遍历列表中的每个模型实例
             for item in model_instance:
-                # 2.x中inspect方法反射model实例，获取元数据
-                inspector = inspect(item)
-                item_dict = {}
-                # 遍历所有表字段（仅包含模型中定义的Column字段）
-                for attr in inspector.mapper.column_attrs:
-                    # 提取字段
-                    key = attr.key
-                    # 跳过排除字段
-                    if key in exclude_fields:
-                        continue
-                    # 提取字段值
-                    value = getattr(model_instance, key)
-                    # 日期类型序列化（可选，转为字符串）
-                    if isinstance(value, (date, datetime)):
-                        item_dict[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-                    else:
-                        item_dict[key] = value
-
-                result_list.append(item_dict)
+                item_cls = type(item)
+                plan = plans.get(item_cls)
+                if plan is None:
+                    plan = plans[item_cls] = ModelDictPlan.get(item_cls, exclude_fields, date_as_datetime=True)
+                result_list.append(plan.dump(item))
             return result_list
 
         else:
-            # 单实例场景 适配SQLAlchemy 2.x的通用转换函数
-
-            # 2.x中inspect方法反射model实例，获取元数据
-            inspector = inspect(model_instance)
-            # 遍历所有表字段（仅包含模型中定义的Column字段）
-            result = {}
-            for attr in inspector.mapper.column_attrs:
-                # 提取字段
-                key = attr.key
-                # 跳过排除字段
-                if key in exclude_fields:
-                    continue
-                # 提取字段值
-                value = getattr(model_instance, key)
-                # 日期类型序列化（可选，转为字符串）
-                if isinstance(value, (date, datetime)):
-                    result[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    result[key] = value
-
-            return result
+            # 单实例场景 按模型类缓存的字段计划转换，日期类型序列化为字符串
+            return ModelDictPlan.get(type(model_instance), exclude_fields, date_as_datetime=True).dump(model_instance)
 
 
     except Exception as e:
@@ -95,9 +63,9 @@ SQLAlchemy模型（单实例/列表）转换为Pydantic模型（单实例/列表
     :return: Pydantic模型实例或实例列表
 """
 def model_to_dto(data: Union[ModelType, List[ModelType]], model_cls: Type[ModelType], dto_cls: Type[DtoType], is_serialize: bool = False) -> Union[DtoType, List[DtoType]]:
-    # 校验输入data是否匹配model_cls类型
+    # 校验输入data是否匹配model_cls类型（列表中通常只有一种类型，按去重后的类型校验）
     if isinstance(data, list):
-        if not all(isinstance(item, model_cls) for item in data):
+        if not all(issubclass(item_cls, model_cls) for item_cls in set(map(type, data))):
             raise HTTPException(status_code=400, detail=f"列表中包含非{model_cls.__name__}类型的实例")
     elif not isinstance(data, model_cls):
         raise HTTPException(status_code=400, detail=f"类型必须是{model_cls.__name__}，实际为{type(data).__name__}")
@@ -106,7 +74,7 @@ def model_to_dto(data: Union[ModelType, List[ModelType]], model_cls: Type[ModelT
         # 处理列表场景
         if isinstance(data, list):
             # 开始转换
-            validated_list = TypeAdapter(List[dto_cls]).validate_python(data)
+            validated_list = get_dto_list_adapter(dto_cls).validate_python(data)
             # 类型断言
             validated_list = cast(List[DtoType], validated_list)  # 类型断言
 
@@ -137,6 +105,85 @@ def model_to_dto(data: Union[ModelType, List[ModelType]], model_cls: Type[ModelT
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"model_to_dto 转换失败（{model_cls.__name__}→{dto_cls.__name__}）：{str(e)}")
 
 
+"""
+获取DTO类的列表TypeAdapter（按DTO类缓存）
+TypeAdapter 创建时需要构建校验器，耗时远大于一次校验，不能每次调用都创建
+    :param dto_cls: Pydantic DTO类
+    :return: TypeAdapter(List[dto_cls])
+"""
+@lru_cache(maxsize=None)
+def get_dto_list_adapter(dto_cls: Type[DtoType]) -> TypeAdapter:
+    return TypeAdapter(List[dto_cls])
+
+
+"""
+获取 数据对象类型 与 DTO类 共有的字段名及取值函数（按类型组合缓存）。DTO中数据对象没有的字段使用DTO的默认值
+    :return: (字段名元组, 字段名集合, 从实例__dict__中一次取出所有字段值的函数)
+"""
+@lru_cache(maxsize=None)
+def _get_field_extractor(data_cls: type, dto_cls: Type[DtoType]) -> Tuple[Tuple[str, ...], frozenset, Any]:
+    names = tuple(name for name in dto_cls.model_fields if hasattr(data_cls, name))
+    if len(names) == 1:
+        return names, frozenset(names), lambda obj: (obj[names[0]],)
+    return names, frozenset(names), itemgetter(*names)
+
+
+"""
+数据对象转换为 DTO字段名 -> 值 的字典
+从数据库加载的实例，字段值都在实例的 __dict__ 中，直接按key取值；
+只加载了部分字段的实例（load_only/延迟加载），未加载的字段不取值，使用DTO的默认值，避免逐个实例触发查询；
+否则按属性取值（由SQLAlchemy处理新建实例的默认值）
+"""
+def _extract_fields(item: Any, dto_cls: Type[DtoType]) -> dict:
+    names, name_set, getter = _get_field_extractor(type(item), dto_cls)
+    item_dict = getattr(item, "__dict__", None)
+    if item_dict is not None and item_dict.keys() >= name_set:
+        return dict(zip(names, getter(item_dict)))
+    state = sa_inspect(item, raiseerr=False)
+    if state is not None and state.has_identity:
+        unloaded = state.unloaded
+        return {name: getattr(item, name) for name in names if name not in unloaded}
+    return {name: getattr(item, name) for name in names}
+
+
+"""
+SQLAlchemy模型实例列表（或其他带属性的对象列表）批量转换为DTO列表
+    :param data: 数据对象列表
+    :param dto_cls: 目标Pydantic DTO类
+    :param trusted: 是否为可信数据（如刚从数据库查询出的记录）。
+        False：取出字段值后，使用缓存的TypeAdapter一次校验整个列表（校验在pydantic-core中执行）；
+        True：跳过校验，直接用 model_construct 构建DTO，字段类型由数据库列类型保证。
+        注意 model_construct 是纯Python实现，字段较多时不一定比批量校验快，见 __main__ 中的基准测试
+    :return: DTO列表
+"""
+def models_to_dtos(data: List[Any], dto_cls: Type[DtoType], trusted: bool = False) -> List[DtoType]:
+    if not data:
+        return []
+    field_dicts = [_extract_fields(item, dto_cls) for item in data]
+    if not trusted:
+        return get_dto_list_adapter(dto_cls).validate_python(field_dicts)
+    construct = dto_cls.model_construct
+    return [construct(**field_dict) for field_dict in field_dicts]
+
+
+"""
+查询结果行（Row元组，如BaseDao指定columns的投影查询结果）批量转换为DTO列表
+    :param rows: Row列表，按列名对应DTO字段，DTO中没有的列忽略
+    :param dto_cls: 目标Pydantic DTO类
+    :param trusted: 是否为可信数据，True时跳过校验，直接用 model_construct 构建DTO
+    :return: DTO列表
+"""
+def rows_to_dtos(rows: List[Any], dto_cls: Type[DtoType], trusted: bool = False) -> List[DtoType]:
+    if not rows:
+        return []
+    field_names = dto_cls.model_fields
+    row_dicts = [{key: value for key, value in row._mapping.items() if key in field_names} for row in rows]
+    if not trusted:
+        return get_dto_list_adapter(dto_cls).validate_python(row_dicts)
+    construct = dto_cls.model_construct
+    return [construct(**row_dict) for row_dict in row_dicts]
+
+
 if __name__ == "__main__":
     # 测试：将SQLAlchemy模型实例转换为Pydantic模型实例（单实例场景）
      user = MpUserModel(id=1, name="test", create_time=datetime.now())
@@ -146,4 +193,56 @@ if __name__ == "__main__":
     # 测试：将SQLAlchemy模型实例转换为Pydantic模型实例（单实例场景），并序列化为字典数据
      user_dict = model_to_dto(user,MpUserModel,MpUserDTO, is_serialize=False)
      print(type(user_dict))
-     print(user_dict)
\ No newline at end of file
+     print(user_dict)
+    # 基准测试：10000条记录转字典（逐个实例反射字段 + strftime 与 按模型类缓存字段计划 对比）
+     import time
+     from sqlalchemy import inspect
+
+     def legacy_model_to_dict(item):
+         item_dict = {}
+         for attr in inspect(item).mapper.column_attrs:
+             value = getattr(item, attr.key)
+             item_dict[attr.key] = value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, (date, datetime)) else value
+         return item_dict
+
+     # 所有字段都有值，与从数据库加载的实例一致
+     users = [MpUserModel(id=i, name=f"user{i}", nick_name="nick", password="", phone=str(i), wx_openid=f"openid{i}", wx_unionid=f"unionid{i}",
+                          head_url="", age=18, address="", gender=1, email="", login_count=i, last_login_time=datetime.now(),
+                          is_admin=0, create_time=datetime.now()) for i in range(10000)]
+     assert [legacy_model_to_dict(u) for u in users[:100]] == model_to_dict(users[:100])
+
+     start = time.perf_counter()
+     legacy_list = [legacy_model_to_dict(u) for u in users]
+     legacy_ms = (time.perf_counter() - start) * 1000
+     start = time.perf_counter()
+     fast_list = model_to_dict(users)
+     fast_ms = (time.perf_counter() - start) * 1000
+     start = time.perf_counter()
+     to_dict_list = MpUserModel.to_dict_list(users)
+     to_dict_list_ms = (time.perf_counter() - start) * 1000
+     print(f"10000条记录转字典：逐个反射 {legacy_ms:.1f} ms，model_to_dict {fast_ms:.1f} ms，to_dict_list {to_dict_list_ms:.1f} ms")
+
+    # 基准测试：1000道题目 + 4000个选项 转换为DTO（逐个 model_validate 与 批量校验、跳过校验 对比）
+     from module_exam.dto.mp_option_dto import MpOptionDTO
+     from module_exam.dto.mp_question_dto import MpQuestionDTO
+     from module_exam.model.mp_option_model import MpOptionModel
+     from module_exam.model.mp_question_model import MpQuestionModel
+
+     questions = [MpQuestionModel(id=i, exam_id=1, name=f"题目{i}", type=1, type_name="单选", status=0, analysis="解析",
+                                  create_time=datetime.now()) for i in range(1000)]
+     options = [MpOptionModel(id=i, question_id=i // 4, content=f"选项{i}", is_right=i % 4 == 0, status=0,
+                              create_time=datetime.now()) for i in range(4000)]
+     assert models_to_dtos(questions[:10], MpQuestionDTO) == models_to_dtos(questions[:10], MpQuestionDTO, trusted=True) \
+            == [MpQuestionDTO.model_validate(q) for q in questions[:10]]
+
+     rounds = 10
+     for name, convert in (
+             ("逐个model_validate", lambda: ([MpQuestionDTO.model_validate(q) for q in questions], [MpOptionDTO.model_validate(o) for o in options])),
+             ("每次新建TypeAdapter", lambda: (TypeAdapter(List[MpQuestionDTO]).validate_python(questions), TypeAdapter(List[MpOptionDTO]).validate_python(options))),
+             ("缓存TypeAdapter批量校验", lambda: (models_to_dtos(questions, MpQuestionDTO), models_to_dtos(options, MpOptionDTO))),
+             ("model_construct跳过校验", lambda: (models_to_dtos(questions, MpQuestionDTO, trusted=True), models_to_dtos(options, MpOptionDTO, trusted=True))),
+     ):
+         start = time.perf_counter()
+         for _ in range(rounds):
+             convert()
+         print(f"{name}：{(time.perf_counter() - start) * 1000 / rounds:.1f} ms")
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+
+class DateTimeUtil:
+    """日期时间格式化工具类（序列化大量记录时使用）"""
+
+    @staticmethod
+    def format_datetime(value: datetime) -> str:
+        """
+        格式化为 "%Y-%m-%d %H:%M:%S"
+        不带时区的datetime使用C实现的 isoformat，比 strftime 快数倍；带时区时回退到 strftime，保证输出格式不变
+        """
+        if value.tzinfo is None:
+            return value.isoformat(" ", "seconds")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def format_date(value: date) -> str:
+        """格式化为 "%Y-%m-%d" """
+        return value.isoformat()
+
+    @staticmethod
+    def format_date_or_datetime(value: date) -> str:
+        """date 和 datetime 都格式化为 "%Y-%m-%d %H:%M:%S"（date 的时间部分为 00:00:00）"""
+        if isinstance(value, datetime):
+            return DateTimeUtil.format_datetime(value)
+        return f"{value.isoformat()} 00:00:00"
+
+
+if __name__ == '__main__':
+    import time
+
+    now = datetime.now()
+    assert DateTimeUtil.format_datetime(now) == now.strftime("%Y-%m-%d %H:%M:%S")
+    assert DateTimeUtil.format_date(now.date()) == now.strftime("%Y-%m-%d")
+    assert DateTimeUtil.format_date_or_datetime(now.date()) == now.date().strftime("%Y-%m-%d %H:%M:%S")
+
+    rounds = 100000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        now.strftime("%Y-%m-%d %H:%M:%S")
+    strftime_ns = (time.perf_counter() - start) * 1e9 / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        DateTimeUtil.format_datetime(now)
+    fast_ns = (time.perf_counter() - start) * 1e9 / rounds
+    print(f"strftime {strftime_ns:.0f} ns，format_datetime {fast_ns:.0f} ns")
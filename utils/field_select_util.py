@@ -0,0 +1,196 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union, get_args, get_origin
+
+import orjson
+from pydantic import BaseModel
+
+from utils.conversion_util import get_dto_list_adapter
+
+
+def _unwrap_annotation(annotation: Any):
+    """
+    解析字段类型注解
+    :return: (是否为列表, 元素/字段本身的类型)，如 Optional[List[MpOptionDTO]] -> (True, MpOptionDTO)
+    """
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else Any
+    if get_origin(annotation) in (list, List, tuple):
+        args = get_args(annotation)
+        return True, (args[0] if args else Any)
+    return False, annotation
+
+
+class FieldSelector:
+    """
+    稀疏字段选择器（只返回客户端需要的字段）
+    - 字段路径用逗号分隔，嵌套字段用点号连接，例如 "question.id,question.name,options.content"
+    - 列表字段对其中每个元素生效，例如 options.content 表示每个选项只保留 content
+    - 只写上级字段（如 "options"）表示保留该字段的全部内容；不存在的字段忽略
+    - 在序列化之前裁剪数据（字典/列表/Pydantic模型），数据库查询可通过 columns_of 只查询需要的列
+    """
+    __slots__ = ("key", "tree", "_include_cache", "_model_keys")
+
+    def __init__(self, key: str, tree: Dict[str, Any]):
+        """
+        :param key: 规范化后的字段字符串（去重、排序），可用作缓存key的一部分
+        :param tree: 字段树，字段名 -> 子字段树，None 表示保留该字段的全部内容
+        """
+        self.key = key
+        self.tree = tree
+        # (Pydantic模型类, 字段子树id) -> model_dump 的 include 参数
+        self._include_cache: Dict[tuple, Any] = {}
+        # Pydantic模型类 -> 按模型字段规范化后的key
+        self._model_keys: Dict[type, str] = {}
+
+    @staticmethod
+    def parse(fields: Optional[str]) -> Optional["FieldSelector"]:
+        """
+        解析字段字符串
+        :param fields: 字段字符串，为空时表示返回全部字段
+        :return: 字段选择器，fields为空时返回None
+        """
+        if not fields or not fields.strip():
+            return None
+        return FieldSelector._parse(",".join(sorted({path.strip() for path in fields.split(",") if path.strip()})))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse(key: str) -> Optional["FieldSelector"]:
+        """解析规范化后的字段字符串（客户端使用的字段组合很少，结果按字段字符串缓存）"""
+        if not key:
+            return None
+        tree: Dict[str, Any] = {}
+        for path in key.split(","):
+            node = tree
+            names = [name.strip() for name in path.split(".")]
+            for depth, name in enumerate(names):
+                if depth == len(names) - 1:
+                    # 上级字段已选择全部内容时，子字段不会缩小范围
+                    node[name] = None
+                elif name in node and node[name] is None:
+                    break
+                else:
+                    node = node.setdefault(name, {})
+        return FieldSelector(key, tree)
+
+    def columns_of(self, path: str, all_columns: Sequence[str], required: Sequence[str] = ("id",)) -> Optional[List[str]]:
+        """
+        获取某个字段路径下需要查询的数据库列（用于投影查询）
+        :param path: 字段路径，如 "question"、"options"
+        :param all_columns: 该路径对应数据表的全部列名
+        :param required: 必须查询的列（如主键、关联字段）
+        :return: 需要查询的列名列表；需要全部列时返回None
+        """
+        node: Any = self.tree
+        for name in path.split("."):
+            if name not in node:
+                # 未选择该字段：只查询必须的列
+                return list(required)
+            node = node[name]
+            if node is None:
+                return None
+        return [column for column in all_columns if column in node or column in required]
+
+    def apply(self, data: Any) -> Any:
+        """
+        按字段树裁剪数据，返回裁剪后的字典/列表（未选择子字段的值原样返回，由响应序列化处理）
+        Pydantic模型（及同类型模型的列表）转换为 model_dump 的 include 参数，由 pydantic-core 一次完成裁剪和转换
+        """
+        return self._select(data, self.tree)
+
+    def model_key(self, model_cls: type) -> str:
+        """
+        按模型字段规范化后的key：由实际生效的 include 参数生成，模型中不存在的字段不计入
+        写法不同但裁剪结果相同的字段字符串（如带有不存在的字段）得到相同的key，可用作序列化结果的缓存key
+        """
+        key = self._model_keys.get(model_cls)
+        if key is None:
+            key = orjson.dumps(self._model_include(model_cls, self.tree), option=orjson.OPT_SORT_KEYS).decode("utf-8")
+            self._model_keys[model_cls] = key
+        return key
+
+    def _select(self, value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+        if tree is None or value is None:
+            return value
+        if isinstance(value, BaseModel):
+            return value.model_dump(mode="json", by_alias=True, include=self._model_include(type(value), tree))
+        if isinstance(value, (list, tuple)):
+            item_types = set(map(type, value))
+            if len(item_types) == 1 and issubclass(next(iter(item_types)), BaseModel):
+                model_cls = next(iter(item_types))
+                return get_dto_list_adapter(model_cls).dump_python(
+                    list(value), mode="json", by_alias=True, include={"__all__": self._model_include(model_cls, tree)}
+                )
+            return [self._select(item, tree) for item in value]
+        if isinstance(value, dict):
+            # 保持原数据的字段顺序
+            return {name: self._select(item, tree[name]) for name, item in value.items() if name in tree}
+        return value
+
+    def _model_include(self, model_cls: type, tree: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        字段子树转换为 Pydantic 模型的 include 参数（列表字段使用 "__all__" 对每个元素生效），按 模型类+子树 缓存
+        """
+        cache_key = (model_cls, id(tree))
+        include = self._include_cache.get(cache_key)
+        if include is None:
+            include = {}
+            for name, sub_tree in tree.items():
+                field = model_cls.model_fields.get(name)
+                if field is None:
+                    continue
+                is_list, field_type = _unwrap_annotation(field.annotation)
+                if sub_tree is None or not (isinstance(field_type, type) and issubclass(field_type, BaseModel)):
+                    # 选择全部内容，或非模型字段（子字段不会缩小范围）
+                    include[name] = True
+                    continue
+                sub_include = self._model_include(field_type, sub_tree)
+                include[name] = {"__all__": sub_include} if is_list else sub_include
+            self._include_cache[cache_key] = include
+        return include
+
+
+if __name__ == '__main__':
+    import time
+    from datetime import datetime
+
+    from module_exam.dto.mp_option_dto import MpOptionDTO
+    from module_exam.dto.mp_question_dto import MpQuestionDTO, MpQuestionOptionDTO
+
+    selector = FieldSelector.parse("question.id, question.name,options.content,question")
+    assert selector.tree == {"options": {"content": None}, "question": None}
+    selector = FieldSelector.parse("question.id,question.name,options.content")
+    assert selector.columns_of("question", ["id", "exam_id", "name", "analysis"]) == ["id", "name"]
+    assert selector.columns_of("options", ["id", "question_id", "content"], required=("id", "question_id")) == ["id", "question_id", "content"]
+    assert FieldSelector.parse("question").columns_of("question", ["id", "name"]) is None
+    assert FieldSelector.parse(" ") is None
+
+    # 基准测试：100道题目（含选项），全部字段与只选择 题目id/名称 + 选项内容 的响应大小和序列化耗时
+    question_option_dto = [
+        MpQuestionOptionDTO(
+            question=MpQuestionDTO(id=i, exam_id=1, name=f"题目{i}" * 5, type=1, type_name="单选", status=0, analysis="解析" * 50, create_time=datetime.now()),
+            options=[MpOptionDTO(id=i * 4 + j, question_id=i, content=f"选项{j}", is_right=int(j == 0), status=0, create_time=datetime.now()) for j in range(4)],
+        )
+        for i in range(100)
+    ]
+    full_body = orjson.dumps([item.model_dump(mode="json") for item in question_option_dto])
+    sparse_body = orjson.dumps(selector.apply(question_option_dto))
+    assert orjson.loads(sparse_body)[0] == {"question": {"id": 0, "name": "题目0" * 5}, "options": [{"content": f"选项{j}"} for j in range(4)]}
+    assert selector.apply({"questions": [{"question": {"id": 1, "analysis": "x"}}]}) == {}
+    assert FieldSelector.parse("questions.question.id").apply({"questions": [{"question": {"id": 1, "analysis": "x"}}]}) == {"questions": [{"question": {"id": 1}}]}
+    # 不存在的字段不影响规范化后的key
+    assert FieldSelector.parse("question.id,question.junk,junk.a,question.name.x").model_key(MpQuestionOptionDTO) == \
+        FieldSelector.parse("question.name,question.id").model_key(MpQuestionOptionDTO)
+    assert FieldSelector.parse("junk1").model_key(MpQuestionOptionDTO) == FieldSelector.parse("junk2").model_key(MpQuestionOptionDTO)
+    print(f"全部字段 {len(full_body)} 字节，稀疏字段 {len(sparse_body)} 字节")
+
+    rounds = 200
+    for name, run in (
+            ("全部字段序列化", lambda: orjson.dumps([item.model_dump(mode="json") for item in question_option_dto])),
+            ("稀疏字段裁剪+序列化", lambda: orjson.dumps(FieldSelector.parse("question.id,question.name,options.content").apply(question_option_dto))),
+    ):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        print(f"{name}：{(time.perf_counter() - start) * 1000 / rounds:.3f} ms")
@@ -0,0 +1,124 @@
+import sys
+from array import array
+from itertools import accumulate
+from typing import List
+
+# 编码格式（第1个字节）
+_FORMAT_RANGE = 1       # 连续递增：起始ID + 数量
+_FORMAT_DELTA = 2       # 严格递增：起始ID + 相邻差值，均为varint
+_FORMAT_UINT32 = 3      # 无序：每个ID 4字节小端
+
+
+class IdCodecUtil:
+    """
+    整数ID列表的紧凑二进制编码工具类
+    根据ID列表的特征自动选择编码格式：
+    - 连续递增（如整套题库按id排列）：固定几个字节，与ID数量无关
+    - 严格递增（有间隔的顺序练习）：差值varint编码，每个ID通常1~2字节
+    - 无序（随机抽题的模拟考试）：uint32数组，每个ID 4字节，解码为一次内存拷贝
+    """
+
+    @staticmethod
+    def encode(ids: List[int]) -> bytes:
+        """
+        编码ID列表
+        :param ids: 非负整数ID列表（小于2^32）
+        :return: 编码后的字节串
+        """
+        ids = list(ids)
+        count = len(ids)
+        if count > 0 and ids[-1] - ids[0] == count - 1 and all(ids[i] + 1 == ids[i + 1] for i in range(count - 1)):
+            return bytes([_FORMAT_RANGE]) + IdCodecUtil._encode_varints([ids[0], count])
+        if all(ids[i] < ids[i + 1] for i in range(count - 1)):
+            deltas = [ids[0]] + [ids[i + 1] - ids[i] for i in range(count - 1)] if count > 0 else []
+            return bytes([_FORMAT_DELTA]) + IdCodecUtil._encode_varints(deltas)
+        # array('I') 在主流平台上为4字节，统一按小端存储
+        packed = array('I', ids)
+        if sys.byteorder != "little":
+            packed.byteswap()
+        return bytes([_FORMAT_UINT32]) + packed.tobytes()
+
+    @staticmethod
+    def decode(data: bytes) -> List[int]:
+        """
+        解码ID列表
+        :param data: encode 编码后的字节串
+        :return: ID列表
+        """
+        if not data:
+            return []
+        data_format, payload = data[0], memoryview(data)[1:]
+        if data_format == _FORMAT_RANGE:
+            start, count = IdCodecUtil._decode_varints(payload)
+            return list(range(start, start + count))
+        if data_format == _FORMAT_DELTA:
+            # 先解出第一个ID（varint结束字节的最高位为0）
+            first_end = next((i for i, byte in enumerate(payload) if byte < 0x80), None)
+            if first_end is None:
+                return []
+            first_id = IdCodecUtil._decode_varints(payload[:first_end + 1])[0]
+            deltas = payload[first_end + 1:]
+            # 相邻差值都小于128时每个差值只占1字节，直接累加，不需要逐字节解析varint
+            if not deltas or max(deltas) < 0x80:
+                return list(accumulate(deltas, initial=first_id))
+            return list(accumulate(IdCodecUtil._decode_varints(deltas), initial=first_id))
+        if data_format == _FORMAT_UINT32:
+            packed = array('I')
+            packed.frombytes(payload)
+            if sys.byteorder != "little":
+                packed.byteswap()
+            return packed.tolist()
+        raise ValueError(f"未知的ID编码格式：{data_format}")
+
+    @staticmethod
+    def _encode_varints(values: List[int]) -> bytes:
+        """varint编码：每个字节低7位存数据，最高位为1表示后面还有字节"""
+        result = bytearray()
+        for value in values:
+            while value >= 0x80:
+                result.append((value & 0x7F) | 0x80)
+                value >>= 7
+            result.append(value)
+        return bytes(result)
+
+    @staticmethod
+    def _decode_varints(data) -> List[int]:
+        """varint解码"""
+        values = []
+        value = shift = 0
+        for byte in data:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+            else:
+                values.append(value)
+                value = shift = 0
+        return values
+
+
+if __name__ == '__main__':
+    import json
+    import random
+    import time
+
+    cases = {
+        "连续递增(5000)": list(range(1001, 6001)),
+        "有间隔递增(5000)": sorted(random.sample(range(1, 20000), 5000)),
+        "无序(100)": random.sample(range(1, 20000), 100),
+        "空列表": [],
+    }
+    for name, ids in cases.items():
+        encoded = IdCodecUtil.encode(ids)
+        assert IdCodecUtil.decode(encoded) == ids, name
+        json_size = len(json.dumps(ids))
+
+        start = time.perf_counter()
+        for _ in range(100):
+            IdCodecUtil.decode(encoded)
+        decode_ms = (time.perf_counter() - start) * 10
+        json_str = json.dumps(ids)
+        start = time.perf_counter()
+        for _ in range(100):
+            json.loads(json_str)
+        json_ms = (time.perf_counter() - start) * 10
+        print(f"{name}：JSON {json_size} 字节，编码后 {len(encoded)} 字节；解码 {decode_ms:.3f} ms，JSON解析 {json_ms:.3f} ms")
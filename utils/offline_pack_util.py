@@ -0,0 +1,102 @@
+import base64
+import binascii
+import hashlib
+import os
+import zlib
+from typing import Any, Dict, Optional
+
+import orjson
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from config import exam_config
+
+
+class OfflinePackUtil:
+    """
+    离线练习包令牌工具类
+    - 令牌内容（答案密钥、用户、有效期等）序列化、压缩后使用 AES-GCM 加密：客户端无法读取答案，
+      认证加密同时起到签名的作用，令牌被篡改或伪造时无法解密
+    - 令牌格式：URL安全的base64( 版本号(1字节) + nonce(12字节) + 密文 )，版本号参与认证
+    """
+    VERSION = 1
+
+    # 由配置的密钥派生的AES-GCM实例，第一次使用时创建
+    _aesgcm: Optional[AESGCM] = None
+
+    @staticmethod
+    def is_configured() -> bool:
+        """
+        是否已配置密钥（环境变量 OFFLINE_PACK_SECRET_KEY，至少16个字符）
+        未配置时不能使用公开的默认密钥，否则任何人都可以解密答案密钥、伪造练习包，离线练习接口直接报错
+        """
+        return len(exam_config.OFFLINE_PACK_SECRET_KEY) >= 16
+
+    @staticmethod
+    def _get_aesgcm() -> AESGCM:
+        """获取AES-GCM实例（由配置的密钥派生256位AES密钥），未配置密钥时抛出RuntimeError"""
+        if OfflinePackUtil._aesgcm is None:
+            if not OfflinePackUtil.is_configured():
+                raise RuntimeError("环境变量 OFFLINE_PACK_SECRET_KEY 未配置或长度不足16个字符，无法生成离线练习包令牌")
+            OfflinePackUtil._aesgcm = AESGCM(hashlib.sha256(b"offline-pack:" + exam_config.OFFLINE_PACK_SECRET_KEY.encode("utf-8")).digest())
+        return OfflinePackUtil._aesgcm
+
+    @staticmethod
+    def seal(payload: Dict[str, Any]) -> str:
+        """
+        生成令牌
+        :param payload: 令牌内容（可JSON序列化的字典）
+        :return: 令牌字符串
+        :raises RuntimeError: 未配置密钥
+        """
+        header = bytes([OfflinePackUtil.VERSION])
+        nonce = os.urandom(12)
+        ciphertext = OfflinePackUtil._get_aesgcm().encrypt(nonce, zlib.compress(orjson.dumps(payload)), header)
+        return base64.urlsafe_b64encode(header + nonce + ciphertext).decode("ascii")
+
+    @staticmethod
+    def unseal(token: str) -> Optional[Dict[str, Any]]:
+        """
+        校验并解密令牌
+        :param token: 令牌字符串
+        :return: 令牌内容，令牌无效（格式错误、版本不支持、被篡改）时返回None
+        :raises RuntimeError: 未配置密钥
+        """
+        try:
+            data = base64.urlsafe_b64decode(token.encode("ascii"))
+        except (binascii.Error, UnicodeEncodeError, ValueError):
+            return None
+        if len(data) < 13 or data[0] != OfflinePackUtil.VERSION:
+            return None
+        try:
+            plaintext = OfflinePackUtil._get_aesgcm().decrypt(data[1:13], data[13:], data[:1])
+        except InvalidTag:
+            return None
+        return orjson.loads(zlib.decompress(plaintext))
+
+
+if __name__ == '__main__':
+    import time
+
+    if not OfflinePackUtil.is_configured():
+        exam_config.OFFLINE_PACK_SECRET_KEY = os.urandom(16).hex()
+
+    # 200道题目的答案密钥
+    pack = {
+        "pack_id": "test", "user_id": 1, "exam_id": 1, "user_exam_id": None, "issue_time": int(time.time()), "expire_time": int(time.time()) + 3600,
+        "answers": [[question_id, 1, [question_id * 4]] for question_id in range(1000, 1200)],
+    }
+    pack_token = OfflinePackUtil.seal(pack)
+    assert OfflinePackUtil.unseal(pack_token) == pack
+    # 篡改任意字节都无法解密
+    tampered = bytearray(base64.urlsafe_b64decode(pack_token))
+    tampered[-1] ^= 1
+    assert OfflinePackUtil.unseal(base64.urlsafe_b64encode(bytes(tampered)).decode("ascii")) is None
+    assert OfflinePackUtil.unseal("not-a-token") is None
+    print(f"令牌长度 {len(pack_token)}（未压缩的JSON {len(orjson.dumps(pack))} 字节）")
+
+    rounds = 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        OfflinePackUtil.unseal(pack_token)
+    print(f"校验并解密令牌：{(time.perf_counter() - start) * 1e6 / rounds:.1f} us")
@@ -1,5 +1,15 @@
+import hashlib
+from contextvars import ContextVar
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Generic, List, TypeVar, Optional
+
+import msgpack
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Generic, TypeVar, Optional
 
 # 定义一个泛型类型变量
 T = TypeVar('T')
@@ -16,6 +26,154 @@ class ResponseDTO(BaseModel, Generic[T]):
         json_encoders={}  # 可自定义序列化规则（如 datetime → 字符串）
     )
 
+# orjson 序列化选项：允许 int 等非字符串类型作为字典key（如 题目id -> 选项id列表），直接序列化numpy数组
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(obj: Any) -> Any:
+    """
+    orjson 不能直接序列化的类型的转换函数（datetime/date/dataclass/numpy 由 orjson 原生处理）
+    - Pydantic模型：由 pydantic-core 按JSON模式转换（与FastAPI的序列化结果一致），之后由 orjson 写入
+    - Decimal：与 FastAPI 的 jsonable_encoder 一致，整数值转 int，否则转 float
+    - set/frozenset：转 list
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# 定义快速JSON响应类 FastJSONResponse。直接用 orjson 把响应内容序列化为字节。
+# 路由函数返回 Response 对象时，FastAPI 不再按 response_model 校验，也不再经过 jsonable_encoder 转换，响应数据只序列化一次
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+# 响应格式：默认JSON，请求头 Accept 包含 application/msgpack 时使用 MessagePack
+RESPONSE_FORMAT_JSON = "json"
+RESPONSE_FORMAT_MSGPACK = "msgpack"
+
+RESPONSE_MEDIA_TYPES = {
+    RESPONSE_FORMAT_JSON: "application/json",
+    RESPONSE_FORMAT_MSGPACK: "application/msgpack",
+}
+
+# 当前请求协商的响应格式（由 ResponseFormatMiddleware 按请求头 Accept 设置）
+response_format_context: ContextVar[str] = ContextVar("response_format", default=RESPONSE_FORMAT_JSON)
+
+
+@lru_cache(maxsize=256)
+def negotiate_response_format(accept: Optional[str]) -> str:
+    """
+    根据请求头 Accept 协商响应格式（客户端的请求头取值种类很少，结果按请求头缓存）
+    :return: 明确接受 application/msgpack（或 application/x-msgpack）时返回 RESPONSE_FORMAT_MSGPACK，否则返回 RESPONSE_FORMAT_JSON
+    """
+    if not accept:
+        return RESPONSE_FORMAT_JSON
+    for item in accept.split(","):
+        media_type, _, params = item.strip().partition(";")
+        if media_type.strip().lower() in ("application/msgpack", "application/x-msgpack") and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            return RESPONSE_FORMAT_MSGPACK
+    return RESPONSE_FORMAT_JSON
+
+
+def get_response_format() -> str:
+    """获取当前请求协商的响应格式"""
+    return response_format_context.get()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """
+    MessagePack 不能直接序列化的类型的转换函数。转换结果与JSON响应中的值一致，客户端按同一套数据结构解析：
+    - Pydantic模型：按JSON模式转换
+    - datetime/date/time：转ISO格式字符串（与JSON响应中的格式相同）
+    - Decimal：与JSON响应一致，整数值转 int，否则转 float
+    - set/frozenset：转 list；numpy数组和数值：转 list / Python数值
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def dumps(obj: Any, response_format: str = RESPONSE_FORMAT_JSON) -> bytes:
+    """按响应格式序列化数据"""
+    if response_format == RESPONSE_FORMAT_MSGPACK:
+        return msgpack.packb(obj, default=_msgpack_default)
+    return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+# 定义按请求协商格式的响应类 NegotiatedResponse。默认与 FastJSONResponse 相同，
+# 请求头 Accept 为 application/msgpack 时输出 MessagePack（数据结构与JSON相同）。也作为应用的默认响应类，返回ResponseDTO的接口同样支持协商
+class NegotiatedResponse(FastJSONResponse):
+
+    def render(self, content: Any) -> bytes:
+        response_format = get_response_format()
+        self.media_type = RESPONSE_MEDIA_TYPES[response_format]
+        return dumps(content, response_format)
+
+
+def dumps_with_raw_fields(data: Dict[str, Any], raw_fields: Dict[str, bytes] = None, response_format: str = RESPONSE_FORMAT_JSON) -> bytes:
+    """
+    序列化字典，并把已经序列化好的片段作为字段原样拼接进去（片段不再解析、不再序列化）
+    :param data: 普通字段
+    :param raw_fields: 字段名 -> 已按同一响应格式序列化的字节（如缓存的题目列表）
+    :param response_format: 响应格式
+    :return: 序列化后的字节
+    """
+    if response_format == RESPONSE_FORMAT_MSGPACK:
+        raw_fields = raw_fields or {}
+        return msgpack.Packer().pack_map_header(len(data) + len(raw_fields)) \
+            + b"".join(dumps(key, response_format) + dumps(value, response_format) for key, value in data.items()) \
+            + b"".join(dumps(key, response_format) + value for key, value in raw_fields.items())
+
+    body = dumps(data, response_format)
+    if not raw_fields:
+        return body
+    raw_body = b",".join(orjson.dumps(key) + b":" + value for key, value in raw_fields.items())
+    return body[:-1] + (b"," if len(body) > 2 else b"") + raw_body + b"}"
+
+
+def dumps_raw_array(fragments: List[bytes], response_format: str = RESPONSE_FORMAT_JSON) -> bytes:
+    """
+    把已经序列化好的多个片段拼接为数组
+    :param fragments: 已按同一响应格式序列化的元素字节列表
+    :param response_format: 响应格式
+    """
+    if response_format == RESPONSE_FORMAT_MSGPACK:
+        return msgpack.Packer().pack_array_header(len(fragments)) + b"".join(fragments)
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断请求头 If-None-Match 是否与ETag匹配（按RFC 7232的弱比较，忽略 W/ 前缀）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _dumps_success_body(code: int, message: str, data: Any, raw_data: Optional[Dict[str, bytes]], response_format: str) -> bytes:
+    """序列化统一响应体 {"code", "message", "data"}，raw_data 中已序列化的片段作为data的字段原样拼接"""
+    return dumps_with_raw_fields({"code": code, "message": message}, {
+        "data": dumps_with_raw_fields(data or {}, raw_data, response_format) if raw_data else dumps(data, response_format),
+    }, response_format)
+
+
 # 定义统一响应工具类 ResponseUtil。该类提供各个静态方法，用于创建成功和失败的统一响应对象。
 class ResponseUtil:
     # 定义success方法，用于创建成功的响应对象,默认状态码200，消息"success"
@@ -24,6 +182,33 @@ class ResponseUtil:
         # 自动转换数据为可序列化格式
         return ResponseDTO(code=code, message=message, data=data)
 
+    # 定义fast_success方法，用于返回数据量较大的成功响应（如题目列表、考试结果）。
+    # 响应格式与success一致，但不创建ResponseDTO，返回NegotiatedResponse直接序列化（JSON或MessagePack）。data中的DTO无需提前model_dump
+    @staticmethod
+    def fast_success(code=200,message="success",data=None):
+        return NegotiatedResponse(content={"code": code, "message": message, "data": data})
+
+    # 定义etag_success方法，用于返回内容不常变化的成功响应（如题目列表、考试列表、商品列表）。
+    # 响应体按内容哈希生成强ETag，请求头 If-None-Match 与之匹配时返回304（无响应体），客户端继续使用本地缓存的数据。
+    # raw_data 为已按当前响应格式序列化好的片段（如题目JSON缓存），与 data 中的普通字段一起作为响应的data
+    # 注意：接口是POST请求，小程序/浏览器不会自动携带 If-None-Match，需要客户端保存ETag并在请求头中带上
+    @staticmethod
+    def etag_success(request: Request, code=200, message="success", data=None, raw_data: Dict[str, bytes] = None, cache_control: str = None):
+        response_format = get_response_format()
+        body = _dumps_success_body(code, message, data, raw_data, response_format)
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control or "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=RESPONSE_MEDIA_TYPES[response_format], headers=headers)
+
+    # 定义raw_success方法，用于返回包含已序列化片段的成功响应（如批量请求中各子请求的响应体），不生成ETag
+    @staticmethod
+    def raw_success(code=200, message="success", data=None, raw_data: Dict[str, bytes] = None):
+        response_format = get_response_format()
+        body = _dumps_success_body(code, message, data, raw_data, response_format)
+        return Response(content=body, media_type=RESPONSE_MEDIA_TYPES[response_format])
+
     # 定义error方法，用于创建失败的响应对象，默认状态码500，消息"error"
     @staticmethod
     def error(code=500,message="error",data=None):
@@ -42,3 +227,54 @@ if __name__ == "__main__":
     items = [{"id": 1, "name": "item1"}]
     print(type(ResponseUtil.success(data=items)))
     print(ResponseUtil.success(data=items))
+    print(ResponseUtil.fast_success(data=items).body)
+
+    # 基准测试：100道题目（含选项）的响应，原方式（ResponseDTO + response_model校验 + jsonable_encoder + json.dumps）与 fast_success 对比
+    import time
+    from datetime import datetime
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from module_exam.dto.mp_option_dto import MpOptionDTO
+    from module_exam.dto.mp_question_dto import MpQuestionDTO, MpQuestionOptionDTO
+
+    question_option_dto = [
+        MpQuestionOptionDTO(
+            question=MpQuestionDTO(id=i, exam_id=1, name=f"题目{i}" * 5, type=1, type_name="单选", status=0, analysis="解析" * 20, create_time=datetime.now()),
+            options=[MpOptionDTO(id=i * 4 + j, question_id=i, content=f"选项{j}", is_right=int(j == 0), status=0, create_time=datetime.now()) for j in range(4)],
+        )
+        for i in range(100)
+    ]
+    response_adapter = TypeAdapter(ResponseDTO)
+
+    def legacy_response() -> bytes:
+        response_dto = ResponseUtil.success(data={"user_exam_id": 1, "questions": [item.model_dump() for item in question_option_dto]})
+        validated = response_adapter.validate_python(response_dto, from_attributes=True)
+        return JSONResponse(content=jsonable_encoder(validated)).body
+
+    def fast_response() -> bytes:
+        return ResponseUtil.fast_success(data={"user_exam_id": 1, "questions": question_option_dto}).body
+
+    assert orjson.loads(legacy_response()) == orjson.loads(fast_response())
+    rounds = 200
+    for name, render in (("原方式", legacy_response), ("fast_success", fast_response)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            render()
+        print(f"{name}：{(time.perf_counter() - start) * 1000 / rounds:.2f} ms")
+
+    # 基准测试：同一响应的 JSON 与 MessagePack 的大小、序列化和解析耗时（解析耗时对应客户端）
+    content = {"code": 200, "message": "success", "data": {"user_exam_id": 1, "questions": question_option_dto}}
+    json_body = dumps(content, RESPONSE_FORMAT_JSON)
+    msgpack_body = dumps(content, RESPONSE_FORMAT_MSGPACK)
+    assert msgpack.unpackb(msgpack_body) == orjson.loads(json_body)
+    print(f"JSON {len(json_body)} 字节，MessagePack {len(msgpack_body)} 字节")
+    for name, run in (
+            ("JSON 序列化", lambda: dumps(content, RESPONSE_FORMAT_JSON)),
+            ("MessagePack 序列化", lambda: dumps(content, RESPONSE_FORMAT_MSGPACK)),
+            ("JSON 解析", lambda: orjson.loads(json_body)),
+            ("MessagePack 解析", lambda: msgpack.unpackb(msgpack_body)),
+    ):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        print(f"{name}：{(time.perf_counter() - start) * 1000 / rounds:.3f} ms")
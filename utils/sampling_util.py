@@ -0,0 +1,98 @@
+from typing import Dict
+
+import numpy as np
+
+# 全局随机数生成器。numpy的BitGenerator内部带锁，多线程共享是安全的
+_rng = np.random.default_rng()
+
+
+class SamplingUtil:
+    """抽样工具类（基于NumPy向量化计算）"""
+
+    @staticmethod
+    def weighted_sample(ids: np.ndarray, weights: np.ndarray, k: int, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        带权重的不放回抽样（Efraimidis–Spirakis 算法）
+        每个元素生成随机key = ln(u) / weight（u为(0,1)均匀分布），取key最大的k个元素。
+        权重越大被抽中的概率越大，权重全部相同时等价于等概率抽样。
+        :param ids: 待抽样的元素数组
+        :param weights: 与ids等长的权重数组，必须大于0
+        :param k: 抽取数量，超过元素个数时返回全部元素
+        :param rng: 随机数生成器，为None时使用全局生成器
+        :return: 抽中的元素数组（按key从大到小排列，即随机顺序）
+        """
+        n = len(ids)
+        k = min(max(k, 0), n)
+        if k == 0:
+            return ids[:0]
+
+        rng = rng or _rng
+        # 1 - random() 的取值范围是(0,1]，避免 ln(0)
+        keys = np.log(1.0 - rng.random(n)) / weights
+        if k < n:
+            # argpartition 只做部分排序，复杂度O(n)
+            top_index = np.argpartition(keys, n - k)[n - k:]
+        else:
+            top_index = np.arange(n)
+        top_index = top_index[np.argsort(keys[top_index])[::-1]]
+        return ids[top_index]
+
+    @staticmethod
+    def allocate_by_size(sizes: Dict[int, int], k: int) -> Dict[int, int]:
+        """
+        按各分组的大小等比例分配抽样数量（最大余数法），分配结果之和为 min(k, 总大小)
+        :param sizes: 分组 -> 分组大小
+        :param k: 总抽样数量
+        :return: 分组 -> 分配的抽样数量
+        """
+        total = sum(sizes.values())
+        k = min(max(k, 0), total)
+        if k == 0:
+            return {key: 0 for key in sizes}
+
+        quotas = {key: size * k / total for key, size in sizes.items()}
+        result = {key: int(quota) for key, quota in quotas.items()}
+        # 剩余的数量按小数部分从大到小依次分配
+        remaining = k - sum(result.values())
+        for key in sorted(quotas, key=lambda key: quotas[key] - result[key], reverse=True)[:remaining]:
+            result[key] += 1
+        return result
+
+
+if __name__ == '__main__':
+    import time
+
+    from module_exam.service.mp_random_practice_service import MpRandomPracticeService
+
+    # 基准测试：10000道题的题库，单选/多选/判断 三种题型，其中2000道题有做错记录
+    bank_size = 10000
+    question_ids = np.arange(1, bank_size + 1, dtype=np.uint32)
+    question_types = _rng.choice([1, 2, 3], size=bank_size, p=[0.6, 0.2, 0.2])
+    type_pools = {int(t): question_ids[question_types == t] for t in np.unique(question_types)}
+
+    track_question_ids = np.sort(_rng.choice(question_ids, size=2000, replace=False))
+    track_error_rates = _rng.random(2000)
+
+    type_mix = {1: 30, 2: 10, 3: 10}
+    rounds = 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = []
+        for question_type, count in type_mix.items():
+            pool = type_pools[question_type]
+            # 与随机练习抽题相同的权重计算（题目池与做题记录按题目ID对齐）
+            weights = MpRandomPracticeService._build_weights(pool, track_question_ids, track_error_rates)
+            result.extend(SamplingUtil.weighted_sample(pool, weights, count).tolist())
+    elapsed_ms = (time.perf_counter() - start) * 1000 / rounds
+    assert len(result) == len(set(result)) == sum(type_mix.values())
+    print(f"10000道题的题库，按题型抽取{sum(type_mix.values())}道题：平均耗时 {elapsed_ms:.3f} ms")
+
+    # 校验权重生效：权重为5的元素被抽中的频率应明显高于权重为1的元素
+    ids = np.arange(100)
+    weights = np.where(ids < 10, 5.0, 1.0)
+    hits = np.zeros(100)
+    for _ in range(20000):
+        hits[SamplingUtil.weighted_sample(ids, weights, 5)] += 1
+    print(f"权重5的元素平均抽中次数 {hits[:10].mean():.0f}，权重1的元素平均抽中次数 {hits[10:].mean():.0f}")
+
+    print(SamplingUtil.allocate_by_size({1: 600, 2: 200, 3: 199}, 50))
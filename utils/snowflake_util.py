@@ -0,0 +1,175 @@
+import os
+import tempfile
+import threading
+import time
+
+from config.log_config import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl
+    fcntl = None
+
+
+class SnowflakeIdGenerator:
+    """
+    雪花算法ID生成器（64位整数）
+    结构：1位符号位(0) | 41位毫秒时间戳 | 10位worker id | 12位序列号
+
+    - 时间戳：相对 EPOCH_MS 的毫秒数，约可使用69年。以启动时的系统时间为基准，之后用单调时钟推进，系统时间回拨不影响生成的ID
+    - worker id：未指定时，在进程第一次生成ID时分配，取值为 SNOWFLAKE_WORKER_ID_BASE + 本机槽位号
+      - SNOWFLAKE_WORKER_ID_BASE：环境变量，本机（容器）的worker id起始值，默认0。多机（多容器）部署时每台配置不同的值，区间不能重叠
+      - SNOWFLAKE_WORKER_SLOTS：环境变量，本机（容器）最多同时运行的进程数，默认16
+      - 槽位号：依次对临时目录下的 snowflake_worker_{worker id}.lock 加非阻塞排他文件锁，第一个加锁成功的槽位归当前进程所有。
+        uvicorn --workers 启动的多个worker进程会拿到不同的槽位；文件锁在进程退出时由操作系统释放，worker重启后可以重新使用该槽位
+    - 序列号：同一毫秒内从0递增，下一毫秒重置为0；同一毫秒内的4096个序列号用完时等待到下一毫秒
+
+    时间戳、序列号在锁内一起更新，多线程调用同一个生成器不会生成重复ID，也不需要访问数据库。
+    注意：没有 fcntl 的系统（Windows本地开发）无法加文件锁，槽位号退化为 pid % SNOWFLAKE_WORKER_SLOTS（会记录警告日志），只适合单进程运行。
+    """
+
+    # 起始时间 2024-01-01 00:00:00 UTC（毫秒）
+    EPOCH_MS = 1704067200000
+
+    WORKER_ID_BITS = 10
+    SEQUENCE_BITS = 12
+
+    MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+    SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+    WORKER_ID_SHIFT = SEQUENCE_BITS
+    TIMESTAMP_SHIFT = SEQUENCE_BITS + WORKER_ID_BITS
+
+    def __init__(self, worker_id: int = None):
+        """
+        :param worker_id: worker id（0~1023），为None时在第一次生成ID时按本机槽位分配
+        """
+        if worker_id is not None and not 0 <= worker_id <= self.MAX_WORKER_ID:
+            raise ValueError(f"worker id 必须在 0~{self.MAX_WORKER_ID} 之间: {worker_id}")
+        self._fixed_worker_id = worker_id
+        # 持有槽位文件锁的文件对象，进程存活期间不能关闭
+        self._slot_file = None
+        self._reset()
+        # fork出的子进程（如多worker部署）需要重新分配worker id并重置计数器，避免与父进程生成相同的ID
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """初始化worker id、时钟基准和序列号计数器（未指定worker id时，在第一次生成ID时分配）"""
+        # fork出的子进程继承了父进程的槽位文件，关闭子进程这一份（父进程的文件锁不受影响），子进程重新分配槽位
+        if self._slot_file is not None:
+            self._slot_file.close()
+            self._slot_file = None
+        self.worker_id = self._fixed_worker_id
+        self._worker_bits = None if self.worker_id is None else self.worker_id << self.WORKER_ID_SHIFT
+
+        # 以当前系统时间为基准，之后用单调时钟计算经过的时间
+        self._base_ms = time.time_ns() // 1_000_000 - self.EPOCH_MS
+        self._base_monotonic_ns = time.monotonic_ns()
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def _allocate_worker_id(self) -> int:
+        """
+        按本机槽位为当前进程分配worker id：SNOWFLAKE_WORKER_ID_BASE + 第一个能加上文件锁的槽位号
+        :return: worker id
+        """
+        base = int(os.environ.get("SNOWFLAKE_WORKER_ID_BASE", "0"))
+        slots = int(os.environ.get("SNOWFLAKE_WORKER_SLOTS", "16"))
+        if slots <= 0 or base < 0 or base + slots - 1 > self.MAX_WORKER_ID:
+            raise ValueError(f"SNOWFLAKE_WORKER_ID_BASE={base}, SNOWFLAKE_WORKER_SLOTS={slots} 超出worker id范围 0~{self.MAX_WORKER_ID}")
+
+        if fcntl is None:
+            worker_id = base + os.getpid() % slots
+            logger.warning(f"SnowflakeIdGenerator ==> 当前系统不支持文件锁，使用 pid 计算worker id = {worker_id}，多进程运行时可能生成重复ID")
+            return worker_id
+
+        for worker_id in range(base, base + slots):
+            slot_file = open(os.path.join(tempfile.gettempdir(), f"snowflake_worker_{worker_id}.lock"), "a")
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # 槽位已被本机其他进程占用
+                slot_file.close()
+                continue
+            self._slot_file = slot_file
+            logger.info(f"SnowflakeIdGenerator ==> 进程 {os.getpid()} 分配到worker id = {worker_id}")
+            return worker_id
+        raise RuntimeError(f"SnowflakeIdGenerator ==> worker id {base}~{base + slots - 1} 已全部被本机其他进程占用，请调大 SNOWFLAKE_WORKER_SLOTS")
+
+    def _current_ms(self) -> int:
+        """当前时间戳（相对 EPOCH_MS 的毫秒数，单调递增）"""
+        return self._base_ms + (time.monotonic_ns() - self._base_monotonic_ns) // 1_000_000
+
+    def next_id(self) -> int:
+        """生成下一个ID（线程安全）"""
+        with self._lock:
+            if self._worker_bits is None:
+                self.worker_id = self._allocate_worker_id()
+                self._worker_bits = self.worker_id << self.WORKER_ID_SHIFT
+            timestamp = self._current_ms()
+            if timestamp == self._last_ms:
+                self._sequence = (self._sequence + 1) & self.SEQUENCE_MASK
+                if self._sequence == 0:
+                    # 当前毫秒的序列号已用完，等待到下一毫秒
+                    while timestamp <= self._last_ms:
+                        timestamp = self._current_ms()
+            else:
+                self._sequence = 0
+            self._last_ms = timestamp
+            return (timestamp << self.TIMESTAMP_SHIFT) | self._worker_bits | self._sequence
+
+    @classmethod
+    def parse_id(cls, snowflake_id: int) -> dict:
+        """解析ID，返回生成时间(毫秒时间戳)、worker id、序列号，用于排查问题"""
+        return {
+            "timestamp_ms": (snowflake_id >> cls.TIMESTAMP_SHIFT) + cls.EPOCH_MS,
+            "worker_id": (snowflake_id >> cls.WORKER_ID_SHIFT) & cls.MAX_WORKER_ID,
+            "sequence": snowflake_id & cls.SEQUENCE_MASK,
+        }
+
+
+# 全局单例，进程内共享
+snowflake_id_generator = SnowflakeIdGenerator()
+
+
+def _generate_ids(count: int) -> list:
+    """压力测试子进程：用全局单例生成指定数量的ID（与服务中的用法相同）"""
+    return [snowflake_id_generator.next_id() for _ in range(count)]
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    # 1. 多进程唯一性压力测试：4个进程同时生成ID，检查全部ID不重复
+    #    不指定worker id，各进程按启动时的默认流程分配：spawn 与 uvicorn --workers 启动worker的方式相同，fork 用于验证子进程重新分配
+    process_count, per_process = 4, 200000
+    for start_method in ("spawn", "fork"):
+        if start_method not in multiprocessing.get_all_start_methods():
+            continue
+        with ProcessPoolExecutor(max_workers=process_count, mp_context=multiprocessing.get_context(start_method)) as executor:
+            results = list(executor.map(_generate_ids, [per_process] * process_count))
+        all_ids = [i for ids in results for i in ids]
+        assert len(set(all_ids)) == len(all_ids), f"多进程（{start_method}）生成的ID存在重复"
+        worker_ids = sorted({SnowflakeIdGenerator.parse_id(ids[0])["worker_id"] for ids in results})
+        print(f"多进程压力测试通过（{start_method}）：{process_count}个进程共生成 {len(all_ids)} 个ID，无重复，worker id = {worker_ids}")
+
+    # 2. 多线程唯一性测试：同一个生成器被多个线程同时调用
+    generator = SnowflakeIdGenerator(worker_id=1)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: [generator.next_id() for _ in range(50000)], range(8)))
+    all_ids = [i for ids in results for i in ids]
+    assert len(set(all_ids)) == len(all_ids), "多线程生成的ID存在重复"
+    print(f"多线程测试通过：8个线程共生成 {len(all_ids)} 个ID，无重复")
+
+    # 3. 吞吐量基准测试
+    total = 1000000
+    start = time.perf_counter()
+    for _ in range(total):
+        generator.next_id()
+    elapsed = time.perf_counter() - start
+    print(f"吞吐量：{total / elapsed / 1000:.0f} 个/毫秒（单进程单毫秒上限 {SnowflakeIdGenerator.SEQUENCE_MASK + 1} 个）")
+
+    sample_id = snowflake_id_generator.next_id()
+    print(sample_id, SnowflakeIdGenerator.parse_id(sample_id))